@@ -0,0 +1,318 @@
+"""Benchmarks de Monitor.loop_step, is_game, kill_steam_and_games, persistencia y
+del muestreo de actividad.
+
+Usa la tabla sintética de ``synthetic.py`` (100 → 50 000 procesos) y guarda
+los resultados en JSON. El muestreo de actividad lee procesos reales del sistema.
+En Linux, ``source.*`` compara psutil con ``ProcFsSource`` sobre la tabla
+sintética volcada como ``/proc`` falso; ``replay.*`` reproduce días de uso
+sintéticos con ``trace.replay``. ``compare`` marca regresiones entre dos corridas.
+
+``*.attr_reads`` cuenta lecturas de atributos de la tabla sintética (cada
+atributo pedido a ``process_iter`` y cada ``name()``/``ppid()``/``parent()``…
+por proceso), no syscalls reales: con psutil cada una suele ser al menos una
+lectura de ``/proc`` o una llamada al sistema, pero ``oneshot`` puede agruparlas.
+
+Uso:
+```
+python benchmarks/bench_monitor.py run --out bench.json
+python benchmarks/bench_monitor.py run --sizes 1000,10000 --depth 8 --fanout 40
+python benchmarks/bench_monitor.py compare base.json bench.json --threshold 0.15
+```
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synthetic import SyntheticTable  # noqa: E402
+
+from game_time_limiter import persistence  # noqa: E402
+from game_time_limiter.eventlog import EventLog, set_event_log  # noqa: E402
+from game_time_limiter.monitor import Monitor  # noqa: E402
+from game_time_limiter.process_utils import (  # noqa: E402
+    ProcessSnapshot,
+    is_game,
+    kill_steam_and_games,
+)
+
+Metrics = Dict[str, Dict[str, object]]
+
+
+def _metric(out: Metrics, name: str, value: float, unit: str, better: str = "lower") -> None:
+    out[name] = {"value": value, "unit": unit, "better": better}
+    print(f"  {name:<40} {value:12.3f} {unit}")
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+# --------------------------------------------------------------------------- #
+# Escenarios
+# --------------------------------------------------------------------------- #
+
+def bench_tick(out: Metrics, size: int, args) -> None:
+    table = SyntheticTable(size, depth=args.depth, steam_fanout=args.fanout)
+    monitor = Monitor(
+        timedelta(days=365), max_staleness=3600, process_iter=table.process_iter
+    )
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink):  # avisos del Monitor, no las métricas
+            cold = _median_ms(monitor.loop_step, 1)
+            reads_per_tick: List[int] = []
+            samples = []
+            for _ in range(args.ticks):
+                table.churn(args.churn)
+                reads = table.reads
+                samples.append(_median_ms(monitor.loop_step, 1))
+                reads_per_tick.append(table.reads - reads)
+    finally:
+        monitor.checkpointer.close()
+    _metric(out, f"tick.cold_ms[{size}]", cold, "ms")
+    _metric(out, f"tick.steady_ms[{size}]", statistics.median(samples), "ms")
+    _metric(out, f"tick.attr_reads[{size}]", statistics.median(reads_per_tick), "attrs")
+
+
+def bench_is_game(out: Metrics, size: int, args) -> None:
+    table = SyntheticTable(size, depth=args.depth, steam_fanout=args.fanout)
+    procs = list(table.process_iter(["pid", "ppid", "name", "create_time"]))
+
+    reads = table.reads
+    legacy = _median_ms(lambda: [p for p in procs if is_game(p)], args.repeat)
+    legacy_reads = (table.reads - reads) / args.repeat
+    snap = _median_ms(lambda: ProcessSnapshot(procs).games(), args.repeat)
+    _metric(out, f"is_game.ancestor_walk_ms[{size}]", legacy, "ms")
+    _metric(out, f"is_game.ancestor_walk_attr_reads[{size}]", legacy_reads, "attrs")
+    _metric(out, f"is_game.snapshot_ms[{size}]", snap, "ms")
+
+
+def bench_kill(out: Metrics, size: int, args) -> None:
+    table = SyntheticTable(
+        size, depth=args.depth, steam_fanout=args.fanout, exit_delay=args.exit_delay
+    )
+    snapshot = ProcessSnapshot.capture(table.process_iter)
+    start = time.perf_counter()
+    results = kill_steam_and_games(snapshot)
+    wall = (time.perf_counter() - start) * 1000
+    _metric(out, f"kill.wall_ms[{size}]", wall, "ms")
+    _metric(out, f"kill.procs[{size}]", len(results), "procs", better="none")
+
+
+def bench_source(out: Metrics, size: int, args) -> None:
+    """Escaneo + foto con psutil y con ProcFsSource sobre el mismo /proc falso."""
+    import psutil
+
+    from game_time_limiter.sources import ProcFsSource, PsutilSource
+
+    table = SyntheticTable(size, depth=args.depth, steam_fanout=args.fanout)
+    shm = "/dev/shm" if Path("/dev/shm").is_dir() else None  # tmpfs, como /proc
+    saved = psutil.PROCFS_PATH
+    with tempfile.TemporaryDirectory(dir=shm) as tmp:
+        table.write_procfs(Path(tmp))
+        psutil.PROCFS_PATH = tmp
+        try:
+            timings = {}
+            for source in (PsutilSource(), ProcFsSource(tmp)):
+                ProcessSnapshot.capture(source=source)  # caché de psutil / nombres
+                timings[source.name] = _median_ms(
+                    lambda: ProcessSnapshot.capture(source=source), args.repeat
+                )
+                _metric(out, f"source.{source.name}_ms[{size}]", timings[source.name], "ms")
+        finally:
+            psutil.PROCFS_PATH = saved
+    speedup = timings["psutil"] / timings["procfs"]
+    _metric(out, f"source.speedup[{size}]", speedup, "x", better="higher")
+
+
+def bench_persistence(out: Metrics, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        stores = {
+            "journal": persistence.UsageJournal(tmp_path / "u.json", tmp_path / "u.journal"),
+        }
+        from game_time_limiter.sqlite_store import SqliteUsageStore
+
+        stores["sqlite"] = SqliteUsageStore(tmp_path / "u.db")
+        for name, store in stores.items():
+            store.load()
+            n = args.appends
+            start = time.perf_counter()
+            for i in range(n):
+                store.add("2025-01-01", 1.0)
+                if i % 20 == 19:  # lo que hace el checkpointer por volcado
+                    store.sync()
+            store.sync()
+            elapsed = time.perf_counter() - start
+            _metric(out, f"persist.{name}.appends_per_s", n / elapsed, "ops/s", better="higher")
+            start = time.perf_counter()
+            store.load()
+            _metric(out, f"persist.{name}.load_ms", (time.perf_counter() - start) * 1000, "ms")
+            store.close()
+
+
+def bench_activity(out: Metrics, args) -> None:
+    """Coste de una muestra de CPU sobre procesos reales y % de CPU resultante
+    si se muestrea en cada heartbeat del checkpointer."""
+    import psutil
+
+    from game_time_limiter.activity import PROC_STAT, ActivitySampler
+    from game_time_limiter.checkpoint import MAX_STALENESS
+
+    procs = [psutil.Process(pid) for pid in psutil.pids()[: args.activity_procs]]
+    backends = {"psutil": False}
+    if PROC_STAT:
+        backends["proc_stat"] = True
+    for name, use_proc_stat in backends.items():
+        sampler = ActivitySampler(idle_threshold=None, use_proc_stat=use_proc_stat)
+        ms = _median_ms(lambda: sampler.cpu_load(procs), max(args.repeat, 20))
+        _metric(out, f"activity.{name}.sample_ms[{len(procs)}]", ms, "ms")
+        cpu = ms / 1000 / MAX_STALENESS * 100
+        _metric(out, f"activity.{name}.cpu_pct[{len(procs)}]", cpu, "%")
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+
+def bench_replay(out: Metrics, size: int, args) -> None:
+    """Días de uso sintéticos reproducidos con ``trace.replay`` (reloj inyectado)."""
+    from game_time_limiter.config import parse_config
+    from game_time_limiter.trace import replay
+
+    table = SyntheticTable(size, depth=args.depth, steam_fanout=args.fanout)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "trace.jsonl"
+        table.write_trace(path, args.replay_days, churn=args.churn)
+        _metric(out, f"replay.trace_kb[{size}]", path.stat().st_size / 1024, "KiB")
+        result = replay(path, parse_config({"limit": "2h"}))
+    simulated = result.end - result.start
+    _metric(out, f"replay.ticks_per_s[{size}]", result.ticks / result.wall, "ticks/s", "higher")
+    _metric(out, f"replay.tick_ms[{size}]", result.cost_summary()["median_ms"], "ms")
+    _metric(out, f"replay.speedup[{size}]", simulated / result.wall, "x", "higher")
+    _metric(out, f"replay.kills[{size}]", len(result.kills), "procs", better="none")
+
+
+def run(args) -> int:
+    # Ningún benchmark debe tocar el usage.json del proyecto
+    tmp = tempfile.TemporaryDirectory()
+    persistence.set_store(
+        persistence.UsageJournal(Path(tmp.name) / "u.json", Path(tmp.name) / "u.journal")
+    )
+    set_event_log(EventLog(None, console=False))  # ni events.jsonl ni consola
+    metrics: Metrics = {}
+    for size in args.sizes:
+        print(f"[{size} procesos]")
+        bench_tick(metrics, size, args)
+        if size <= args.legacy_max:
+            bench_is_game(metrics, size, args)
+        bench_kill(metrics, size, args)
+        if sys.platform.startswith("linux") and size <= args.source_max:
+            bench_source(metrics, size, args)
+        if size <= args.replay_max:
+            bench_replay(metrics, size, args)
+    print("[persistencia]")
+    bench_persistence(metrics, args)
+    print("[actividad]")
+    bench_activity(metrics, args)
+    persistence.get_store().close()
+    tmp.cleanup()
+
+    result = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k != "func"},
+        },
+        "metrics": metrics,
+    }
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2, default=str))
+        print(f"Resultados en {args.out}")
+    if args.baseline:
+        return report(json.loads(args.baseline.read_text()), result, args.threshold)
+    return 0
+
+
+def report(base: dict, new: dict, threshold: float) -> int:
+    """Imprime la comparación; código 1 si alguna métrica empeora > ``threshold``."""
+    regressions = 0
+    for name, cur in new["metrics"].items():
+        old = base["metrics"].get(name)
+        if old is None or cur["better"] == "none" or not old["value"]:
+            continue
+        change = (cur["value"] - old["value"]) / old["value"]
+        worse = change > threshold if cur["better"] == "lower" else change < -threshold
+        regressions += worse
+        flag = "REGRESIÓN" if worse else ""
+        print(f"  {name:<40} {old['value']:12.3f} → {cur['value']:12.3f} ({change:+.1%}) {flag}")
+    print(f"{regressions} regresiones (umbral {threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def compare(args) -> int:
+    return report(
+        json.loads(args.base.read_text()), json.loads(args.new.read_text()), args.threshold
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks del Monitor con procesos sintéticos.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="ejecuta los benchmarks")
+    r.add_argument(
+        "--sizes",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[100, 1000, 10000, 50000],
+    )
+    r.add_argument("--depth", type=int, default=6, help="profundidad máxima del árbol")
+    r.add_argument("--fanout", type=int, default=12, help="hijos directos de steam.exe")
+    r.add_argument("--ticks", type=int, default=20, help="ticks estables a medir")
+    r.add_argument("--churn", type=int, default=5, help="procesos nuevos por tick")
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--legacy-max", type=int, default=10000, help="tamaño máx. para is_game clásico")
+    r.add_argument("--exit-delay", type=float, default=0.02, help="s que tarda un proceso en morir")
+    r.add_argument("--appends", type=int, default=5000)
+    r.add_argument(
+        "--source-max", type=int, default=10000, help="tamaño máx. del /proc falso (Linux)"
+    )
+    r.add_argument("--replay-days", type=int, default=14, help="días de traza a reproducir")
+    r.add_argument("--replay-max", type=int, default=2000, help="tamaño máx. para replay")
+    r.add_argument("--activity-procs", type=int, default=32, help="procesos por muestra de CPU")
+    r.add_argument("--out", type=Path, help="archivo JSON de resultados")
+    r.add_argument("--baseline", type=Path, help="comparar contra este JSON al terminar")
+    r.add_argument("--threshold", type=float, default=0.15)
+    r.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="compara dos JSON de resultados")
+    c.add_argument("base", type=Path)
+    c.add_argument("new", type=Path)
+    c.add_argument("--threshold", type=float, default=0.15)
+    c.set_defaults(func=compare)
+
+    args = ap.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
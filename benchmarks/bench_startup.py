@@ -0,0 +1,98 @@
+"""Benchmark de arranque basado en ``python -X importtime``.
+
+Mide cuánto cuesta importar cada punto de entrada (suma de los tiempos
+``self`` de los módulos que no carga ya un intérprete vacío) y el tiempo de
+pared de ``game-time-limiter --help``. Sale con código 1 si algo supera su presupuesto.
+
+Uso:
+```
+python benchmarks/bench_startup.py            # presupuestos por defecto
+python benchmarks/bench_startup.py --runs 10 --json startup.json
+```
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# punto de entrada → (código a ejecutar, presupuesto de import en ms)
+TARGETS: Dict[str, Tuple[str, float]] = {
+    "package": ("import game_time_limiter", 20.0),
+    "cli --help": (
+        "import sys; sys.argv=['game-time-limiter','--help'];"
+        "from game_time_limiter.cli import main\ntry: main()\nexcept SystemExit: pass",
+        60.0,
+    ),
+    "daemon": ("import game_time_limiter.monitor", 150.0),
+}
+
+
+def import_profile(
+    code: str, baseline: Set[str] = frozenset()
+) -> Tuple[float, List[Tuple[float, str]]]:
+    """(ms totales, [(ms self, módulo)…]) sin contar los módulos de ``baseline``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    modules: List[Tuple[float, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|", 2)
+        name = name.strip()
+        if name not in baseline:
+            modules.append((int(self_us) / 1000, name))
+    return sum(ms for ms, _ in modules), modules
+
+
+def wall_time(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark de arranque (-X importtime).")
+    ap.add_argument("--runs", type=int, default=5, help="repeticiones (se usa la mediana)")
+    ap.add_argument("--top", type=int, default=5, help="módulos más lentos a mostrar")
+    ap.add_argument("--json", type=Path, help="guardar resultados en este archivo")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplica los presupuestos")
+    args = ap.parse_args()
+
+    baseline = {name for _, name in import_profile("pass")[1]}
+    results = {}
+    failed = False
+    for label, (code, budget) in TARGETS.items():
+        profiles = [import_profile(code, baseline) for _ in range(args.runs)]
+        import_ms = statistics.median(total for total, _ in profiles)
+        wall_ms = statistics.median(wall_time(code) for _ in range(args.runs))
+        budget *= args.scale
+        ok = import_ms <= budget
+        failed |= not ok
+        slowest = sorted(profiles[-1][1], reverse=True)[: args.top]
+        results[label] = {"import_ms": import_ms, "wall_ms": wall_ms, "budget_ms": budget, "ok": ok}
+        print(
+            f"{'OK ' if ok else 'MAL'} {label:<12} import {import_ms:7.1f} ms "
+            f"(presupuesto {budget:.0f})  pared {wall_ms:7.1f} ms"
+        )
+        for ms, name in slowest:
+            print(f"      {ms:7.2f} ms  {name}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
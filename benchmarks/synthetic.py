@@ -0,0 +1,208 @@
+"""Tabla de procesos sintética con la forma mínima de ``psutil``.
+
+``SyntheticTable`` genera árboles de 100 a 50 000 procesos con profundidad y
+abanico de Steam configurables y cuenta cada lectura de atributo, así los
+benchmarks pueden medir cuántas "syscalls" cuesta un tick. ``write_procfs``
+vuelca la misma tabla como un ``/proc`` falso para medir las fuentes de procesos
+y ``write_trace``, como días de uso grabados para ``trace.replay``.
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import psutil
+
+
+class FakeProcess:
+    """Proceso falso: lo justo para ProcessSnapshot, is_game y kill_batch."""
+
+    def __init__(self, table: "SyntheticTable", pid: int, ppid: int, name: str, ctime: float):
+        self.table = table
+        self.pid = pid
+        self._ppid = ppid
+        self._name = name
+        self._ctime = ctime
+        self.info: Dict[str, object] = {}
+        self.dies_at: Optional[float] = None
+        self.stubborn = False  # ignora terminate(), solo muere con kill()
+
+    # ---------- lecturas (cada una suma 1 a ``reads``; no son syscalls) ----------
+    def name(self) -> str:
+        self.table.reads += 1
+        return self._name
+
+    def ppid(self) -> int:
+        self.table.reads += 1
+        return self._ppid
+
+    def parent(self) -> Optional["FakeProcess"]:
+        self.table.reads += 1
+        return self.table.procs.get(self._ppid)
+
+    def create_time(self) -> float:
+        self.table.reads += 1
+        return self._ctime
+
+    # ---------------- cierre ----------------
+    def terminate(self) -> None:
+        if not self.stubborn and self.dies_at is None:
+            self.dies_at = time.monotonic() + self.table.exit_delay
+
+    def kill(self) -> None:
+        if self.dies_at is None or self.stubborn:
+            self.dies_at = time.monotonic() + self.table.exit_delay / 4
+            self.stubborn = False
+
+    def is_running(self) -> bool:
+        return self.dies_at is None or time.monotonic() < self.dies_at
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if self.dies_at is None:
+            if timeout:
+                time.sleep(timeout)
+            raise psutil.TimeoutExpired(timeout, self.pid)
+        left = self.dies_at - time.monotonic()
+        if left > 0:
+            if timeout is not None and left > timeout:
+                time.sleep(timeout)
+                raise psutil.TimeoutExpired(timeout, self.pid)
+            time.sleep(left)
+        return 0
+
+
+class SyntheticTable:
+    """Árbol de ``size`` procesos: ``steam.exe`` con ``steam_fanout`` hijos
+    directos (un tercio helpers, el resto juegos con cadenas de ``depth``
+    descendientes) y el resto, procesos genéricos de hasta ``depth`` niveles."""
+
+    def __init__(
+        self,
+        size: int,
+        depth: int = 6,
+        steam_fanout: int = 12,
+        exit_delay: float = 0.02,
+        seed: int = 0,
+    ):
+        self.rng = random.Random(seed)
+        self.depth = depth
+        self.exit_delay = exit_delay
+        self.procs: Dict[int, FakeProcess] = {}
+        self.reads = 0
+        self._next_pid = 1
+        self._clock = 1_000_000.0
+        self._levels: Dict[int, int] = {}
+        self._generic: List[int] = []
+
+        init = self._spawn(0, "init")
+        steam = self._spawn(init, "steam.exe")
+        for i in range(steam_fanout):
+            if i % 3 == 0:
+                self._spawn(steam, "steamwebhelper.exe")
+                continue
+            parent = self._spawn(steam, f"game{i}.exe")
+            for d in range(min(depth, 2)):
+                parent = self._spawn(parent, f"game{i}-child{d}.exe")
+        while len(self.procs) < size:
+            self._generic.append(self._spawn_generic())
+
+    def _spawn(self, ppid: int, name: str) -> int:
+        pid = self._next_pid
+        self._next_pid += 1
+        self._clock += 0.001
+        self.procs[pid] = FakeProcess(self, pid, ppid, name, self._clock)
+        self._levels[pid] = self._levels.get(ppid, -1) + 1
+        return pid
+
+    def _spawn_generic(self) -> int:
+        candidates = self._generic[-64:] or [1]
+        ppid = self.rng.choice(candidates)
+        if self._levels.get(ppid, 0) >= self.depth:
+            ppid = 1
+        return self._spawn(ppid, f"proc{self._next_pid}.exe")
+
+    def churn(self, count: int) -> None:
+        """Sustituye ``count`` procesos genéricos (salen unos, entran otros)."""
+        for _ in range(min(count, len(self._generic))):
+            gone = self._generic.pop(self.rng.randrange(len(self._generic)))
+            del self.procs[gone]
+            self._generic.append(self._spawn_generic())
+
+    # ---------------- interfaz tipo psutil ----------------
+    def process_iter(self, attrs: Optional[Iterable[str]] = None) -> Iterator[FakeProcess]:
+        attrs = list(attrs or ())
+        for proc in list(self.procs.values()):
+            self.reads += len(attrs)
+            proc.info = {
+                "pid": proc.pid,
+                "ppid": proc._ppid,
+                "name": proc._name,
+                "create_time": proc._ctime,
+            }
+            yield proc
+
+    # ---------------- como /proc (Linux) ----------------
+    def write_procfs(self, root: Path, clk_tck: int = 100) -> None:
+        """Escribe ``stat``/``comm``/``cmdline`` por proceso y ``stat`` con ``btime``.
+
+        Sirve tanto para ``ProcFsSource(root)`` como para psutil con
+        ``psutil.PROCFS_PATH = root``.
+        """
+        btime = int(min(p._ctime for p in self.procs.values())) - 60
+        root.mkdir(parents=True, exist_ok=True)
+        (root / "stat").write_text(f"cpu  0 0 0 0 0 0 0 0 0 0\nbtime {btime}\n")
+        for proc in self.procs.values():
+            d = root / str(proc.pid)
+            d.mkdir(exist_ok=True)
+            start = round((proc._ctime - btime) * clk_tck)
+            comm = proc._name[:15]
+            fields = ["S", proc._ppid, proc.pid, proc.pid, 0, -1, 4194560]
+            fields += [0] * 12 + [start] + [0] * 30  # 52 campos, como el kernel
+            (d / "stat").write_text(f"{proc.pid} ({comm}) " + " ".join(map(str, fields)) + "\n")
+            (d / "comm").write_text(comm + "\n")
+            (d / "cmdline").write_bytes(proc._name.encode() + b"\0")
+            (d / "status").write_text(
+                f"Name:\t{comm}\nPPid:\t{proc._ppid}\nUid:\t{os.getuid()}\t0\t0\t0\n"
+            )
+
+    # ---------------- como traza grabada ----------------
+    def write_trace(
+        self,
+        path: Path,
+        days: int,
+        poll: float = 300.0,
+        play: tuple = (18, 21),
+        churn: int = 0,
+        start: Optional[float] = None,
+    ) -> int:
+        """Un tick cada ``poll`` s durante ``days`` días; el árbol de Steam solo
+        existe entre las horas ``play`` de cada día. Devuelve los ticks escritos."""
+        from game_time_limiter.trace import TraceWriter
+
+        start = start if start is not None else datetime(2026, 1, 5).timestamp()  # lunes
+        steam = {pid for pid, p in self.procs.items() if p._name == "steam.exe"}
+        for pid in sorted(self.procs):
+            if self.procs[pid]._ppid in steam:
+                steam.add(pid)
+        writer = TraceWriter(path, clock=lambda: start)
+        ticks = 0
+        ts = start
+        try:
+            while ts < start + days * 86_400:
+                self.churn(churn)
+                hour = datetime.fromtimestamp(ts).hour
+                playing = play[0] <= hour < play[1]
+                writer.write(ts, (
+                    (p.pid, p._ppid, p._name, p._ctime, None, None)
+                    for p in self.procs.values()
+                    if playing or p.pid not in steam
+                ))
+                ticks += 1
+                ts += poll
+        finally:
+            writer.close()
+        return ticks
@@ -1,21 +1,56 @@
-"""Top‑level package metadata."""
+"""Top‑level package metadata.
+
+Los símbolos de ``__all__`` se importan bajo demanda (PEP 562): ``import
+game_time_limiter`` no carga psutil, win10toast ni pywin32 hasta que se usan.
+"""
+from __future__ import annotations
+import importlib
+
 __all__ = [
     "parse_timedelta",
     "load_usage",
     "save_usage",
+    "ProcessSnapshot",
+    "ClassificationCache",
     "has_steam_ancestor",
     "is_game",
     "kill_proc",
+    "kill_batch",
+    "KillResult",
     "kill_steam_and_games",
+    "kill_launchers_and_games",
+    "LauncherRules",
+    "ProcessSource",
     "Monitor",
 ]
 
-from .utils import parse_timedelta
-from .persistence import load_usage, save_usage
-from .process_utils import (
-    has_steam_ancestor,
-    is_game,
-    kill_proc,
-    kill_steam_and_games,
-)
-from .monitor import Monitor
\ No newline at end of file
+_LAZY = {
+    "parse_timedelta": ".utils",
+    "load_usage": ".persistence",
+    "save_usage": ".persistence",
+    "ProcessSnapshot": ".process_utils",
+    "ClassificationCache": ".process_utils",
+    "has_steam_ancestor": ".process_utils",
+    "is_game": ".process_utils",
+    "kill_proc": ".process_utils",
+    "kill_batch": ".process_utils",
+    "KillResult": ".process_utils",
+    "kill_steam_and_games": ".process_utils",
+    "kill_launchers_and_games": ".process_utils",
+    "LauncherRules": ".launchers",
+    "ProcessSource": ".sources",
+    "Monitor": ".monitor",
+}
+
+
+def __getattr__(name: str) -> object:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # siguientes accesos sin pasar por aquí
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import psutil
+
+# --------------------------------------------------------------------------- #
+# Contabilidad por actividad: CPU de los juegos + inactividad de teclado/ratón
+# --------------------------------------------------------------------------- #
+CPU_THRESHOLD = 0.05    # fracción de un núcleo (5 %) para considerar que el juego corre
+IDLE_THRESHOLD = 300.0  # s sin teclado/ratón → el jugador no está
+MIN_SAMPLE = 1.0        # s: muestras más seguidas repiten el veredicto (ticks de 10 ms en /proc)
+PROC_STAT = sys.platform.startswith("linux") and os.path.isdir("/proc")
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _cpu_proc_stat(pid: int) -> Optional[float]:
+    """utime + stime de ``/proc/<pid>/stat``: una lectura, sin objetos psutil."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            data = fh.read()
+    except OSError:
+        return None
+    fields = data[data.rfind(b")") + 2:].split()  # el nombre puede tener espacios
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+def _cpu_psutil(proc: psutil.Process) -> Optional[float]:
+    try:
+        times = proc.cpu_times()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+    return times.user + times.system
+
+
+# ---------------- tiempo sin entrada del usuario ----------------
+def _idle_windows() -> Optional[Callable[[], float]]:
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+    kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+    info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO), 0)
+
+    def idle() -> float:
+        if not user32.GetLastInputInfo(ctypes.byref(info)):
+            return 0.0
+        return ((kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+
+    return idle
+
+
+def _idle_x11() -> Optional[Callable[[], float]]:
+    """XScreenSaver vía ctypes; None sin DISPLAY o sin libXss (p. ej. Wayland puro)."""
+    if not os.environ.get("DISPLAY"):
+        return None
+    x11_name, xss_name = ctypes.util.find_library("X11"), ctypes.util.find_library("Xss")
+    if not x11_name or not xss_name:
+        return None
+
+    class XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [
+            ("window", ctypes.c_ulong),
+            ("state", ctypes.c_int),
+            ("kind", ctypes.c_int),
+            ("til_or_since", ctypes.c_ulong),
+            ("idle", ctypes.c_ulong),
+            ("eventMask", ctypes.c_ulong),
+        ]
+
+    xlib, xss = ctypes.CDLL(x11_name), ctypes.CDLL(xss_name)
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    xss.XScreenSaverQueryInfo.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)
+    ]
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        return None
+    root = xlib.XDefaultRootWindow(display)
+    info = xss.XScreenSaverAllocInfo()
+
+    def idle() -> float:
+        if not xss.XScreenSaverQueryInfo(display, root, info):
+            return 0.0
+        return info.contents.idle / 1000.0
+
+    return idle
+
+
+def input_idle_source() -> Optional[Callable[[], float]]:
+    """Función que da los segundos sin entrada, o None si no se puede saber.
+
+    Un servicio de Windows corre en la sesión 0 y no ve la entrada del
+    usuario: ahí conviene usar solo el criterio de CPU.
+    """
+    try:
+        if os.name == "nt":
+            return _idle_windows()
+        return _idle_x11()
+    except (OSError, AttributeError):
+        return None
+
+
+class ActivitySampler:
+    """Decide si el tiempo de juego debe contar.
+
+    Cuenta si los juegos suman al menos ``cpu_threshold`` núcleos desde la
+    muestra anterior y el usuario tocó teclado o ratón en los últimos
+    ``idle_threshold`` s (si el sistema permite saberlo). Un juego en pausa
+    en segundo plano o un ayudante parado no consumen el presupuesto.
+
+    Cada muestra es una lectura de ``/proc/<pid>/stat`` (o ``cpu_times()``)
+    por proceso de juego; a un paso cada pocos segundos el coste es
+    despreciable (ver ``benchmarks/bench_monitor.py``, sección actividad).
+    """
+
+    def __init__(
+        self,
+        cpu_threshold: float = CPU_THRESHOLD,
+        idle_threshold: Optional[float] = IDLE_THRESHOLD,
+        idle_fn: Optional[Callable[[], float]] = None,
+        use_proc_stat: bool = PROC_STAT,
+    ):
+        self.cpu_threshold = cpu_threshold
+        self.idle_threshold = idle_threshold  # None → no mirar la entrada
+        self.idle_fn = idle_fn if idle_fn is not None else (
+            input_idle_source() if idle_threshold is not None else None
+        )
+        self.use_proc_stat = use_proc_stat
+        self._last: Dict[int, Tuple[float, float]] = {}  # pid → (cpu s, instante)
+        self._lock = threading.Lock()  # tick del bucle y heartbeat del checkpointer
+        self.last_cpu = 0.0   # núcleos medidos en la última muestra (diagnóstico)
+        self.last_idle: Optional[float] = None
+        self._verdict: Tuple[float, bool] = (float("-inf"), True)  # (instante, activo)
+
+    def _cpu(self, proc: psutil.Process) -> Optional[float]:
+        if self.use_proc_stat:
+            return _cpu_proc_stat(proc.pid)
+        return _cpu_psutil(proc)
+
+    def cpu_load(
+        self, procs: Iterable[psutil.Process], now: Optional[float] = None
+    ) -> Optional[float]:
+        """Núcleos usados por ``procs`` desde la muestra anterior (None: sin base)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            used = elapsed = 0.0
+            seen: Dict[int, Tuple[float, float]] = {}
+            for proc in procs:
+                cpu = self._cpu(proc)
+                if cpu is None:
+                    continue
+                seen[proc.pid] = (cpu, now)
+                prev = self._last.get(proc.pid)
+                if prev is not None and now > prev[1]:
+                    used += max(cpu - prev[0], 0.0)
+                    elapsed = max(elapsed, now - prev[1])
+            self._last = seen  # los que salieron se olvidan
+        if elapsed <= 0:
+            return None
+        return used / elapsed
+
+    def active(self, procs: Iterable[psutil.Process], now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if now - self._verdict[0] < MIN_SAMPLE:
+            return self._verdict[1]
+        verdict = self._decide(procs, now)
+        self._verdict = (now, verdict)
+        return verdict
+
+    def _decide(self, procs: Iterable[psutil.Process], now: float) -> bool:
+        load = self.cpu_load(procs, now)
+        self.last_cpu = load or 0.0
+        if load is not None and load < self.cpu_threshold:
+            return False  # sin base (juego recién abierto) se le da el beneficio de la duda
+        if self.idle_fn is not None and self.idle_threshold is not None:
+            self.last_idle = self.idle_fn()
+            if self.last_idle >= self.idle_threshold:
+                return False
+        return True
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import atexit
+import signal
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import NULL_METRICS, Metrics
+from .persistence import get_store
+
+MAX_STALENESS = 5.0  # s como máximo entre un cambio en memoria y su escritura
+
+
+class Checkpointer(threading.Thread):
+    """Escritura diferida del uso: el loop solo anota en memoria.
+
+    Los deltas se agrupan por día y un hilo aparte los vuelca al diario como
+    mucho cada ``max_staleness`` segundos (una ráfaga de ticks = una escritura).
+    ``heartbeat`` se llama antes de cada volcado para que el Monitor impute el
+    tiempo transcurrido desde el último tick.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float = MAX_STALENESS,
+        heartbeat: Optional[Callable[[], None]] = None,
+        metrics: Metrics = NULL_METRICS,
+        store=None,
+    ):
+        super().__init__(name="usage-checkpointer", daemon=True)
+        self.store = store  # None → backend global de persistence
+        self.max_staleness = max_staleness
+        self.heartbeat = heartbeat
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._halt = threading.Event()
+        self._adds: Dict[str, float] = {}
+        self._sets: Dict[str, float] = {}
+        self._sessions: List[Tuple[str, int, float, float]] = []
+        self._dirty = False
+
+    # -------- lado del loop: nunca toca disco --------
+    def add(self, day: str, delta: float) -> None:
+        with self._lock:
+            self._adds[day] = self._adds.get(day, 0.0) + delta
+            self._dirty = True
+
+    def set(self, day: str, seconds: float) -> None:
+        with self._lock:
+            self._adds.pop(day, None)
+            self._sets[day] = seconds
+            self._dirty = True
+
+    def add_session(self, exe: str, pid: int, start: float, end: float) -> None:
+        with self._lock:
+            self._sessions.append((exe, pid, start, end))
+            self._dirty = True
+
+    # -------- lado del hilo --------
+    def run(self) -> None:
+        while not self._halt.wait(self.max_staleness):
+            if self.heartbeat is not None:
+                self.heartbeat()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            adds, sets, sessions = self._adds, self._sets, self._sessions
+            self._adds, self._sets, self._sessions, self._dirty = {}, {}, [], False
+        store = self.store if self.store is not None else get_store()
+        rollback = getattr(store, "rollback", None)  # SQLite: el lote es una transacción
+        batch = (dict(adds), dict(sets), list(sessions)) if rollback is not None else None
+        with self._io_lock, self.metrics.phase("persist"):  # un volcado = una transacción
+            try:
+                # cada entrada sale del lote al escribirse: el diario no se puede
+                # deshacer y reintentarla contaría el mismo tiempo dos veces
+                for day in list(sets):
+                    store.set(day, sets[day])
+                    del sets[day]
+                for day in list(adds):
+                    store.add(day, adds[day])
+                    del adds[day]
+                while sessions:
+                    store.add_session(*sessions[0])
+                    del sessions[0]
+                store.sync()
+            except Exception as exc:
+                print(f"[WARN] No se pudo guardar el uso: {exc}")
+                if rollback is not None and batch is not None:
+                    rollback()
+                    adds, sets, sessions = batch
+                self._restore(adds, sets, sessions)
+
+    def _restore(self, adds, sets, sessions) -> None:
+        # lo no escrito del lote es anterior a lo pendiente: un ``set`` nuevo
+        # lo anula; si no, el ``set`` viejo se conserva y los ``add`` se suman
+        with self._lock:
+            newer = set(self._sets)
+            for day, seconds in sets.items():
+                if day not in newer:
+                    self._sets[day] = seconds
+            for day, delta in adds.items():
+                if day not in newer:
+                    self._adds[day] = self._adds.get(day, 0.0) + delta
+            self._sessions[:0] = sessions
+            self._dirty = True
+
+    def close(self) -> None:
+        """Para el hilo y hace el último volcado (idempotente)."""
+        self._halt.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=self.max_staleness)
+        if self.heartbeat is not None:
+            self.heartbeat()
+        self.flush()
+
+
+def install_shutdown_handlers(callback: Callable[[], None]) -> None:
+    """Vuelca en SIGTERM/SIGBREAK y al salir del intérprete."""
+    atexit.register(callback)
+
+    def _handler(signum, frame):
+        callback()
+        raise SystemExit(128 + signum)
+
+    for name in ("SIGTERM", "SIGBREAK", "SIGHUP"):
+        sig = getattr(signal, name, None)
+        if sig is None:
+            continue
+        try:
+            signal.signal(sig, _handler)
+        except ValueError:  # fuera del hilo principal
+            pass
@@ -1,22 +1,134 @@
 from __future__ import annotations
 import argparse
+import json
 import os
 import sys
+from pathlib import Path
 
 from .utils import parse_timedelta
-from .monitor import Monitor
 
+# Monitor (psutil) y pywin32 se importan solo en la rama que los usa: así
+# ``--help`` y ``--reset`` arrancan al instante y funcionan fuera de Windows.
 SERVICE_AVAILABLE = os.name == "nt"
 
-if SERVICE_AVAILABLE:
-    from .service import GameTimeService  # noqa: WPS433
-    import win32serviceutil  # type: ignore
-
 
 def main():  # console‑script entrypoint
     parser = argparse.ArgumentParser(description="Control de tiempo de juego Steam.")
-    parser.add_argument("--limit", default="2h", help="Ej: 2h, 90m, 10min")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("run", "status", "replay", "report"),
+        default="run",
+        help=(
+            "run: vigila (por defecto); status: consulta al daemon en marcha; "
+            "replay: reproduce una traza grabada con --trace; report: historial de uso"
+        ),
+    )
+    parser.add_argument(
+        "--follow", action="store_true", help="status: sigue mostrando cada tick"
+    )
+    parser.add_argument(
+        "--events", type=int, default=0, metavar="N", help="status: muestra los últimos N eventos"
+    )
+    parser.add_argument(
+        "--event-log",
+        help="Registro JSONL de eventos (por defecto events.jsonl; 'off' lo desactiva)",
+    )
+    parser.add_argument(
+        "--event-log-rotate",
+        metavar="CUÁNDO",
+        help="Rota el registro por tiempo (midnight, H, D…) en vez de por tamaño",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="ARCHIVO",
+        help="run: graba cada escaneo en esta traza (.gz comprime); replay: la traza a reproducir",
+    )
+    parser.add_argument(
+        "--recorded-only",
+        action="store_true",
+        help="replay: solo los ticks grabados, sin simular el planificador adaptativo",
+    )
+    parser.add_argument("--since", metavar="AAAA-MM-DD", help="report: desde este día")
+    parser.add_argument("--until", metavar="AAAA-MM-DD", help="report: hasta este día")
+    parser.add_argument(
+        "--period",
+        choices=("day", "week", "month"),
+        help="report: totales por periodo en vez del resumen por usuario",
+    )
+    parser.add_argument(
+        "--window", type=int, default=7, help="report: periodos de la media móvil (7)"
+    )
+    parser.add_argument(
+        "--format", choices=("table", "csv", "json"), default="table", help="report: salida"
+    )
+    parser.add_argument("--output", metavar="ARCHIVO", help="report: escribe aquí en vez de stdout")
+    parser.add_argument(
+        "--collector-state", metavar="ARCHIVO", help="report: añade las cuentas de un colector"
+    )
+    parser.add_argument(
+        "--limit", help="Ej: 2h, 90m, 10min (por defecto, el de config.json o 2h)"
+    )
+    parser.add_argument(
+        "--config", help="Archivo de configuración (por defecto config.json); se recarga en caliente"
+    )
     parser.add_argument("--reset", action="store_true", help="Borra usage.json")
+    parser.add_argument(
+        "--store",
+        choices=("journal", "sqlite"),
+        help="Backend de uso (por defecto $GTL_STORE o journal)",
+    )
+    parser.add_argument(
+        "--user",
+        action="append",
+        default=[],
+        metavar="NOMBRE=LÍMITE",
+        help=(
+            "Límite propio para un usuario del sistema (repetible); activa el modo "
+            "multiusuario. En report, limita el informe a esos usuarios"
+        ),
+    )
+    parser.add_argument(
+        "--multi-user",
+        action="store_true",
+        help="Un presupuesto por usuario; --limit se aplica a los no listados con --user",
+    )
+    parser.add_argument("--sync-url", help="Colector central, ej: http://servidor:8765")
+    parser.add_argument("--account", help="Cuenta en el colector (por defecto, el usuario)")
+    parser.add_argument("--sync-token", help="Valor de la cabecera X-GTL-Token")
+    parser.add_argument(
+        "--metrics-port", type=int, help="Expone métricas Prometheus en 127.0.0.1:PUERTO"
+    )
+    parser.add_argument("--metrics-file", help="Escribe métricas Prometheus en este archivo")
+    parser.add_argument(
+        "--warn", help="Avisos de tiempo restante, ej: 15m,5m,1m (por defecto, config.json)"
+    )
+    parser.add_argument(
+        "--activity",
+        action="store_true",
+        help="Solo cuenta el tiempo con el juego usando CPU y el usuario presente",
+    )
+    parser.add_argument(
+        "--cpu-threshold",
+        type=float,
+        default=5.0,
+        help="--activity: %% de un núcleo por debajo del cual el juego está parado (5)",
+    )
+    parser.add_argument(
+        "--idle-after",
+        default="5m",
+        help="--activity: sin teclado/ratón durante este tiempo no cuenta ('off' lo desactiva)",
+    )
+    parser.add_argument(
+        "--notify",
+        help="Backends de aviso separados por comas: toast, dbus, stdout (por defecto, el del sistema)",
+    )
+    parser.add_argument("--notify-webhook", help="Además, POST JSON de cada aviso a esta URL")
+    parser.add_argument(
+        "--process-source",
+        choices=("psutil", "procfs"),
+        help="Lectura de la tabla de procesos (por defecto $GTL_PROCESS_SOURCE o psutil)",
+    )
 
     if SERVICE_AVAILABLE:
         parser.add_argument("--install", action="store_true")
@@ -26,25 +138,51 @@ def main():  # console‑script entrypoint
 
     args = parser.parse_args()
 
+    if args.command == "status":
+        sys.exit(show_status(args.follow, args.events))
+
+    if args.command == "report":
+        sys.exit(show_report(args))
+
+    if args.store:
+        from .persistence import open_store, set_store  # lazy import
+
+        set_store(open_store(args.store))
+
     if args.reset:
-        from .persistence import USAGE_FILE  # lazy import
+        from .persistence import reset_usage  # lazy import
 
-        USAGE_FILE.unlink(missing_ok=True)
+        reset_usage()
         print("usage.json borrado.")
 
-    limit_td = parse_timedelta(args.limit)
+    # lo que se pasa por línea de comandos manda sobre config.json
+    overrides = {}
+    if args.limit:
+        overrides["limit"] = args.limit
+    if args.warn:
+        overrides["warnings"] = [w.strip() for w in args.warn.split(",") if w.strip()]
+
+    if args.command == "replay":
+        if not args.trace:
+            parser.error("replay necesita --trace ARCHIVO")
+        sys.exit(show_replay(Path(args.trace), args.config, overrides, args.recorded_only))
 
     # ----- Gestión del servicio Windows -----------------------------------
     if SERVICE_AVAILABLE and any(
         (args.install, args.remove, args.start, args.stop)
     ):
+        import win32service  # type: ignore
+        import win32serviceutil  # type: ignore
+
+        from .service import GameTimeService  # noqa: WPS433
+
         if args.install:
             win32serviceutil.InstallService(
                 GameTimeService._svc_name_,  # type: ignore
                 GameTimeService._svc_display_name_,  # type: ignore
                 GameTimeService._svc_description_,  # type: ignore
                 startType=win32service.SERVICE_AUTO_START,
-                exeArgs=f"--limit {args.limit}",
+                exeArgs=f"--limit {args.limit}" if args.limit else None,
             )
             print("Servicio instalado.")
         elif args.remove:
@@ -59,8 +197,264 @@ def main():  # console‑script entrypoint
         sys.exit(0)
 
     # ----- Ejecución en primer plano --------------------------------------
-    monitor = Monitor(limit_td)
-    monitor.loop()
+    from .checkpoint import install_shutdown_handlers
+    from .config import CONFIG_FILE, ConfigWatcher
+    from .eventlog import EVENT_LOG, EventLog, set_event_log
+    from .monitor import Monitor
+
+    if args.event_log != "off":
+        path = Path(args.event_log) if args.event_log else EVENT_LOG
+    else:
+        path = None
+    events = EventLog(path, rotate_when=args.event_log_rotate)
+    set_event_log(events)
+
+    watcher = ConfigWatcher(
+        path=Path(args.config) if args.config else CONFIG_FILE, overrides=overrides
+    )
+    cfg = watcher.current
+
+    metrics = None
+    if args.metrics_port or args.metrics_file:
+        from .metrics import Metrics
+
+        metrics = Metrics()
+        if args.metrics_port:
+            metrics.serve(args.metrics_port)
+        if args.metrics_file:
+            metrics.export_textfile(Path(args.metrics_file))
+
+    activity = None  # fábrica: cada Monitor lleva su propio muestreador
+    if args.activity:
+        from functools import partial
+
+        from .activity import ActivitySampler
+
+        activity = partial(ActivitySampler, args.cpu_threshold / 100)
+        if args.idle_after != "off":
+            idle_after = parse_timedelta(args.idle_after).total_seconds()
+        else:
+            idle_after = None
+
+    from .notifier import Notifier, default_backends, get_notifier, make_backends, set_notifier
+    from .sources import default_process_source
+
+    if args.notify or args.notify_webhook:
+        names = [n.strip() for n in args.notify.split(",") if n.strip()] if args.notify else []
+        backends = make_backends(names, args.notify_webhook)
+        if not names:
+            backends = default_backends() + backends
+        set_notifier(Notifier(backends))
+
+    source = default_process_source(args.process_source)
+    recorder = None
+    if args.trace:
+        from .trace import RecordingSource
+
+        source = recorder = RecordingSource(source, Path(args.trace))
+
+    if args.user or args.multi_user:
+        from .multiuser import MultiUserMonitor
+
+        limits = {}
+        for spec in args.user:
+            name, _, value = spec.partition("=")
+            limits[name] = parse_timedelta(value)
+        monitor = MultiUserMonitor(
+            limits,
+            default_limit=cfg.limit if args.multi_user else None,
+            warnings=cfg.warnings,
+            metrics=metrics,
+            store_kind=args.store,
+            sync_url=args.sync_url,
+            sync_token=args.sync_token,
+            # la entrada que ve el daemon no es la de cada usuario: solo CPU
+            activity=partial(activity, None) if activity else None,
+            source=source,
+            rules=cfg.rules,
+        )
+    else:
+        sync = None
+        if args.sync_url:
+            import getpass
+
+            from .sync import SyncClient
+
+            sync = SyncClient(
+                args.sync_url, args.account or getpass.getuser(), token=args.sync_token
+            )
+        from .status import StatusPublisher
+
+        monitor = Monitor(
+            cfg.limit,
+            warnings=cfg.warnings,
+            metrics=metrics,
+            sync=sync,
+            status=StatusPublisher(),
+            activity=activity(idle_after) if activity else None,
+            source=source,
+            rules=cfg.rules,
+        )
+    from .rpc import RpcServer
+
+    rpc = RpcServer(monitor).start()
+    monitor.apply_config(cfg)  # intervalos y usuarios de config.json
+    watcher.on_change = monitor.apply_config
+    watcher.start()
+
+    def shutdown():
+        watcher.close()
+        rpc.close()
+        monitor.close()
+        if recorder is not None:
+            recorder.close()
+        get_notifier().close()
+        events.close()  # el último: monitor.close() aún registra game_stop
+
+    install_shutdown_handlers(shutdown)
+    try:
+        monitor.loop()
+    finally:
+        watcher.close()
+        rpc.close()
+        get_notifier().close()
+
+
+def _format_state(state: dict) -> str:
+    from datetime import timedelta
+
+    remaining = timedelta(seconds=int(state["remaining"]))
+    used = timedelta(seconds=int(state["used"]))
+    line = f"Restante: {remaining}  Usado hoy: {used}"
+    if state.get("extra"):
+        line += f"  (+{timedelta(seconds=int(state['extra']))} extra)"
+    if state.get("games"):
+        line += f"  Jugando: {', '.join(state['games'])}"
+    elif not state.get("launcher_running"):
+        line += "  Sin lanzadores abiertos"
+    if "user" in state:
+        line = f"{state['user']}: {line}"
+    return line
+
+
+def show_replay(
+    path: Path, config: "str | None", overrides: dict, recorded_only: bool = False
+) -> int:
+    """``game-time-limiter replay --trace ARCHIVO``: uso, cierres y coste por tick."""
+    from datetime import datetime, timedelta
+
+    from .config import CONFIG_FILE, parse_config, read_config
+    from .trace import replay
+
+    try:
+        raw = read_config(Path(config) if config else CONFIG_FILE)
+        cfg = parse_config({**raw, **overrides})
+    except (ValueError, TypeError) as exc:
+        print(f"Configuración inválida: {exc}")
+        return 1
+    if not path.exists():
+        print(f"No existe la traza {path}")
+        return 1
+    result = replay(path, cfg, adaptive=not recorded_only)
+    span = result.end - result.start
+    print(
+        f"{result.ticks} ticks ({result.recorded} grabados, {result.restarts} reinicios): "
+        f"{timedelta(seconds=int(span))} simulados en {result.wall:.2f} s "
+        f"({result.ticks / max(result.wall, 1e-9):.0f} ticks/s)"
+    )
+    cost = result.cost_summary()
+    print(
+        f"Coste por tick: mediana {cost['median_ms']:.3f} ms, "
+        f"p95 {cost['p95_ms']:.3f} ms, máx {cost['max_ms']:.3f} ms"
+    )
+    print("Uso por día:")
+    for day, seconds in sorted(result.usage.items()):
+        print(f"  {day}  {timedelta(seconds=int(seconds))}")
+    print(f"Límite alcanzado en {result.limit_hits} ticks; {len(result.kills)} cierres:")
+    for ts, r in result.kills:
+        when = datetime.fromtimestamp(ts)
+        print(f"  [{when:%Y-%m-%d %H:%M:%S}] [{r.launcher}] {r.name} (PID {r.pid})")
+    return 0
+
+
+def show_report(args) -> int:
+    """``game-time-limiter report``: totales, medias, percentiles y rachas."""
+    from .config import CONFIG_FILE, parse_config, read_config
+
+    try:
+        from . import report  # lazy import (numpy)
+    except ImportError:
+        print("report necesita numpy: pip install game-time-limiter[report]")
+        return 1
+    try:
+        cfg = parse_config(read_config(Path(args.config) if args.config else CONFIG_FILE))
+    except (ValueError, TypeError) as exc:
+        print(f"Configuración inválida: {exc}")
+        return 1
+    limits = {name: value.total_seconds() for name, value in cfg.users.items()}
+    users = []
+    for spec in args.user:
+        name, _, value = spec.partition("=")
+        users.append(name)
+        if value:
+            limits[name] = parse_timedelta(value).total_seconds()
+    default = parse_timedelta(args.limit) if args.limit else cfg.limit
+    collector = Path(args.collector_state) if args.collector_state else None
+    try:
+        usage = report.load_histories(args.store, collector, users)
+        history = report.History.from_usage(usage, args.since, args.until)
+    except ValueError as exc:  # fecha mal escrita en --since/--until o en el historial
+        print(f"Historial o fechas inválidos: {exc}")
+        return 1
+    if not history.seconds.size and args.format == "table":
+        print("Sin historial de uso en ese intervalo.")
+        return 0
+    budgets = cfg.schedule.budgets if cfg.schedule is not None else None
+    day_limits = history.limits(default.total_seconds(), limits, budgets)
+    window = max(args.window, 1)
+    if args.period:
+        columns = report.PERIOD_COLUMNS
+        rows = history.period_rows(args.period, day_limits, window)
+    else:
+        columns = report.SUMMARY_COLUMNS
+        rows = history.summary_rows(day_limits, window)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        report.write_rows(columns, rows, args.format, out)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+def show_status(follow: bool = False, events: int = 0) -> int:
+    """``game-time-limiter status``: pregunta al daemon por la API local."""
+    from .rpc import RpcClient
+
+    try:
+        client = RpcClient()
+    except OSError:
+        print("No hay ningún daemon en marcha.")
+        return 1
+    try:
+        state = client.call("status")
+        for user, st in state.get("users", {}).items():
+            print(_format_state({**st, "user": user}))
+        if "users" not in state:
+            print(_format_state(state))
+        for ev in client.call("events", n=events) if events else ():
+            print(json.dumps(ev, ensure_ascii=False))
+        if follow:
+            for state in client.ticks():
+                print(_format_state(state))
+    except KeyboardInterrupt:
+        pass
+    except ConnectionError as exc:
+        print(f"Conexión perdida: {exc}")
+        return 1
+    finally:
+        client.close()
+    return 0
 
 
 if __name__ == "__main__":
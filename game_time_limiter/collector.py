@@ -0,0 +1,167 @@
+"""Colector de referencia para ``SyncClient`` (uso local / pruebas).
+
+Recibe lotes gzip de varias máquinas, los suma por cuenta y día (descartando
+lotes repetidos) y responde con el total de la cuenta y su límite, si tiene.
+
+```
+python -m game_time_limiter.collector --port 8765 --limit 2h --account alicia=90m
+game-time-limiter --sync-url http://127.0.0.1:8765 --account alicia
+```
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import os
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+from .utils import parse_timedelta
+
+SEEN_BATCHES = 10_000  # ids recordados por cuenta para descartar reenvíos
+HISTORY_DAYS = 14      # días devueltos en cada respuesta
+
+
+class Account:
+    def __init__(self):
+        self.used: Dict[str, float] = {}
+        self.seen: Set[str] = set()
+        self.order: Deque[str] = deque()
+
+    def merge(self, batch: dict) -> None:
+        if batch["batch"] in self.seen:
+            return  # reintento de un lote ya sumado
+        self.seen.add(batch["batch"])
+        self.order.append(batch["batch"])
+        if len(self.order) > SEEN_BATCHES:
+            self.seen.discard(self.order.popleft())
+        for day, seconds in batch["deltas"]:
+            self.used[day] = self.used.get(day, 0.0) + float(seconds)
+
+
+class Collector:
+    def __init__(
+        self,
+        state_file: Optional[Path] = None,
+        limits: Optional[Dict[str, float]] = None,
+        default_limit: Optional[float] = None,
+        token: Optional[str] = None,
+    ):
+        self.state_file = state_file
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.token = token
+        self.accounts: Dict[str, Account] = {}
+        self._lock = threading.Lock()
+        if state_file and state_file.exists():
+            for name, data in json.loads(state_file.read_text()).items():
+                acc = self.accounts[name] = Account()
+                acc.used = data["used"]
+                acc.order = deque(data.get("seen", []))
+                acc.seen = set(acc.order)
+
+    def state(self, name: str) -> dict:
+        acc = self.accounts.get(name) or Account()
+        days = sorted(acc.used)[-HISTORY_DAYS:]
+        return {
+            "account": name,
+            "used": {d: acc.used[d] for d in days},
+            "limit": self.limits.get(name, self.default_limit),
+        }
+
+    def merge(self, batch: dict) -> dict:
+        with self._lock:
+            self.accounts.setdefault(batch["account"], Account()).merge(batch)
+            self._save()
+            return self.state(batch["account"])
+
+    def _save(self) -> None:
+        if self.state_file is None:
+            return
+        data = {
+            name: {"used": acc.used, "seen": list(acc.order)}
+            for name, acc in self.accounts.items()
+        }
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.state_file)
+
+    def server(self, host: str, port: int) -> ThreadingHTTPServer:
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _account(self) -> Optional[str]:
+                url = urlparse(self.path)
+                if url.path.rstrip("/") != "/v1/usage":
+                    self.send_error(404)
+                    return None
+                if collector.token and self.headers.get("X-GTL-Token") != collector.token:
+                    self.send_error(403)
+                    return None
+                return parse_qs(url.query).get("account", [""])[0]
+
+            def _reply(self, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):  # noqa: N802
+                account = self._account()
+                if account is not None:
+                    with collector._lock:
+                        self._reply(collector.state(account))
+
+            def do_POST(self):  # noqa: N802
+                account = self._account()
+                if account is None:
+                    return
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    if self.headers.get("Content-Encoding") == "gzip":
+                        raw = gzip.decompress(raw)
+                    batch = json.loads(raw)
+                    batch["account"] = account or batch["account"]
+                except (OSError, ValueError, KeyError):
+                    self.send_error(400)
+                    return
+                self._reply(collector.merge(batch))
+
+            def log_message(self, fmt, *args):
+                print(f"[collector] {self.address_string()} {fmt % args}")
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Colector central de uso (referencia).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--state", default="collector-state.json", help="archivo de estado")
+    ap.add_argument("--limit", help="límite diario por defecto para todas las cuentas")
+    ap.add_argument("--account", action="append", default=[], metavar="NOMBRE=LÍMITE")
+    ap.add_argument("--token", help="exige este valor en la cabecera X-GTL-Token")
+    args = ap.parse_args()
+
+    limits = {}
+    for spec in args.account:
+        name, _, value = spec.partition("=")
+        limits[name] = parse_timedelta(value).total_seconds()
+    default = parse_timedelta(args.limit).total_seconds() if args.limit else None
+    collector = Collector(Path(args.state), limits, default, args.token)
+    httpd = collector.server(args.host, args.port)
+    print(f"Colector escuchando en http://{args.host}:{args.port}/v1/usage")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
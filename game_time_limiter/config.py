@@ -0,0 +1,253 @@
+"""``config.json`` compartido por la CLI, la GUI y el servicio, recargado en caliente.
+
+Claves (todas opcionales):
+
+```json
+{
+  "hours": 1, "minutes": 30,          // o "limit": "90m"
+  "warnings": ["15m", "5m", "1m"],
+  "poll": "5m", "idle_poll": "15m",
+  "users": {"alicia": "1h"},          // modo multiusuario
+  "schedule": {...},                  // ver schedule.py
+  "launchers": [...], "ignore": [...] // ver launchers.py
+}
+```
+
+``ConfigWatcher`` espera cambios en un hilo propio (inotify en Linux; si no,
+``stat`` cada pocos segundos comparando mtime/tamaño/inodo): el bucle del
+Monitor no paga nada por tick. Solo se vuelve a leer y validar el archivo
+cuando cambió, y la configuración nueva se aplica entera o no se aplica.
+"""
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import struct
+import sys
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from .launchers import CONFIG_FILE, LauncherRules, set_rules
+from .schedule import Schedule
+from .scheduler import IDLE_INTERVAL, POLL_INTERVAL, WARNING_THRESHOLDS
+from .utils import parse_timedelta
+
+DEFAULT_LIMIT = timedelta(hours=2)
+STAT_INTERVAL = 2.0   # s entre stat() sin inotify
+SETTLE = 0.1          # s: los editores escriben en varios pasos
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Config(NamedTuple):
+    limit: timedelta
+    warnings: Tuple[float, ...]
+    poll: float
+    idle: float
+    users: Dict[str, timedelta]
+    rules: LauncherRules
+    schedule: Optional[Schedule] = None
+
+
+def _duration(value, key: str) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        seconds = parse_timedelta(str(value)).total_seconds()
+    if seconds < 0:
+        raise ValueError(f"{key}: no puede ser negativo")
+    return seconds
+
+
+def parse_config(raw: dict) -> Config:
+    """Valida todo antes de devolver nada (ValueError con la clave culpable)."""
+    if not isinstance(raw, dict):
+        raise ValueError("se esperaba un objeto JSON")
+    if "limit" in raw:
+        limit = timedelta(seconds=_duration(raw["limit"], "limit"))
+    elif "hours" in raw or "minutes" in raw:
+        limit = timedelta(hours=int(raw.get("hours", 0)), minutes=int(raw.get("minutes", 0)))
+    else:
+        limit = DEFAULT_LIMIT
+    warnings = tuple(_duration(w, "warnings") for w in raw.get("warnings", WARNING_THRESHOLDS))
+    poll = _duration(raw.get("poll", POLL_INTERVAL), "poll")
+    idle = _duration(raw.get("idle_poll", IDLE_INTERVAL), "idle_poll")
+    if poll <= 0 or idle <= 0:
+        raise ValueError("poll / idle_poll deben ser positivos")
+    users = {
+        str(u): timedelta(seconds=_duration(v, f"users.{u}"))
+        for u, v in (raw.get("users") or {}).items()
+    }
+    try:
+        rules = LauncherRules.from_config(raw)
+    except (KeyError, TypeError, AttributeError, re.error) as exc:  # re.error: globs
+        raise ValueError(f"launchers: {exc!r}") from None
+    schedule = None
+    if raw.get("schedule"):
+        try:
+            schedule = Schedule.from_config(raw["schedule"])
+        except (KeyError, TypeError, AttributeError) as exc:
+            raise ValueError(f"schedule: {exc!r}") from None
+    return Config(limit, warnings, poll, idle, users, rules, schedule)
+
+
+def read_config(path: Path = CONFIG_FILE) -> dict:
+    """Contenido crudo ({} si no existe); ValueError si el JSON está roto."""
+    try:
+        cfg = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except OSError as exc:
+        raise ValueError(str(exc)) from None
+    if not isinstance(cfg, dict):
+        raise ValueError("se esperaba un objeto JSON")
+    return cfg
+
+
+def load_config(path: Path = CONFIG_FILE) -> dict:
+    """Como ``read_config`` pero sin fallar (la GUI arranca aunque esté roto)."""
+    try:
+        return read_config(path)
+    except ValueError as exc:
+        print(f"[WARN] {path.name} ilegible ({exc})")
+        return {}
+
+
+def save_config(cfg: dict, path: Path = CONFIG_FILE) -> None:
+    """Escritura atómica: quien vigila nunca ve el archivo a medias."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(cfg, indent=2))
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------------------------- #
+# Vigilancia
+# --------------------------------------------------------------------------- #
+def _inotify_fd(directory: Path) -> Optional[int]:
+    """fd no bloqueante que vigila ``directory`` (None si no hay inotify)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        # se vigila el directorio: save_config y muchos editores sustituyen el archivo
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher:
+    """Hilo que llama a ``on_change(Config)`` cada vez que el archivo cambia.
+
+    ``overrides`` se superpone al archivo (p. ej. ``--limit`` en la CLI fija
+    el límite aunque ``config.json`` diga otro).
+    """
+
+    def __init__(
+        self,
+        on_change: Optional[Callable[[Config], None]] = None,
+        path: Path = CONFIG_FILE,
+        overrides: Optional[dict] = None,
+        use_inotify: bool = True,
+    ):
+        self.on_change = on_change  # normalmente Monitor.apply_config
+        self.path = path
+        self.overrides = overrides or {}
+        self._fd = _inotify_fd(path.parent) if use_inotify else None
+        self.backend = "inotify" if self._fd is not None else "stat"
+        self._key = self._stat_key()
+        self.current = self._parse() or parse_config(dict(self.overrides))
+        set_rules(self.current.rules)
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="config", daemon=True)
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _parse(self) -> Optional[Config]:
+        try:
+            return parse_config({**read_config(self.path), **self.overrides})
+        except (ValueError, TypeError) as exc:
+            print(f"[WARN] {self.path.name} inválido ({exc}); se mantiene la configuración")
+            return None
+
+    def check(self) -> bool:
+        """Relee si cambió mtime/tamaño/inodo; True si se aplicó algo nuevo."""
+        key = self._stat_key()
+        if key == self._key:
+            return False
+        self._key = key  # también si es inválido: no se reintenta hasta otro cambio
+        cfg = self._parse()
+        if cfg is None:
+            return False
+        self.current = cfg
+        set_rules(cfg.rules)
+        if self.on_change is not None:
+            self.on_change(cfg)
+        return True
+
+    def start(self) -> "ConfigWatcher":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        name = os.fsencode(self.path.name)
+        while not self._stop.is_set():
+            if self._fd is None:
+                self._stop.wait(STAT_INTERVAL)
+                if not self._stop.is_set():
+                    self.check()
+                continue
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+            if self._wake_r in ready:
+                break
+            if self._drain(self._fd, name):
+                self._stop.wait(SETTLE)
+                self.check()
+
+    def _drain(self, fd: int, name: bytes) -> bool:
+        """Lee los eventos pendientes; True si alguno es de nuestro archivo."""
+        hit = False
+        while True:
+            try:
+                buf = os.read(fd, 4096)
+            except BlockingIOError:
+                return hit
+            offset = 0
+            while offset < len(buf):
+                _, _, _, length = _EVENT.unpack_from(buf, offset)
+                start = offset + _EVENT.size
+                hit |= buf[start:start + length].rstrip(b"\0") == name
+                offset = start + length
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        os.write(self._wake_w, b"x")
+        if self._thread.is_alive():
+            self._thread.join(timeout=1)
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._fd = None
@@ -0,0 +1,168 @@
+"""Registro estructurado de eventos: JSONL con rotación + consola + memoria reciente.
+
+Eventos: ``game_start``, ``game_stop``, ``tick``, ``limit_reached``,
+``kill_result`` y ``day_reset``. Cada uno es un objeto JSON por línea con
+``ts``, ``event`` y sus campos.
+
+El bucle del Monitor solo encola (``emit`` no toca disco ni consola): un hilo
+de ``logging.handlers.QueueListener`` escribe el archivo (rotación por tamaño
+o por tiempo), la consola y un anillo con los últimos eventos que la API local
+devuelve a la GUI y a los clientes (``events`` en rpc.py).
+"""
+from __future__ import annotations
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from .persistence import PROJECT_ROOT
+
+EVENT_LOG = PROJECT_ROOT / "events.jsonl"
+MAX_BYTES = 5 * 1024 * 1024   # rotación por tamaño (si no se pide por tiempo)
+BACKUPS = 5
+RING_SIZE = 500               # eventos recientes en memoria
+QUEUE_SIZE = 10_000           # si el escritor no da abasto se descartan (y se cuentan)
+
+EVENTS = ("game_start", "game_stop", "tick", "limit_reached", "kill_result", "day_reset")
+
+
+def _event(record: logging.LogRecord) -> dict:
+    return record.__dict__["event"]  # campo extra que pone ``makeLogRecord`` en emit()
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(_event(record), ensure_ascii=False, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Las mismas líneas que imprimía el Monitor."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ev = _event(record)
+        clock = datetime.fromtimestamp(ev["ts"]).strftime("%H:%M:%S")
+        who = f"{ev['user']}: " if ev.get("user") else ""
+        kind = ev["event"]
+        if kind == "tick":
+            return f"[{clock}] {who}Tiempo restante: {timedelta(seconds=int(ev['remaining']))}"
+        if kind == "game_start":
+            return f"[{clock}] {who}Juego iniciado: {ev['name']} (PID {ev['pid']})"
+        if kind == "game_stop":
+            played = timedelta(seconds=int(ev["duration"]))
+            return f"[{clock}] {who}Juego cerrado: {ev['name']} (PID {ev['pid']}) tras {played}"
+        if kind == "limit_reached":
+            return f"{who}Tiempo agotado. Cerrando juegos y lanzadores…"
+        if kind == "kill_result":
+            return (
+                f"  [{ev['launcher']}] {ev['name']} (PID {ev['pid']}): "
+                f"{ev['outcome']} en {ev['latency']:.2f} s"
+            )
+        if kind == "day_reset":
+            return f"[{clock}] {who}Nuevo día: {ev['day']}"
+        return f"[{clock}] {who}{kind}: {ev}"
+
+
+class _RingHandler(logging.Handler):
+    def __init__(self, ring: Deque[dict]):
+        super().__init__()
+        self.ring = ring
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.ring.append(_event(record))
+
+
+class EventLog:
+    """``emit(evento, **campos)`` encola; el resto ocurre en otro hilo.
+
+    ``path=None`` no escribe archivo; ``rotate_when`` (``"midnight"``, ``"H"``…)
+    rota por tiempo en lugar de por tamaño.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = EVENT_LOG,
+        console: bool = True,
+        max_bytes: int = MAX_BYTES,
+        backups: int = BACKUPS,
+        rotate_when: Optional[str] = None,
+        ring_size: int = RING_SIZE,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        self.ring: Deque[dict] = deque(maxlen=ring_size)
+        self.dropped = 0
+        self._queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+        handlers: List[logging.Handler] = [_RingHandler(self.ring)]
+        if path is not None:
+            if rotate_when:
+                fh: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+                    path, when=rotate_when, backupCount=backups, encoding="utf-8"
+                )
+            else:
+                fh = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+                )
+            fh.setFormatter(_JsonFormatter())
+            handlers.append(fh)
+        if console:
+            ch = logging.StreamHandler(sys.stdout)
+            ch.setFormatter(_ConsoleFormatter())
+            handlers.append(ch)
+        self._handlers = handlers
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers)
+        self._listener.start()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def emit(self, event: str, **fields) -> None:
+        """Camino caliente: un dict, un LogRecord y ``put_nowait``."""
+        fields["ts"] = time.time()
+        fields["event"] = event
+        record = logging.makeLogRecord({"msg": event, "event": fields})
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def recent(self, n: Optional[int] = 50, event: Optional[str] = None) -> List[dict]:
+        """Últimos ``n`` eventos (todos si None; de un tipo, si se indica), en orden."""
+        items = list(self.ring)  # copia: el hilo escritor sigue añadiendo
+        if event is not None:
+            items = [ev for ev in items if ev["event"] == event]
+        if n is None:
+            return items
+        return items[-n:] if n > 0 else []
+
+    def close(self) -> None:
+        """Escribe lo pendiente y cierra el archivo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._listener.stop()
+        for handler in self._handlers:
+            handler.close()
+
+
+# --------------------------------------------------------------------------- #
+# Registro del proceso (como get_store en persistence)
+# --------------------------------------------------------------------------- #
+_log: Optional[EventLog] = None
+
+
+def get_event_log() -> EventLog:
+    global _log
+    if _log is None:
+        _log = EventLog()
+    return _log
+
+
+def set_event_log(log: EventLog) -> None:
+    global _log
+    _log = log
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Optional, Set
+
+import psutil
+
+# --------------------------------------------------------------------------- #
+# Eventos de procesos (exec / exit) para no depender de un poll fijo
+# --------------------------------------------------------------------------- #
+
+
+class ProcessEvent(NamedTuple):
+    kind: str                   # "fork" | "exec" | "exit"
+    pid: int
+    ppid: Optional[int] = None  # padre, si la fuente lo conoce
+    name: Optional[str] = None  # nombre tras el exec (en minúsculas)
+
+
+def _exec_event(pid: int) -> ProcessEvent:
+    try:
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            return ProcessEvent("exec", pid, proc.ppid(), proc.name().lower())
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return ProcessEvent("exec", pid)
+
+
+class ProcessEventSource:
+    """Interfaz: ``wait`` bloquea hasta ``timeout`` s y devuelve los eventos vistos."""
+
+    name = "base"
+
+    def wait(self, timeout: float) -> List[ProcessEvent]:
+        raise NotImplementedError
+
+    def wake(self) -> None:
+        """Desde otro hilo: hace volver a ``wait`` antes de tiempo."""
+
+    def close(self) -> None:
+        pass
+
+
+class PsutilDiffSource(ProcessEventSource):
+    """Fallback portable: compara ``psutil.pids()`` cada ``interval`` segundos."""
+
+    name = "psutil"
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._pids: Set[int] = set(psutil.pids())
+        self._woken = threading.Event()
+
+    def wait(self, timeout: float) -> List[ProcessEvent]:
+        deadline = time.monotonic() + timeout
+        while True:
+            pids = set(psutil.pids())
+            events = [_exec_event(pid) for pid in pids - self._pids]
+            events += [ProcessEvent("exit", pid) for pid in self._pids - pids]
+            self._pids = pids
+            left = deadline - time.monotonic()
+            if events or left <= 0 or self._woken.is_set():
+                self._woken.clear()
+                return events
+            self._woken.wait(min(self.interval, left))
+
+    def wake(self) -> None:
+        self._woken.set()
+
+
+class NetlinkProcSource(ProcessEventSource):
+    """Linux: conector de procesos vía netlink (requiere CAP_NET_ADMIN).
+
+    El kernel empuja fork/exec/exit al instante, sin recorrer ``/proc``.
+    """
+
+    name = "netlink"
+
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    NLMSG_DONE = 3
+    PROC_CN_MCAST_LISTEN = 1
+
+    PROC_EVENT_FORK = 0x00000001
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_EXIT = 0x80000000
+
+    _NLMSGHDR = struct.Struct("=IHHII")     # len, type, flags, seq, pid
+    _CN_MSG = struct.Struct("=IIIIHH")      # idx, val, seq, ack, len, flags
+    _EVENT_HDR = struct.Struct("=IIQ")      # what, cpu, timestamp_ns
+    _FORK = struct.Struct("=IIII")          # parent pid/tgid, child pid/tgid
+    _EXEC = struct.Struct("=II")            # pid, tgid
+    _EXIT = struct.Struct("=IIII")          # pid, tgid, exit_code, exit_signal
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, self.CN_IDX_PROC))
+            op = struct.pack("=I", self.PROC_CN_MCAST_LISTEN)
+            cn = self._CN_MSG.pack(self.CN_IDX_PROC, self.CN_VAL_PROC, 0, 0, len(op), 0)
+            total = self._NLMSGHDR.size + len(cn) + len(op)
+            hdr = self._NLMSGHDR.pack(total, self.NLMSG_DONE, 0, 0, os.getpid())
+            self.sock.send(hdr + cn + op)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    def wait(self, timeout: float) -> List[ProcessEvent]:
+        events: List[ProcessEvent] = []
+        ready, _, _ = select.select([self.sock, self._wake_r], [], [], max(timeout, 0))
+        if self._wake_r in ready:
+            try:
+                self._wake_r.recv(64)
+            except BlockingIOError:
+                pass
+        while self.sock in ready:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            events.extend(self._parse(data))
+        return events
+
+    def _parse(self, data: bytes) -> List[ProcessEvent]:
+        events: List[ProcessEvent] = []
+        offset = 0
+        while offset + self._NLMSGHDR.size <= len(data):
+            msg_len = self._NLMSGHDR.unpack_from(data, offset)[0]
+            if msg_len < self._NLMSGHDR.size:
+                break
+            ev = offset + self._NLMSGHDR.size + self._CN_MSG.size
+            if ev + self._EVENT_HDR.size <= offset + msg_len:
+                what = self._EVENT_HDR.unpack_from(data, ev)[0]
+                body = ev + self._EVENT_HDR.size
+                if what == self.PROC_EVENT_FORK:
+                    ppid, _, pid, tgid = self._FORK.unpack_from(data, body)
+                    if pid == tgid:  # ignorar hilos
+                        events.append(ProcessEvent("fork", pid, ppid))
+                elif what == self.PROC_EVENT_EXEC:
+                    pid, _ = self._EXEC.unpack_from(data, body)
+                    events.append(_exec_event(pid))
+                elif what == self.PROC_EVENT_EXIT:
+                    pid, tgid, _, _ = self._EXIT.unpack_from(data, body)
+                    if pid == tgid:
+                        events.append(ProcessEvent("exit", pid))
+            offset += (msg_len + 3) & ~3  # NLMSG_ALIGN
+        return events
+
+    def wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # ya hay un aviso pendiente o la fuente está cerrada
+
+    def close(self) -> None:
+        self.sock.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+def default_source() -> ProcessEventSource:
+    """Netlink en Linux si hay permisos; si no, diff de psutil."""
+    if sys.platform.startswith("linux"):
+        try:
+            return NetlinkProcSource()
+        except (OSError, AttributeError):
+            pass
+    return PsutilDiffSource()
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import json
+import getpass
+import subprocess
 import sys
 from datetime import timedelta
-from datetime import date      
-from pathlib import Path
 
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QTimer
+from PySide6.QtCore import Qt, Slot, QTimer
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -21,15 +20,15 @@ from PySide6.QtWidgets import (
     QStyle,
 )
 
-from game_time_limiter.monitor import Monitor, DEFAULT_LIMIT
-from game_time_limiter.utils import parse_timedelta
-from game_time_limiter.monitor import POLL_INTERVAL
+from game_time_limiter import config
+from game_time_limiter.status import StatusReader, status_path
+
+REFRESH_MS = 1000  # repintado de la cuenta atrás (lectura de memoria, sin escanear)
+STOP_TIMEOUT_MS = 10_000  # margen para volcar el uso antes de forzar el cierre
 
 # ------------------------------------------------------------------ #
-# Configuración persistente
+# Configuración persistente (el daemon la recarga en caliente)
 # ------------------------------------------------------------------ #
-CONFIG_FILE = Path(__file__).resolve().parent.parent / "config.json"
-
 DEFAULT_CONF = {
     "hours": 2,
     "minutes": 0,
@@ -37,35 +36,19 @@ DEFAULT_CONF = {
 }
 
 def load_config() -> dict:
-    if CONFIG_FILE.exists():
-        try:
-            return {**DEFAULT_CONF, **json.loads(CONFIG_FILE.read_text())}
-        except json.JSONDecodeError:
-            pass
-    return DEFAULT_CONF.copy()
+    return {**DEFAULT_CONF, **config.load_config()}
 
 def save_config(cfg: dict) -> None:
-    CONFIG_FILE.write_text(json.dumps(cfg, indent=2))
+    config.save_config(cfg)
 
 
 # ------------------------------------------------------------------ #
-# Hilo que ejecuta el Monitor sin bloquear la UI
+# Estado del daemon (la GUI no escanea procesos)
 # ------------------------------------------------------------------ #
-class Worker(QThread):
-    tick = Signal(int)  # segundos restantes
-
-    def __init__(self, limit: timedelta):
-        super().__init__()
-        self.monitor = Monitor(limit)
-
-    def run(self):
-        while True:
-            self.monitor.loop_step()
-            remaining = int(
-                self.monitor.limit.total_seconds() - self.monitor.usage[self.monitor.today]
-            )
-            self.tick.emit(max(remaining, 0))
-            self.msleep(5000) 
+def open_reader() -> StatusReader:
+    """Bloque del usuario actual si el daemon corre en modo multiusuario."""
+    user = status_path(getpass.getuser().lower())
+    return StatusReader(user if user.exists() else status_path())
 
 
 # ------------------------------------------------------------------ #
@@ -85,6 +68,10 @@ class MainWindow(QMainWindow):
         self.spin_hours.setValue(self.cfg["hours"])
         self.spin_mins.setValue(self.cfg["minutes"])
         self.auto_cb.setChecked(self.cfg["auto_start"])
+        # guardar al cambiar: un daemon en marcha aplica el nuevo límite al momento
+        self.spin_hours.valueChanged.connect(self.save)
+        self.spin_mins.valueChanged.connect(self.save)
+        self.auto_cb.toggled.connect(self.save)
 
         form = QFormLayout()
         form.addRow("Horas:", self.spin_hours)
@@ -95,21 +82,6 @@ class MainWindow(QMainWindow):
         self.button = QPushButton("Iniciar")
         self.button.clicked.connect(self.toggle)
         
-        # --- crea el icono de bandeja ANTES de update_time ---
-        self.tray = QSystemTrayIcon(
-            self.style().standardIcon(QStyle.SP_ComputerIcon), self
-        )
-        self.tray.setToolTip("Game Time Limiter")
-        self.tray.show()
-        # ------------------------------------------------------------------
-        #  ▼  NUEVO bloque – calcula y pinta el tiempo restante al arrancar
-        # ------------------------------------------------------------------
-        today_key = date.today().isoformat()                 # "2025-05-22"
-        already_played = Monitor().usage.get(today_key, 0)   # segundos acumulados
-        initial_remaining = int(DEFAULT_LIMIT.total_seconds() - already_played)
-        self.update_time(initial_remaining)                  # muestra en la etiqueta
-        
-
         layout = QVBoxLayout()
         layout.addLayout(form)
         layout.addWidget(self.label)
@@ -126,7 +98,12 @@ class MainWindow(QMainWindow):
         self.tray.setToolTip("Game Time Limiter")
         self.tray.show()
 
-        self.worker: Worker | None = None
+        self.reader = open_reader()
+        self.daemon: subprocess.Popen | None = None  # solo si lo lanzamos nosotros
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_MS)
+        self.refresh()
 
         # Auto-start si la casilla está marcada
         if self.auto_cb.isChecked():
@@ -138,16 +115,50 @@ class MainWindow(QMainWindow):
                          minutes=self.spin_mins.value())
 
     def toggle(self):
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker = None
-            self.button.setText("Iniciar")
-            return
+        """Lanza el daemon con el límite elegido, o para el que lanzamos."""
+        if self.daemon and self.daemon.poll() is None:
+            self.stop_daemon()
+        else:
+            status = self.reader.read()
+            if status is not None and not status.stale():
+                return  # ya hay un daemon (p. ej. el servicio); solo lo mostramos
+            self.save()  # el daemon toma el límite de config.json
+            self.daemon = subprocess.Popen([sys.executable, "-m", "game_time_limiter.cli"])
+        self.refresh()
+
+    def stop_daemon(self):
+        """Pide la parada por la API local y fuerza solo si no llega a tiempo.
+
+        ``terminate()`` en Windows es TerminateProcess: ningún manejador corre
+        y se perdería el uso aún sin volcar.
+        """
+        proc, self.daemon = self.daemon, None
+        from game_time_limiter.rpc import RpcClient, RpcError  # lazy import
 
-        self.worker = Worker(self.build_limit())
-        self.worker.tick.connect(self.update_time)
-        self.worker.start()
-        self.button.setText("Detener")
+        try:
+            client = RpcClient()
+            try:
+                client.call("shutdown", token=RpcClient.read_token())
+            finally:
+                client.close()
+        except (OSError, RpcError) as exc:
+            print(f"[WARN] No se pudo parar el daemon por la API local ({exc}); se fuerza")
+            proc.terminate()
+            return
+        QTimer.singleShot(STOP_TIMEOUT_MS, lambda: proc.poll() is None and proc.terminate())
+
+    @Slot()
+    def refresh(self):
+        status = self.reader.read()
+        running = status is not None and not status.stale()
+        own = self.daemon is not None and self.daemon.poll() is None
+        self.button.setText("Detener" if own else "Iniciar")
+        self.button.setEnabled(own or not running)
+        if not running:
+            self.label.setText("Daemon no activo" if not own else "Arrancando…")
+            self.tray.setToolTip("Game Time Limiter: daemon no activo")
+            return
+        self.update_time(int(status.remaining_now()))
 
     @Slot(int)
     def update_time(self, seconds: int):
@@ -157,14 +168,21 @@ class MainWindow(QMainWindow):
         self.label.setText(f"Tiempo restante: {text}")
         self.tray.setToolTip(f"Tiempo restante: {text}")
 
-    # -------- persistencia al cerrar --------
-    def closeEvent(self, event):
+    # -------- persistencia --------
+    @Slot()
+    def save(self):
+        self.cfg = load_config()  # relee: no pisar lo editado a mano (launchers…)
         self.cfg.update(
             hours=self.spin_hours.value(),
             minutes=self.spin_mins.value(),
             auto_start=self.auto_cb.isChecked(),
         )
+        self.cfg.pop("limit", None)  # "limit" manda sobre horas/minutos
         save_config(self.cfg)
+
+    def closeEvent(self, event):
+        self.save()
+        self.reader.close()  # el daemon sigue corriendo sin la ventana
         super().closeEvent(event)
 
 
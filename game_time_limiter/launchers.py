@@ -0,0 +1,276 @@
+"""Reglas de lanzadores: qué procesos son lanzadores, juegos o ayudantes.
+
+Se leen de la clave ``"launchers"`` de ``config.json`` (cada entrada sustituye
+a la predefinida del mismo nombre) y ``"ignore"`` añade nombres o globs a
+``DEFAULT_IGNORE``, que nunca cuentan como juego:
+
+```json
+{
+  "launchers": [
+    {"name": "custom", "games": ["minecraft*.exe", "osu!.exe"], "close_launcher": false},
+    {"name": "itch", "roots": ["itch.exe"], "paths": ["C:/Games/itch/"]}
+  ],
+  "ignore": ["crashreporter*.exe"]
+}
+```
+
+Campos de un lanzador: ``roots`` (nombres del proceso lanzador: todo lo que
+cuelga de él es juego), ``helpers`` (procesos propios que no son juego y se
+cierran con el lanzador aunque estén sueltos; admiten globs), ``games``
+(nombres o globs que son juego aunque no cuelguen de nada), ``paths``
+(prefijos de ruta del ejecutable), ``order`` (``"games-first"`` o
+``"launcher-first"``) y ``close_launcher``.
+
+Todo se compila una vez: nombres exactos en diccionarios, globs en una sola
+regex con un grupo por lanzador y rutas en un trie por componentes, así que
+clasificar un proceso no depende del número de reglas.
+"""
+from __future__ import annotations
+import fnmatch
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+from .persistence import PROJECT_ROOT
+
+CONFIG_FILE = PROJECT_ROOT / "config.json"
+NAME_CACHE_MAX = 50_000  # nombres distintos memorizados antes de vaciar la caché
+
+GAMES_FIRST = "games-first"
+LAUNCHER_FIRST = "launcher-first"
+
+# Nunca son el juego aunque cuelguen de un lanzador: runtimes de Steam/Proton,
+# Wine y envoltorios de Lutris. Solo se cierran si están en el árbol de uno.
+DEFAULT_IGNORE = [
+    "reaper", "pressure-vessel-*", "srt-bwrap", "steam-runtime-*", "pv-adverb",
+    "proton", "lutris-wrapper*", "umu-run",
+    "wineserver", "wine-preloader", "wine64-preloader", "winedevice.exe",
+    "services.exe", "plugplay.exe", "rpcss.exe", "svchost.exe", "explorer.exe",
+    "conhost.exe", "start.exe", "tabtip.exe", "winedbg.exe",
+]
+
+# ``helpers`` se cierran junto al lanzador aunque estén huérfanos: solo
+# nombres propios de cada lanzador, nunca genéricos.
+DEFAULT_LAUNCHERS: List[dict] = [
+    {
+        "name": "steam",
+        "roots": ["steam.exe", "steam"],
+        "helpers": [
+            "steamwebhelper.exe", "steamwebhelper", "gameoverlayui.exe",
+            "steamerrorreporter.exe", "steamerrorreporter64.exe",
+        ],
+    },
+    {
+        "name": "epic",
+        "roots": ["epicgameslauncher.exe"],
+        "helpers": ["epicwebhelper.exe", "epiconlineservices*.exe"],
+    },
+    {
+        "name": "gog",
+        "roots": ["galaxyclient.exe"],
+        "helpers": [
+            "galaxyclient helper.exe", "galaxycommunication.exe",
+            "gog galaxy notifications renderer.exe",
+        ],
+    },
+    {
+        "name": "battlenet",
+        "roots": ["battle.net.exe"],
+        "helpers": ["battle.net helper.exe", "blizzarderror.exe"],
+    },
+    {
+        "name": "lutris",
+        "roots": ["lutris"],
+    },
+]
+
+
+class Launcher(NamedTuple):
+    name: str
+    roots: Tuple[str, ...] = ()
+    helpers: Tuple[str, ...] = ()
+    games: Tuple[str, ...] = ()
+    paths: Tuple[str, ...] = ()
+    order: str = GAMES_FIRST
+    close_launcher: bool = True
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Launcher":
+        order = data.get("order", GAMES_FIRST)
+        if order not in (GAMES_FIRST, LAUNCHER_FIRST):
+            raise ValueError(f"lanzador {data.get('name')!r}: order inválido {order!r}")
+        return cls(
+            name=str(data["name"]).lower(),
+            roots=tuple(n.lower() for n in data.get("roots", ())),
+            helpers=tuple(n.lower() for n in data.get("helpers", ())),
+            games=tuple(n.lower() for n in data.get("games", ())),
+            paths=tuple(data.get("paths", ())),
+            order=order,
+            close_launcher=bool(data.get("close_launcher", True)),
+        )
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def _normpath(path: str) -> List[str]:
+    return [part for part in path.replace("\\", "/").lower().split("/") if part]
+
+
+class _PathTrie:
+    """Prefijos de ruta por componentes; devuelve el lanzador del más largo."""
+
+    def __init__(self):
+        self.root: dict = {}
+
+    def add(self, prefix: str, launcher: str) -> None:
+        node = self.root
+        for part in _normpath(prefix):
+            node = node.setdefault(part, {})
+        node[None] = launcher
+
+    def match(self, path: str) -> Optional[str]:
+        node, found = self.root, None
+        for part in _normpath(path):
+            child = node.get(part)
+            if child is None:
+                break
+            node = child
+            found = node.get(None, found)
+        return found
+
+    def __bool__(self) -> bool:
+        return bool(self.root)
+
+
+class _NameSet:
+    """Nombres exactos en un dict + globs en una única regex con grupos ``_lN``.
+
+    ``fnmatch.translate`` de Python 3.10 emite sus propios grupos ``gN``: los
+    nuestros llevan otro prefijo para no redefinirlos.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self.exact: Dict[str, str] = {}
+        groups: Dict[str, List[str]] = {}
+        for pattern, launcher in entries:
+            if _is_glob(pattern):
+                groups.setdefault(launcher, []).append(fnmatch.translate(pattern))
+            else:
+                self.exact.setdefault(pattern, launcher)
+        self.group_launcher: Dict[str, str] = {
+            f"_l{i}": launcher for i, launcher in enumerate(groups)
+        }
+        self.regex: Optional[Pattern[str]] = None
+        if groups:
+            self.regex = re.compile(
+                "|".join(f"(?P<_l{i}>{'|'.join(pats)})" for i, pats in enumerate(groups.values()))
+            )
+
+    def match(self, name: str) -> Optional[str]:
+        hit = self.exact.get(name)
+        if hit is None and self.regex is not None:
+            m = self.regex.match(name)
+            if m is not None and m.lastgroup is not None:
+                # el grupo externo cierra el último: ``lastgroup`` es el nuestro
+                hit = self.group_launcher.get(m.lastgroup)
+        return hit
+
+
+class LauncherRules:
+    """Reglas compiladas; ``classify`` da ``(raíz, juego, ignorado)`` por nombre."""
+
+    def __init__(self, launchers: Iterable[Launcher], ignore: Iterable[str] = ()):
+        self.launchers: Dict[str, Launcher] = {l.name: l for l in launchers}
+        self._roots: Dict[str, str] = {}
+        for l in self.launchers.values():
+            for root in l.roots:
+                self._roots.setdefault(root, l.name)
+        self._games = _NameSet((g, l.name) for l in self.launchers.values() for g in l.games)
+        self._helpers = _NameSet(
+            [(h, l.name) for l in self.launchers.values() for h in l.helpers]
+            + [(i.lower(), "") for i in ignore]  # "" = ignorado sin lanzador
+        )
+        self._paths = _PathTrie()
+        for l in self.launchers.values():
+            for prefix in l.paths:
+                self._paths.add(prefix, l.name)
+        self._names: Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        # "exe" cuesta una lectura más por proceso: solo si hay reglas de ruta
+        self.needs_exe = bool(self._paths)
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "LauncherRules":
+        merged = {d["name"].lower(): d for d in DEFAULT_LAUNCHERS}
+        for entry in cfg.get("launchers", ()):
+            merged[str(entry["name"]).lower()] = entry
+        ignore = [*DEFAULT_IGNORE, *cfg.get("ignore", ())]
+        return cls((Launcher.from_dict(d) for d in merged.values()), ignore)
+
+    def classify(self, name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """``(lanzador si es raíz, lanzador si es juego por nombre, lanzador si es ayudante)``.
+
+        Memorizado por nombre: los nombres se repiten mucho entre procesos y ticks.
+        """
+        hit = self._names.get(name)
+        if hit is None:
+            if len(self._names) >= NAME_CACHE_MAX:
+                self._names.clear()
+            hit = self._names[name] = (
+                self._roots.get(name),
+                self._games.match(name),
+                self._helpers.match(name),
+            )
+        return hit
+
+    def root(self, name: str) -> Optional[str]:
+        return self.classify(name)[0]
+
+    def ignored(self, name: str) -> bool:
+        return self.classify(name)[2] is not None
+
+    def match(self, name: str, exe: Optional[str] = None) -> Optional[str]:
+        """Juego por nombre o por ruta del ejecutable, sin mirar ancestros."""
+        root, game, helper = self.classify(name)
+        if root is not None or helper is not None:
+            return None
+        if game is None and exe and self._paths:
+            game = self._paths.match(exe)
+        return game
+
+    def relevant(self, name: Optional[str]) -> bool:
+        """¿Un exec con este nombre merece re-escanear (lanzador o juego suelto)?"""
+        if not name:
+            return False
+        root, game, _ = self.classify(name)
+        return root is not None or game is not None
+
+
+def load_rules(path: Path = CONFIG_FILE) -> LauncherRules:
+    cfg = {}
+    if path.exists():
+        try:
+            cfg = json.loads(path.read_text())
+        except ValueError as exc:
+            print(f"[WARN] {path.name} ilegible ({exc}); reglas por defecto")
+    return LauncherRules.from_config(cfg)
+
+
+# --------------------------------------------------------------------------- #
+# Reglas activas del proceso (como get_store en persistence)
+# --------------------------------------------------------------------------- #
+_rules: Optional[LauncherRules] = None
+
+
+def get_rules() -> LauncherRules:
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    return _rules
+
+
+def set_rules(rules: LauncherRules) -> None:
+    global _rules
+    _rules = rules
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:  # http.server se importa en serve()
+    from http.server import ThreadingHTTPServer
+
+# --------------------------------------------------------------------------- #
+# Métricas del loop: histogramas por fase + contadores, formato Prometheus
+# --------------------------------------------------------------------------- #
+PREFIX = "gtl"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL = 15.0  # s entre escrituras del textfile
+
+COUNTERS = {
+    "ticks_total": "Pasos del Monitor ejecutados",
+    "processes_scanned_total": "Procesos leídos de la tabla de procesos",
+    "games_detected_total": "Juegos nuevos detectados",
+    "kills_issued_total": "Procesos a los que se envió terminate/kill",
+    "kill_failures_total": "Procesos que sobrevivieron o denegaron el cierre",
+}
+
+
+class Histogram:
+    """Buckets fijos: ``observe`` es un bisect y dos sumas."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # último = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Tiempos por fase (scan, classify, account, persist, kill) y contadores.
+
+    Desactivado, ``phase`` devuelve siempre el mismo context manager vacío e
+    ``inc`` retorna al primer ``if``: el coste es prácticamente nulo.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = dict.fromkeys(COUNTERS, 0)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._halt = threading.Event()
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        hist = self.phases.get(name)
+        if hist is None:
+            hist = self.phases[name] = Histogram()
+        return _Timer(hist)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # ----------------------------- exportación ----------------------------- #
+    def render(self) -> str:
+        lines = []
+        for name, value in self.counters.items():
+            lines.append(f"# HELP {PREFIX}_{name} {COUNTERS.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            lines.append(f"{PREFIX}_{name} {value}")
+        metric = f"{PREFIX}_phase_seconds"
+        lines.append(f"# HELP {metric} Duración de cada fase del loop")
+        lines.append(f"# TYPE {metric} histogram")
+        for phase, hist in sorted(self.phases.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), hist.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {hist.sum}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Formato textfile (node_exporter): escritura atómica."""
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> Tuple[str, int]:
+        """Expone ``/metrics`` por HTTP en un hilo aparte."""
+        # lazy import: http.server (email, http.client…) encarece el arranque del daemon
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        address, bound = self._server.server_address[:2]
+        return str(address), bound
+
+    def export_textfile(self, path: Path, interval: float = EXPORT_INTERVAL) -> None:
+        """Reescribe ``path`` cada ``interval`` s desde un hilo (nunca en el loop)."""
+
+        def run():
+            while not self._halt.wait(interval):
+                try:
+                    self.write_textfile(path)
+                except OSError as exc:
+                    print(f"[WARN] No se pudo escribir {path}: {exc}")
+
+        threading.Thread(target=run, name="metrics-textfile", daemon=True).start()
+
+    def close(self) -> None:
+        self._halt.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+NULL_METRICS = Metrics(enabled=False)
@@ -1,90 +1,497 @@
 from __future__ import annotations
+import contextlib
+import threading
 import time
 from datetime import date, datetime, timedelta
-from typing import Set
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import psutil
 
-from .persistence import load_usage, save_usage
-from .process_utils import is_game, kill_steam_and_games
-from .notifier import notify
-from .utils import parse_timedelta
-from datetime import date
-from .persistence import load_usage, save_usage
+from .checkpoint import MAX_STALENESS, Checkpointer
+from .config import DEFAULT_LIMIT
+from .schedule import Schedule
+from .persistence import get_store
+from .metrics import NULL_METRICS, Metrics
+from .notifier import get_notifier
+from .launchers import LauncherRules, get_rules
+from .process_utils import (
+    ClassificationCache,
+    KillResult,
+    ProcessSnapshot,
+    kill_batch,
+    kill_launchers_and_games,
+    snapshot_attrs,
+)
+from .events import ProcessEvent, ProcessEventSource, default_source
+from .sources import ProcessSource, PsutilSource
+from .scheduler import WARNING_THRESHOLDS, AdaptiveScheduler
 
-DEFAULT_LIMIT = timedelta(hours=2)
-POLL_INTERVAL = 300  # 5 min
+if TYPE_CHECKING:  # asyncio y concurrent.futures cargan logging: fuera del import
+    import asyncio
+    import concurrent.futures
+
+EVENT_SETTLE = 0.2   # s sin eventos antes del paso: una ráfaga de exec/exit = un paso
+EVENT_SETTLE_MAX = 1.0  # s: una ráfaga que no para no retrasa el paso más que esto
+IO_WORKERS = 4       # hilos para psutil / cierres / espera de eventos (bucle async)
 
 
 class Monitor:
-    def __init__(self, limit: timedelta = DEFAULT_LIMIT):
-        self.limit = limit
-        self.usage = load_usage()
-        self.today = date.today().isoformat()
+    def __init__(
+        self,
+        limit: timedelta = DEFAULT_LIMIT,
+        warnings: Sequence[float] = WARNING_THRESHOLDS,
+        max_staleness: float = MAX_STALENESS,
+        process_iter: Optional[Callable[..., Iterable]] = None,
+        source: Optional[ProcessSource] = None,
+        metrics: Optional[Metrics] = None,
+        store=None,
+        sync=None,
+        status=None,
+        rules: Optional[LauncherRules] = None,
+        activity=None,
+        notifier=None,
+        user: Optional[str] = None,
+        schedule: Optional[Schedule] = None,
+        events=None,
+        clock: Callable[[], float] = time.time,
+        killer: Callable[..., List[KillResult]] = kill_batch,
+    ):
+        self.limit = limit  # presupuesto diario (los días sin regla en ``schedule``)
+        self.schedule = schedule  # presupuestos por día, franjas bloqueadas, bolsa semanal
+        self.user = user  # modo multiusuario: distingue los avisos de cada usuario
+        self.notifier = notifier or get_notifier()
+        if events is None:
+            from .eventlog import get_event_log  # lazy import (logging)
+
+            events = get_event_log()
+        self.events = events  # EventLog (JSONL + consola) o cualquier objeto con emit()
+        self.activity = activity  # ActivitySampler opcional: solo cuenta el juego activo
+        self.rules = rules or get_rules()  # lanzadores / juegos / ignorados
+        self.sync = sync  # SyncClient opcional: presupuesto compartido entre máquinas
+        self.status = status  # StatusPublisher opcional: estado para la GUI / clientes
+        # psutil (portable) o /proc en bloque; process_iter se mantiene por compatibilidad
+        self.source = source or PsutilSource(process_iter)
+        # reloj y cierre inyectables: trace.py reproduce semanas de tráfico en segundos
+        self.clock = clock
+        self.killer = killer
+        self.metrics = metrics or NULL_METRICS
+        self.store = store or get_store()  # UsageJournal / SqliteUsageStore
+        self.usage = self.store.load()
+        self.today = self._day()
         self.usage.setdefault(self.today, 0.0)
         self.prev_active_pids: Set[int] = set()
-        self._last_ts = None        # instante desde el que contamos
+        self._sessions: Dict[int, Tuple[str, float]] = {}  # pid → (exe, inicio)
+        self.classifier = ClassificationCache()  # veredictos entre ticks
+        self._watched: Set[int] = set()  # lanzadores + juegos del último tick
+        self._launcher_running = False
+        self._games: List[psutil.Process] = []  # juegos del último tick (heartbeat)
+        self.scheduler = AdaptiveScheduler(warnings=warnings, notify_fn=self.notify)
+        self._last_ts: Optional[float] = None  # instante desde el que contamos
         self._was_active = False    # había juego en el paso anterior
+        self._lock = threading.Lock()  # contabilidad compartida con el checkpointer
+        self.extra: Dict[str, float] = {}  # s concedidos por día (grant_extra), en memoria
+        self.listeners: List[Callable[[dict], None]] = []  # reciben state() en cada tick
+        self.wake: Callable[[], None] = lambda: None  # despierta el bucle (run_async)
+        self._requested = False  # paso pedido desde fuera (RPC)
+        self._enforcing: Optional[asyncio.Future] = None  # cierre en curso (bucle async)
+        self._runner = LoopRunner()  # loop() / stop()
+        self.checkpointer = Checkpointer(
+            max_staleness, heartbeat=self._heartbeat, metrics=self.metrics, store=self.store
+        )
+        self.checkpointer.start()
 
         if self.today not in self.usage:
                 self.usage[self.today] = 0.0
-                save_usage(self.usage)
+                self.store.save(self.usage)
     
+    def _day(self) -> str:
+        return date.fromtimestamp(self.clock()).isoformat()
+
     def _reset_day(self):
-        if date.today().isoformat() != self.today:
-            self.today = date.today().isoformat()
-            self.usage[self.today] = 0.0
-            save_usage(self.usage)
+        day = self._day()
+        if day != self.today:
+            with self._lock:
+                # primero la clave y luego ``today``: el heartbeat (otro hilo) y
+                # quien lea sin lock nunca ven un día sin entrada en ``usage``
+                self.usage[day] = 0.0
+                self.today = day
+            self.checkpointer.set(day, 0.0)
+            self.scheduler.reset()
+            self.emit("day_reset", day=self.today)
+
+    def daily_limit(self) -> float:
+        """Presupuesto de hoy en s (del horario si lo hay, si no ``limit``)."""
+        if self.schedule is None:
+            return self.limit.total_seconds()
+        return self.schedule.budget(date.fromisoformat(self.today), self.limit.total_seconds())
+
+    def remaining(self) -> float:
+        extra = self.extra.get(self.today, 0.0)
+        limit = self.daily_limit() + extra
+        used = self.usage[self.today]
+        if self.sync is not None:
+            used = max(used, self.sync.used(self.today))
+            if self.sync.remote_limit is not None:
+                limit = min(limit, self.sync.remote_limit)
+        left = limit - used
+        if self.schedule is not None:
+            # bolsa semanal y franjas bloqueadas: búsqueda binaria, sin recorrer reglas
+            now = datetime.fromtimestamp(self.clock())
+            left = min(left, self.schedule.allowance(now, self.usage, extra))
+        return max(left, 0)
+
+    def _accrue(self, now_ts: float, is_active: bool):
+        with self._lock:
+            if is_active:
+                # Si antes no había juego, arrancamos cronómetro
+                if not self._was_active:
+                    self._last_ts = now_ts
+                # Sumar sólo la diferencia con el último instante
+                delta = max(now_ts - (self._last_ts or now_ts), 0.0)
+                self.usage[self.today] += delta
+                if delta > 0:
+                    self.checkpointer.add(self.today, delta)
+                    if self.sync is not None:
+                        self.sync.add(self.today, delta)
+            # Sin juego → solo movemos _last_ts (nunca hacia atrás: el heartbeat
+            # puede haber corrido durante el escaneo)
+            self._last_ts = max(now_ts, self._last_ts or now_ts)
+            self._was_active = is_active
+
+    def _heartbeat(self):
+        """Desde el checkpointer: imputa el tiempo de juego en curso entre ticks."""
+        if self.activity is not None and self._games:
+            self._accrue(self.clock(), self.activity.active(self._games))
+        elif self._was_active:
+            self._accrue(self.clock(), True)
+        self._publish()
+
+    def _publish(self):
+        if self.status is not None:
+            self.status.publish(
+                self.daily_limit(),
+                self.usage[self.today],
+                self.remaining(),
+                self._was_active,
+            )
+        if self.listeners:
+            state = self.state()
+            for listener in self.listeners:
+                listener(state)
+
+    def state(self) -> dict:
+        """Estado actual, serializable (RPC / suscriptores)."""
+        return {
+            "day": self.today,
+            "limit": self.daily_limit(),
+            "extra": self.extra.get(self.today, 0.0),
+            "used": self.usage[self.today],
+            "remaining": self.remaining(),
+            "active": self._was_active,
+            "launcher_running": self._launcher_running,
+            "games": sorted({exe for exe, _ in self._sessions.values()}),
+            "ts": self.clock(),
+        }
+
+    # -------- control en caliente (RPC) --------
+    def set_limit(self, limit: timedelta):
+        self.limit = limit
+        self.request_step()
 
-    def _log_new_games(self, active_pids: Set[int]):
+    def apply_config(self, cfg) -> None:
+        """Límite, reglas e intervalos de una vez (``config.Config`` ya validada)."""
+        with self._lock:
+            self.limit = cfg.limit
+            self.schedule = cfg.schedule
+            self.rules = cfg.rules
+            self.scheduler.configure(cfg.poll, cfg.idle, cfg.warnings)
+        self.request_step()
+
+    def grant_extra(self, seconds: float):
+        """Tiempo extra solo para hoy (puede ser negativo para retirarlo)."""
+        with self._lock:
+            self.extra[self.today] = self.extra.get(self.today, 0.0) + seconds
+        self.request_step()
+
+    def request_step(self):
+        """Fuerza un paso cuanto antes: el límite o el restante han cambiado."""
+        self._requested = True
+        self.wake()
+
+    def close(self):
+        """Cierra las sesiones abiertas, vuelca el uso pendiente y para el checkpointer."""
+        self._end_sessions(set(self._sessions), self.clock())
+        self.checkpointer.close()
+        if self.sync is not None:
+            self.sync.close()
+        if self.status is not None:
+            self.status.close()
+
+    def notify(self, message: str, key: str) -> None:
+        if self.user is not None:
+            message, key = f"{self.user}: {message}", f"{self.user}/{key}"
+        self.notifier.notify(message, key=key)
+
+    def emit(self, event: str, **fields) -> None:
+        """Evento estructurado (solo encola; ver eventlog.py)."""
+        if self.user is not None:
+            fields["user"] = self.user
+        self.events.emit(event, **fields)
+
+    def _end_sessions(self, pids: Set[int], now_ts: float):
+        for pid in pids:
+            exe, start = self._sessions.pop(pid)
+            self.checkpointer.add_session(exe, pid, start, now_ts)
+            self.emit("game_stop", pid=pid, name=exe, duration=now_ts - start)
+
+    def _log_new_games(self, active_pids: Set[int], snapshot: ProcessSnapshot):
         new_pids = active_pids - self.prev_active_pids
-        seen_names = set() 
-        if new_pids:
-            for p in psutil.process_iter():
-                if p.pid in new_pids:
-                    now = datetime.now().strftime("%H:%M:%S")
-                    print(f"[{now}] Juego iniciado: {p.name()} (PID {p.pid})")
-                    seen_names.add(p.name()) 
+        now_ts = self.clock()
+        self.metrics.inc("games_detected_total", len(new_pids))
+        for pid in new_pids:
+            name = snapshot.name(pid)
+            self.emit("game_start", pid=pid, name=name, launcher=snapshot.launcher(pid))
+            self._sessions[pid] = (name, now_ts)
+        self._end_sessions(self.prev_active_pids - active_pids, now_ts)
         self.prev_active_pids = active_pids
 
+    def scan(self) -> ProcessSnapshot:
+        """Una sola pasada por la tabla de procesos + clasificación incremental."""
+        with self.metrics.phase("scan"):
+            rules = self.rules  # una recarga de config no debe partir el tick
+            procs = self.source.scan(snapshot_attrs(rules))
+        self.metrics.inc("processes_scanned_total", len(procs))
+        with self.metrics.phase("classify"):
+            return ProcessSnapshot(procs, cache=self.classifier, rules=rules)
+
     def loop_step(self):
-        now_ts = time.time()
+        """Paso síncrono: escaneo, contabilidad y cierre en el hilo que llama."""
+        now_ts = self.clock()
+        self.process(self.scan(), now_ts)
+
+    async def astep(self, executor: Optional[concurrent.futures.Executor] = None):
+        """Paso del bucle async: el escaneo va al executor y el cierre queda en
+        segundo plano, así la detección no espera a ``kill_batch``."""
+        import asyncio  # lazy import
+
+        now_ts = self.clock()
+        snapshot = await asyncio.get_running_loop().run_in_executor(executor, self.scan)
+        self.aprocess(snapshot, now_ts, executor)
+
+    def process(self, snapshot: ProcessSnapshot, now_ts: float):
+        """Contabiliza, avisa y hace cumplir el límite a partir de una foto ya tomada."""
+        if self.account(snapshot, now_ts) <= 0:
+            self.enforce(snapshot)
+
+    def aprocess(
+        self,
+        snapshot: ProcessSnapshot,
+        now_ts: float,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ):
+        """Como ``process`` dentro del bucle async: el cierre corre en el executor."""
+        if self.account(snapshot, now_ts) > 0:
+            return
+        if self._enforcing is not None and not self._enforcing.done():
+            return  # el cierre anterior sigue esperando a los procesos
+        import asyncio  # lazy import
+
+        loop = asyncio.get_running_loop()
+        self._enforcing = loop.run_in_executor(executor, self.enforce, snapshot)
+        self._enforcing.add_done_callback(_log_failure)
+
+    def account(self, snapshot: ProcessSnapshot, now_ts: float) -> float:
+        """Sesiones, tiempo de juego y avisos; devuelve los segundos restantes."""
         self._reset_day()
+        metrics = self.metrics
+        metrics.inc("ticks_total")
 
-        # --- detectar procesos ---
-        active_procs = [p for p in psutil.process_iter() if is_game(p)]
+        active_procs = snapshot.games()
         pids = {p.pid for p in active_procs}
-        self._log_new_games(pids)
+        self._log_new_games(pids, snapshot)
+        self._watched = snapshot.launcher_pids.keys() | snapshot.tracked.keys()
+        self._launcher_running = snapshot.launcher_running
+        self._games = active_procs
         is_active = bool(active_procs)
+        if is_active and self.activity is not None:
+            with metrics.phase("activity"):
+                is_active = self.activity.active(active_procs)
 
         # ----------------- contabilizar tiempo -----------------
-        if is_active:
-            # Si antes no había juego, arrancamos cronómetro
-            if not self._was_active:
-                self._last_ts = now_ts
-            # Sumar sólo la diferencia con el último instante
-            delta = now_ts - (self._last_ts or now_ts)
-            self.usage[self.today] += delta
-            self._last_ts = now_ts
-        else:
-            # Sin juego → reseteamos _last_ts
-            self._last_ts = now_ts
-
-        self._was_active = is_active
-
-        # ----------------- imprimir / acciones -----------------
-        remaining = max(self.limit.total_seconds() - self.usage[self.today], 0)
-        print(f"[{datetime.now():%H:%M:%S}] Tiempo restante: {timedelta(seconds=int(remaining))}")
-
-        if remaining <= 0:
-            if is_active:
-                print(f"Tiempo agotado. Cerrando juegos y Steam…")
-            kill_steam_and_games()
-            
-    def loop(self):
+        with metrics.phase("account"):
+            self._accrue(now_ts, is_active)
+
+        # ----------------- registrar / avisos -----------------
+        remaining = self.remaining()
+        self._publish()
+        self.emit(
+            "tick",
+            remaining=remaining,
+            used=self.usage[self.today],
+            active=is_active,
+            games=len(active_procs),
+        )
+        self.scheduler.check_warnings(remaining)
+        return remaining
+
+    def enforce(self, snapshot: ProcessSnapshot):
+        """Cierra juegos y lanzadores de la foto (bloquea hasta ``kill_batch``)."""
+        metrics = self.metrics
+        games = snapshot.games()
+        if games:
+            self.emit("limit_reached", games=sorted({snapshot.name(p.pid) for p in games}))
+            # en cada tick con el tiempo agotado: el Notifier limita la repetición
+            self.notify("Tiempo agotado. Cerrando juegos y lanzadores…", key="exhausted")
+        with metrics.phase("kill"):
+            results = kill_launchers_and_games(snapshot, self.killer)
+        metrics.inc("kills_issued_total", len(results))
+        metrics.inc(
+            "kill_failures_total",
+            sum(r.outcome in ("survived", "denied") for r in results),
+        )
+        for r in results:
+            self.emit(
+                "kill_result",
+                pid=r.pid,
+                name=r.name,
+                outcome=r.outcome,
+                latency=r.latency,
+                launcher=r.launcher,
+            )
+
+    def _relevant(self, events: Iterable[ProcessEvent]) -> bool:
+        """¿Algún evento toca a lanzadores/juegos?
+
+        También con el tiempo agotado: lo que hay que cerrar es un lanzador o
+        juego que se abre (por nombre) o algo colgado de los que ya vigilamos;
+        el resto (compiladores, shells…) no justifica re-escanear la tabla.
+        """
+        if self._requested:
+            self._requested = False
+            return True
+        for ev in events:
+            if (
+                self.rules.relevant(ev.name)  # lanzador o juego suelto recién abierto
+                or ev.pid in self._watched
+                or ev.ppid in self._watched
+            ):
+                return True
+        return False
+
+    def _next_delay(self) -> float:
+        # con juegos abiertos pero inactivos el reloj puede reanudarse en
+        # cualquier heartbeat: se planifica como si contara
+        delay = self.scheduler.next_delay(
+            self.remaining(), self._launcher_running, self._was_active or bool(self._games)
+        )
+        if self.schedule is not None and self._launcher_running:
+            # empieza una franja bloqueada o un día nuevo: cerrar / recalcular a tiempo
+            now = datetime.fromtimestamp(self.clock())
+            delay = min(delay, self.schedule.next_boundary(now))
+        return delay
+
+    def loop(self, source: Optional[ProcessEventSource] = None):
         print(
-            f"Límite diario: {self.limit}. Poll {POLL_INTERVAL//60} min (Ctrl+C para salir)…"
+            f"Límite diario: {self.limit}. "
+            f"Poll adaptativo ≤{int(self.scheduler.poll // 60)} min (Ctrl+C para salir)…"
         )
+        self._runner.run(self, source)
+
+    def stop(self) -> None:
+        """Para ``loop()`` desde otro hilo (servicio); run_async vuelca y cierra."""
+        self._runner.stop()
+
+
+class LoopRunner:
+    """Ejecuta ``run_async`` en un bucle propio y permite cancelarlo desde otro hilo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def run(self, target, source: Optional[ProcessEventSource] = None) -> None:
+        import asyncio  # lazy import
+
+        loop = asyncio.new_event_loop()
+        try:
+            with self._lock:
+                if self._stopped:  # stop() antes de arrancar: solo cerrar
+                    target.close()
+                    return
+                task = self._task = loop.create_task(run_async(target, source))
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            except KeyboardInterrupt:
+                # como asyncio.run: se cancela la tarea para que run_async cierre
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    loop.run_until_complete(task)
+                raise
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            task = self._task
+        if task is not None and not task.done():
+            with contextlib.suppress(RuntimeError):  # el bucle ya se cerró
+                task.get_loop().call_soon_threadsafe(task.cancel)
+
+
+def _log_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"[WARN] Cierre fallido: {future.exception()!r}")
+
+
+async def run_async(
+    target,
+    source: Optional[ProcessEventSource] = None,
+    workers: int = IO_WORKERS,
+):
+    """Bucle por eventos común a Monitor y MultiUserMonitor.
+
+    ``target`` expone ``astep``, ``_relevant``, ``_next_delay``, ``close`` y
+    ``wake`` (que aquí se conecta a la fuente para poder interrumpir la espera).
+    Todo lo bloqueante (psutil, espera de eventos, cierres) va a un pool acotado;
+    al cancelar la tarea se despierta la fuente, se vuelca el uso y se sale.
+    """
+    import asyncio  # lazy import
+    import concurrent.futures
+
+    source = source or default_source()
+    target.wake = source.wake
+    executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="gtl-io")
+    waiting: Optional[concurrent.futures.Future] = None
+
+    async def wait_events(timeout: float):
+        nonlocal waiting
+        waiting = executor.submit(source.wait, max(timeout, 0))
+        return await asyncio.wrap_future(waiting)
+
+    print(f"Eventos de procesos: {source.name}")
+    try:
+        await target.astep(executor)
+        next_poll = time.monotonic() + target._next_delay()
         while True:
-            self.loop_step()           # ← llamada al paso único
-            time.sleep(POLL_INTERVAL)  # ← pausa fija
\ No newline at end of file
+            events = await wait_events(next_poll - time.monotonic())
+            if time.monotonic() < next_poll and not target._relevant(events):
+                continue
+            if events:  # el paso re-escanea todo: se espera a que la ráfaga acabe
+                settled = time.monotonic() + EVENT_SETTLE_MAX
+                while await wait_events(min(EVENT_SETTLE, settled - time.monotonic())):
+                    if time.monotonic() >= settled:
+                        break
+            await target.astep(executor)
+            next_poll = time.monotonic() + target._next_delay()
+    finally:
+        source.wake()  # suelta el hilo bloqueado en wait antes de cerrar la fuente
+        if waiting is not None:
+            concurrent.futures.wait([waiting], timeout=2)
+        executor.shutdown(wait=False, cancel_futures=True)
+        source.close()
+        target.close()
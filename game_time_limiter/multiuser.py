@@ -0,0 +1,184 @@
+from __future__ import annotations
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .events import ProcessEvent, ProcessEventSource
+from .metrics import NULL_METRICS, Metrics
+from .monitor import DEFAULT_LIMIT, LoopRunner, Monitor
+from .persistence import USAGE_DIR, open_store, user_stem
+from .launchers import LauncherRules, get_rules
+from .process_utils import ClassificationCache, ProcessSnapshot, snapshot_attrs
+from .sources import ProcessSource, PsutilSource
+from .scheduler import IDLE_INTERVAL, WARNING_THRESHOLDS
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+
+def user_key(username: str) -> str:
+    """``EQUIPO\\Alicia`` → ``alicia`` (así se escriben los límites en la CLI)."""
+    return username.rsplit("\\", 1)[-1].lower()
+
+
+class MultiUserMonitor:
+    """Un único escaneo por tick y un Monitor (presupuesto, uso, cierre) por usuario.
+
+    Cada proceso se atribuye a su dueño y cada usuario recibe su propia vista
+    de la foto: al agotar el tiempo solo se cierran sus juegos y sus lanzadores.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, timedelta],
+        default_limit: Optional[timedelta] = DEFAULT_LIMIT,
+        warnings: Sequence[float] = WARNING_THRESHOLDS,
+        process_iter: Optional[Callable[..., Iterable]] = None,
+        source: Optional[ProcessSource] = None,
+        metrics: Optional[Metrics] = None,
+        store_kind: Optional[str] = None,
+        sync_url: Optional[str] = None,
+        sync_token: Optional[str] = None,
+        rules: Optional[LauncherRules] = None,
+        activity: Optional[Callable[[], object]] = None,
+    ):
+        self.fixed_limits = {user_key(u): lim for u, lim in limits.items()}  # --user: mandan
+        self.limits = dict(self.fixed_limits)
+        self.config = None  # última config.Config aplicada (para los Monitor nuevos)
+        self.default_limit = default_limit  # None → usuarios no listados sin límite
+        self.warnings = warnings
+        # psutil (portable) o /proc en bloque; process_iter se mantiene por compatibilidad
+        self.source = source or PsutilSource(process_iter)
+        self.metrics = metrics or NULL_METRICS
+        self.store_kind = store_kind
+        self.sync_url = sync_url  # cada usuario sincroniza con la cuenta de su nombre
+        self.sync_token = sync_token
+        self.rules = rules or get_rules()
+        self.activity = activity  # fábrica de ActivitySampler: uno por usuario
+        self.classifier = ClassificationCache()
+        self.monitors: Dict[str, Monitor] = {}
+        self._lock = threading.Lock()  # altas en ``monitors`` frente a lectores (RPC)
+        self.listeners: List[Callable[[dict], None]] = []  # ticks de todos, con "user"
+        self.wake: Callable[[], None] = lambda: None
+        self._runner = LoopRunner()  # loop() / stop()
+
+    def _monitor(self, user: str) -> Optional[Monitor]:
+        mon = self.monitors.get(user)
+        if mon is None:
+            limit = self.limits.get(user, self.default_limit)
+            if limit is None:
+                return None
+            USAGE_DIR.mkdir(exist_ok=True)
+            stem = user_stem(user)
+            sync = None
+            if self.sync_url:
+                from .sync import SyncClient  # lazy import
+
+                sync = SyncClient(self.sync_url, user, token=self.sync_token)
+            from .status import StatusPublisher, status_path  # lazy import
+
+            mon = Monitor(
+                limit,
+                self.warnings,
+                source=self.source,
+                metrics=self.metrics,
+                store=open_store(self.store_kind, stem),
+                rules=self.rules,
+                activity=self.activity() if self.activity else None,
+                sync=sync,
+                status=StatusPublisher(status_path(user)),
+                user=user,
+            )
+            if self.config is not None:
+                mon.apply_config(self.config._replace(limit=limit))
+            mon.wake = lambda: self.wake()  # run_async conecta self.wake más tarde
+            mon.listeners.append(partial(self._forward, user))
+            with self._lock:
+                self.monitors[user] = mon
+            print(f"Usuario {user}: límite diario {limit}")
+        return mon
+
+    def users(self) -> List[Tuple[str, Monitor]]:
+        """Copia de (usuario, Monitor) para leer desde otros hilos."""
+        with self._lock:
+            return list(self.monitors.items())
+
+    def apply_config(self, cfg) -> None:
+        """Recarga de ``config.json``: reglas, intervalos y límites de cada usuario.
+
+        ``users`` del archivo se suma a los ``--user`` (que tienen prioridad);
+        ``cfg.limit`` es el de los no listados solo si hay límite por defecto.
+        """
+        limits = {user_key(u): lim for u, lim in cfg.users.items()}
+        limits.update(self.fixed_limits)
+        self.limits = limits
+        if self.default_limit is not None:
+            self.default_limit = cfg.limit
+        self.warnings = cfg.warnings
+        self.rules = cfg.rules
+        self.config = cfg
+        for user, mon in list(self.monitors.items()):
+            limit = limits.get(user, self.default_limit)
+            if limit is None:  # ya no tiene límite: se conserva el que tenía
+                limit = mon.limit
+            mon.apply_config(cfg._replace(limit=limit))
+
+    def _forward(self, user: str, state: dict):
+        for listener in self.listeners:
+            listener({**state, "user": user})
+
+    def scan(self) -> ProcessSnapshot:
+        with self.metrics.phase("scan"):
+            procs = self.source.scan(snapshot_attrs(self.rules) + ["username"])
+        self.metrics.inc("processes_scanned_total", len(procs))
+        with self.metrics.phase("classify"):
+            return ProcessSnapshot(procs, cache=self.classifier, rules=self.rules)
+
+    def loop_step(self):
+        self._dispatch(self.scan(), time.time(), lambda mon, view, now: mon.process(view, now))
+
+    async def astep(self, executor: Optional[concurrent.futures.Executor] = None):
+        import asyncio  # lazy import
+
+        now_ts = time.time()
+        snapshot = await asyncio.get_running_loop().run_in_executor(executor, self.scan)
+        self._dispatch(
+            snapshot, now_ts, lambda mon, view, now: mon.aprocess(view, now, executor)
+        )
+
+    def _dispatch(self, snapshot: ProcessSnapshot, now_ts: float, step):
+        views = snapshot.by_owner(user_key)
+        for user, view in views.items():
+            if user in self.monitors or view.launcher_running or view.tracked:
+                mon = self._monitor(user)
+                if mon is not None:
+                    step(mon, view, now_ts)
+        empty = ProcessSnapshot([])
+        for user, mon in self.monitors.items():
+            if user not in views:  # sin procesos: cierra sesiones y para el reloj
+                step(mon, empty, now_ts)
+
+    def _relevant(self, events: Iterable[ProcessEvent]) -> bool:
+        events = list(events)
+        if any(self.rules.relevant(ev.name) for ev in events):
+            return True
+        return any(mon._relevant(events) for mon in self.monitors.values())
+
+    def _next_delay(self) -> float:
+        idle = self.config.idle if self.config is not None else IDLE_INTERVAL
+        return min((m._next_delay() for m in self.monitors.values()), default=idle)
+
+    def close(self):
+        for mon in self.monitors.values():
+            mon.close()
+
+    def loop(self, source: Optional[ProcessEventSource] = None):
+        listed = ", ".join(f"{u}={lim}" for u, lim in self.limits.items()) or "ninguno"
+        print(f"Modo multiusuario. Límites: {listed}; resto: {self.default_limit or 'sin límite'}")
+        self._runner.run(self, source)
+
+    def stop(self) -> None:
+        """Para ``loop()`` desde otro hilo (servicio); run_async vuelca y cierra."""
+        self._runner.stop()
@@ -1,16 +1,326 @@
+"""Avisos al usuario: una cola acotada, un único hilo y backends intercambiables.
+
+``notify(msg, key=...)`` nunca bloquea: encola y vuelve. Los avisos con la
+misma ``key`` se deduplican mientras esperan en la cola y no se repiten antes
+de ``min_interval`` s (el cierre por tiempo agotado se reintenta en cada tick).
+Un backend que falla se salta durante un tiempo creciente y se vuelve a probar;
+el resto sigue entregando.
+
+Backends: ``toast`` (Windows, win10toast), ``dbus`` (freedesktop, vía
+``notify-send`` o ``gdbus``), ``stdout``, ``webhook`` (POST JSON) y
+``StubBackend`` para pruebas.
+"""
 from __future__ import annotations
-from win10toast import ToastNotifier
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+TITLE = "Límite de juego"
+QUEUE_SIZE = 32        # avisos pendientes; si se llena se descarta el más viejo
+MIN_INTERVAL = 60.0    # s entre dos avisos con la misma clave
+RETRY_BASE = 30.0      # s de espera tras el primer fallo de un backend (se duplica)
+RETRY_MAX = 900.0
+SEND_TIMEOUT = 5.0
+
+
+class Notification(NamedTuple):
+    key: str
+    title: str
+    message: str
+    ts: float
+
+
+# --------------------------------------------------------------------------- #
+# Backends: send() bloquea (corre en el hilo del Notifier) y lanza si falla
+# --------------------------------------------------------------------------- #
+class Backend:
+    name = "base"
+
+    def send(self, note: Notification) -> None:
+        raise NotImplementedError
+
+
+class ToastBackend(Backend):
+    """Toast de Windows. Sin ``threaded=True``: el hilo del Notifier ya es aparte."""
+
+    name = "toast"
+
+    def __init__(self, duration: int = 5):
+        self.duration = duration
+        self._toaster: Any = None  # win10toast.ToastNotifier (sin stubs)
+
+    def send(self, note: Notification) -> None:
+        if self._toaster is None:
+            from win10toast import ToastNotifier  # lazy import
+
+            self._toaster = ToastNotifier()
+        self._toaster.show_toast(note.title, note.message, duration=self.duration)
+
+
+class DbusBackend(Backend):
+    """Notificación freedesktop (``org.freedesktop.Notifications``).
+
+    Usa ``notify-send`` (libnotify) o, si no está, ``gdbus``; los avisos con
+    la misma clave sustituyen al anterior en pantalla en lugar de apilarse.
+    """
+
+    name = "dbus"
+
+    def __init__(self):
+        self.notify_send = shutil.which("notify-send")
+        self.gdbus = shutil.which("gdbus")
+        self._ids: Dict[str, int] = {}  # clave → id de la notificación mostrada
+
+    @staticmethod
+    def available() -> bool:
+        has_bus = bool(os.environ.get("DBUS_SESSION_BUS_ADDRESS"))
+        return has_bus and bool(shutil.which("notify-send") or shutil.which("gdbus"))
+
+    def send(self, note: Notification) -> None:
+        if self.gdbus:
+            self._send_gdbus(note)
+        elif self.notify_send:
+            subprocess.run(
+                [self.notify_send, "-a", "game_time_limiter",
+                 "-h", f"string:x-canonical-private-synchronous:{note.key}",
+                 note.title, note.message],
+                check=True, timeout=SEND_TIMEOUT, capture_output=True,
+            )
+        else:
+            raise OSError("ni notify-send ni gdbus en el PATH")
+
+    def _send_gdbus(self, note: Notification) -> None:
+        out = subprocess.run(
+            [self.gdbus, "call", "--session",
+             "--dest", "org.freedesktop.Notifications",
+             "--object-path", "/org/freedesktop/Notifications",
+             "--method", "org.freedesktop.Notifications.Notify",
+             "game_time_limiter", str(self._ids.get(note.key, 0)), "",
+             note.title, note.message, "[]", "{}", "5000"],
+            check=True, timeout=SEND_TIMEOUT, capture_output=True, text=True,
+        ).stdout
+        m = re.search(r"uint32 (\d+)", out)  # "(uint32 7,)"
+        if m:
+            self._ids[note.key] = int(m.group(1))
+
+
+class StdoutBackend(Backend):
+    name = "stdout"
+
+    def send(self, note: Notification) -> None:
+        print(f"[AVISO] {note.message}", flush=True)
+
+
+class WebhookBackend(Backend):
+    """POST JSON ``{"key", "title", "message", "ts"}`` a ``url``."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, token: Optional[str] = None):
+        self.url = url
+        self.token = token
+
+    def send(self, note: Notification) -> None:
+        import urllib.request  # lazy import: http.client + ssl solo con webhook
+
+        req = urllib.request.Request(
+            self.url, data=json.dumps(note._asdict()).encode(), method="POST"
+        )
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("X-GTL-Token", self.token)
+        with urllib.request.urlopen(req, timeout=SEND_TIMEOUT) as resp:
+            resp.read()
+
+
+class StubBackend(Backend):
+    """Guarda lo enviado; ``fail`` próximos envíos lanzan (pruebas locales)."""
+
+    name = "stub"
+
+    def __init__(self, fail: int = 0):
+        self.sent: List[Notification] = []
+        self.fail = fail
+
+    def send(self, note: Notification) -> None:
+        if self.fail > 0:
+            self.fail -= 1
+            raise OSError("fallo simulado")
+        self.sent.append(note)
+
+
+BACKENDS = {"toast": ToastBackend, "dbus": DbusBackend, "stdout": StdoutBackend}
+
+
+def default_backends() -> List[Backend]:
+    """Lo que haya en esta máquina; ``stdout`` si no hay escritorio."""
+    if os.name == "nt":
+        import importlib.util  # lazy import
+
+        if importlib.util.find_spec("win10toast") is not None:
+            return [ToastBackend()]
+    elif DbusBackend.available():
+        return [DbusBackend()]
+    return [StdoutBackend()]
+
+
+def make_backends(names: Iterable[str], webhook: Optional[str] = None) -> List[Backend]:
+    unknown = [n for n in names if n not in BACKENDS]
+    if unknown:
+        raise ValueError(f"backend de aviso desconocido: {', '.join(unknown)}")
+    backends = [BACKENDS[n]() for n in names]
+    if webhook:
+        backends.append(WebhookBackend(webhook))
+    return backends
+
+
+# --------------------------------------------------------------------------- #
+# Notifier
+# --------------------------------------------------------------------------- #
+class _Health:
+    __slots__ = ("failures", "retry_at")
+
+    def __init__(self):
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class Notifier:
+    """Cola acotada vaciada por un único hilo (que arranca con el primer aviso)."""
+
+    def __init__(
+        self,
+        backends: Optional[List[Backend]] = None,
+        queue_size: int = QUEUE_SIZE,
+        min_interval: float = MIN_INTERVAL,
+        retry_base: float = RETRY_BASE,
+        retry_max: float = RETRY_MAX,
+    ):
+        self.backends = backends if backends is not None else default_backends()
+        self.min_interval = min_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Notification]]" = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Notification] = {}  # clave → último texto encolado
+        self._last: Dict[str, float] = {}            # clave → último envío aceptado
+        self._health: Dict[int, _Health] = {id(b): _Health() for b in self.backends}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def notify(self, message: str, key: Optional[str] = None, title: str = TITLE) -> bool:
+        """Encola sin bloquear; False si se descartó (duplicado o demasiado pronto)."""
+        key = key or message
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                return False
+            if key in self._pending:
+                # ya espera en la cola: se entrega el texto más reciente
+                self._pending[key] = self._pending[key]._replace(message=message)
+                return False
+            if now - self._last.get(key, float("-inf")) < self.min_interval:
+                return False
+            self._last[key] = now
+            note = Notification(key, title, message, time.time())
+            self._pending[key] = note
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+            while True:
+                try:
+                    self._queue.put_nowait(note)
+                    return True
+                except queue.Full:
+                    try:
+                        old = self._queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if old is not None:
+                        self._pending.pop(old.key, None)
+                        self.dropped += 1
+                    self._queue.task_done()
+
+    def _run(self) -> None:
+        while True:
+            note = self._queue.get()
+            try:
+                if note is None:
+                    return
+                with self._lock:
+                    note = self._pending.pop(note.key, note)
+                self._deliver(note)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, note: Notification) -> None:
+        for backend in self.backends:
+            health = self._health[id(backend)]
+            now = time.monotonic()
+            if now < health.retry_at:
+                continue  # en espera tras un fallo; los demás siguen
+            try:
+                backend.send(note)
+            except Exception as exc:  # un backend roto no afecta a los otros
+                health.failures += 1
+                delay = min(self.retry_base * 2 ** (health.failures - 1), self.retry_max)
+                health.retry_at = now + delay
+                if health.failures == 1:
+                    print(f"[WARN] Aviso por {backend.name} fallido ({exc!r}); se reintenta")
+            else:
+                health.failures = 0
+                health.retry_at = 0.0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se vacíe la cola (True si lo hizo antes de ``timeout``)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = SEND_TIMEOUT) -> None:
+        """Entrega lo pendiente (hasta ``timeout``) y para el hilo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self.flush(timeout)
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+            thread.join(timeout=1)
+
+
+# --------------------------------------------------------------------------- #
+# Notifier del proceso (como get_store en persistence)
+# --------------------------------------------------------------------------- #
+_notifier: Optional[Notifier] = None
+
+
+def get_notifier() -> Notifier:
+    global _notifier
+    if _notifier is None:
+        _notifier = Notifier()
+    return _notifier
+
 
-toaster = ToastNotifier()
-_notify_ok = True
+def set_notifier(notifier: Notifier) -> None:
+    global _notifier
+    _notifier = notifier
 
 
-def notify(msg: str):
-    """Show Windows toast, swallow errors."""
-    global _notify_ok
-    if not _notify_ok:
-        return
-    try:
-        toaster.show_toast("Límite de juego", msg, threaded=True, duration=5)
-    except Exception:
-        _notify_ok = False
+def notify(msg: str, key: Optional[str] = None) -> bool:
+    """Aviso con el Notifier del proceso (no bloquea)."""
+    return get_notifier().notify(msg, key=key)
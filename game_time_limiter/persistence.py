@@ -1,35 +1,267 @@
 # game_time_limiter/persistence.py
 from __future__ import annotations
 import json
+import os
+import re
+import time
 from pathlib import Path
-from typing import Dict
+from typing import Dict, IO, Optional
 
 # --------------------------------------------------------------------------- #
 # Raíz del proyecto (nivel superior al paquete) para usage.json en el repo
 # --------------------------------------------------------------------------- #
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-USAGE_FILE   = PROJECT_ROOT / "usage.json"
+USAGE_FILE   = PROJECT_ROOT / "usage.json"      # snapshot compactado
+JOURNAL_FILE = PROJECT_ROOT / "usage.journal"   # deltas append-only (JSONL)
+USAGE_DIR    = PROJECT_ROOT / "usage"           # modo multiusuario: usage/<usuario>.*
+
+SEQ_KEY = "_seq"          # último registro del diario ya incluido en el snapshot
+FSYNC_EVERY = 20          # fsync cada N appends…
+FSYNC_INTERVAL = 30.0     # …o cada N segundos, lo que llegue antes
+COMPACT_EVERY = 1000      # registros en el diario antes de compactar
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------------------------- #
+# Diario append-only + snapshot
+# --------------------------------------------------------------------------- #
+
+class UsageJournal:
+    """Uso diario como snapshot (``usage.json``) + diario de deltas.
+
+    Cada tick es un append O(1) de una línea; ``load`` reproduce el snapshot
+    más la cola del diario y cada ``COMPACT_EVERY`` registros se reescribe el
+    snapshot de forma atómica (tmp + ``os.replace``). Cada registro lleva un
+    número de secuencia, así que un corte entre snapshot y truncado no cuenta
+    dos veces.
+    """
+
+    def __init__(self, snapshot: Path = USAGE_FILE, journal: Path = JOURNAL_FILE):
+        self.snapshot = snapshot
+        self.journal = journal
+        self._state: Dict[str, float] = {}
+        self._seq = 0
+        self._records = 0           # registros en el diario desde el snapshot
+        self._fh: Optional[IO[str]] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # ----------------------------- lectura ------------------------------ #
+    def _replay(self):
+        """Snapshot + diario en memoria, sin tocar disco.
+
+        Devuelve ``(estado, seq, registros, corrupto, fin_bueno, falta_salto)``:
+        ``fin_bueno`` es el byte tras el último registro válido del diario.
+        """
+        state: Dict[str, float] = {}
+        seq = 0
+        corrupt = False
+        if self.snapshot.exists():
+            try:
+                state = json.loads(self.snapshot.read_text())
+                seq = int(state.pop(SEQ_KEY, 0))
+            except (json.JSONDecodeError, ValueError, AttributeError):
+                state, seq, corrupt = {}, 0, True
+        records = good_end = 0
+        newline = True
+        if self.journal.exists():
+            with open(self.journal, "rb") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break  # última línea a medio escribir
+                    good_end += len(line)
+                    newline = line.endswith(b"\n")
+                    if rec["n"] <= seq:
+                        continue
+                    if "v" in rec:
+                        state[rec["d"]] = float(rec["v"])
+                    else:
+                        state[rec["d"]] = state.get(rec["d"], 0.0) + rec["s"]
+                    seq = rec["n"]
+                    records += 1
+        return state, seq, records, corrupt, good_end, not newline
+
+    def read(self) -> Dict[str, float]:
+        """Uso actual sin efectos: no compacta, no renombra ni recorta nada."""
+        return dict(self._replay()[0])
+
+    def load(self) -> Dict[str, float]:
+        state, seq, records, corrupt, good_end, no_newline = self._replay()
+        if corrupt:
+            backup = self.snapshot.with_name(self.snapshot.name + ".bad")
+            os.replace(self.snapshot, backup)
+            print(f"[WARN] {self.snapshot} corrupto; copia en {backup}")
+        if self.journal.exists() and (self.journal.stat().st_size > good_end or no_newline):
+            # cola rota (corte a media línea): el siguiente append quedaría pegado
+            # a ella y todo lo posterior se perdería en la próxima carga
+            with open(self.journal, "r+b") as fh:
+                fh.truncate(good_end)
+                if no_newline:
+                    fh.seek(good_end)
+                    fh.write(b"\n")
+            print(f"[WARN] {self.journal.name}: registro incompleto descartado")
+        self._state, self._seq, self._records = state, seq, records
+        if not self.snapshot.exists():
+            self.compact()
+        return dict(state)
+
+    # ----------------------------- escritura ---------------------------- #
+    def add(self, day: str, delta: float) -> None:
+        self._state[day] = self._state.get(day, 0.0) + delta
+        self._append({"d": day, "s": round(delta, 3)})
+
+    def set(self, day: str, seconds: float) -> None:
+        self._state[day] = seconds
+        self._append({"d": day, "v": seconds})
+
+    def save(self, data: Dict[str, float]) -> None:
+        self._state = {k: float(v) for k, v in data.items()}
+        self.compact()
+
+    def _append(self, rec: dict) -> None:
+        self._seq += 1
+        rec["n"] = self._seq
+        if self._fh is None:
+            self._fh = open(self.journal, "a", encoding="utf-8")
+        self._fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._fh.flush()  # ya en el SO: un crash del proceso no pierde nada
+        self._unsynced += 1
+        self._records += 1
+        if self._records >= COMPACT_EVERY:
+            self.compact()
+        elif (
+            self._unsynced >= FSYNC_EVERY
+            or time.monotonic() - self._last_sync >= FSYNC_INTERVAL
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        if self._fh is not None and self._unsynced:
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Snapshot atómico del estado y diario vacío."""
+        data = {**self._state, SEQ_KEY: self._seq}
+        _atomic_write(self.snapshot, json.dumps(data, indent=2))
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.journal.write_text("")
+        self._records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        self.sync()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def add_session(self, exe: str, pid: int, start: float, end: float) -> None:
+        pass  # el diario solo guarda totales diarios; sesiones → SqliteUsageStore
+
+    def reset(self) -> None:
+        self.close()
+        self.snapshot.unlink(missing_ok=True)
+        self.journal.unlink(missing_ok=True)
+        self._state, self._seq, self._records = {}, 0, 0
+
+
+def user_stem(user: str) -> Path:
+    """Prefijo de los archivos de un usuario: ``usage/<usuario>``."""
+    return USAGE_DIR / re.sub(r"[^\w.-]", "_", user)
+
+
+def open_store(kind: Optional[str] = None, stem: Optional[Path] = None):
+    """``journal`` (por defecto) o ``sqlite``; sin ``kind`` mira ``$GTL_STORE``.
+
+    ``stem`` cambia la ruta base (``<stem>.json``/``.journal`` o ``<stem>.db``),
+    p. ej. un almacén por usuario. Se añade la extensión al nombre completo:
+    ``with_suffix`` cortaría en el primer punto (``john.doe`` → ``john.json``).
+    """
+    kind = (kind or os.environ.get("GTL_STORE") or "journal").lower()
+    if kind == "sqlite":
+        from .sqlite_store import DB_FILE, SqliteUsageStore  # lazy import
+
+        return SqliteUsageStore(stem.with_name(stem.name + ".db") if stem else DB_FILE)
+    if kind != "journal":
+        raise ValueError(f"Backend de uso desconocido: {kind}")
+    if stem is None:
+        return UsageJournal()
+    return UsageJournal(
+        stem.with_name(stem.name + ".json"), stem.with_name(stem.name + ".journal")
+    )
+
+
+_store = open_store()
+
+
+def get_store():
+    return _store
+
+
+def set_store(store) -> None:
+    """Cambia el backend activo (antes de crear el Monitor)."""
+    global _store
+    _store.close()
+    _store = store
 
 # --------------------------------------------------------------------------- #
 # Carga / guardado del uso diario
 # --------------------------------------------------------------------------- #
 
 def load_usage() -> Dict[str, float]:
-    """Lee usage.json; si no existe o falla, inicia en {} y crea el archivo."""
-    if USAGE_FILE.exists():
-        try:
-            return json.loads(USAGE_FILE.read_text())
-        except json.JSONDecodeError:
-            pass
-    # No existe o JSON corrupto -> inicializa y guarda
-    save_usage({})
-    return {}
+    """Uso por día del backend activo (por defecto snapshot + cola del diario)."""
+    return _store.load()
 
 
 def save_usage(data: Dict[str, float]) -> None:
-    """Escribe el dict en usage.json; crea el archivo si falta."""
+    """Reescribe el uso completo (por defecto: snapshot atómico y diario vacío)."""
+    try:
+        _store.save(data)
+    except Exception as exc:
+        print(f"[WARN] No se pudo guardar el uso: {exc}")
+
+
+def record_usage(day: str, delta: float) -> None:
+    """Suma ``delta`` segundos al día: un append O(1) al diario."""
     try:
-        text = json.dumps(data, indent=2)
-        USAGE_FILE.write_text(text)
+        _store.add(day, delta)
     except Exception as exc:
-        print(f"[WARN] No se pudo escribir {USAGE_FILE}: {exc}")
+        print(f"[WARN] No se pudo guardar el uso: {exc}")
+
+
+def set_usage(day: str, seconds: float) -> None:
+    try:
+        _store.set(day, seconds)
+    except Exception as exc:
+        print(f"[WARN] No se pudo guardar el uso: {exc}")
+
+
+def record_session(exe: str, pid: int, start: float, end: float) -> None:
+    """Guarda una sesión de juego terminada (solo backends con sesiones)."""
+    try:
+        _store.add_session(exe, pid, start, end)
+    except Exception as exc:
+        print(f"[WARN] No se pudo guardar la sesión de {exe}: {exc}")
+
+
+def flush_usage() -> None:
+    _store.sync()
+
+
+def reset_usage() -> None:
+    """Borra snapshot y diario (``--reset``)."""
+    _store.reset()
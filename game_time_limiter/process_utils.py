@@ -1,19 +1,269 @@
 from __future__ import annotations
-from typing import List
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
 import psutil
-import subprocess, platform
+import subprocess, platform, time
 
-IGNORE_NAMES = {
-    "steamwebhelper.exe",
-    "gameoverlayui.exe",
-}
+from .launchers import GAMES_FIRST, LauncherRules, get_rules
+from .sources import ProcessSource, ProcHandles, ProcTable, PsutilSource, Row
 
+STEAM_NAME = "steam.exe"
+
+TERM_TIMEOUT = 8   # s de gracia tras terminate() (todo el lote a la vez)
+KILL_TIMEOUT = 5   # s tras kill() para los supervivientes
+
+SNAPSHOT_ATTRS = ["pid", "ppid", "name", "create_time"]
+
+ProcKey = Tuple[int, float]  # (pid, create_time): evita falsos aciertos por PID reciclado
+
+
+def snapshot_attrs(rules: Optional[LauncherRules] = None) -> List[str]:
+    """Campos a pedir a ``process_iter``; ``exe`` solo si hay reglas de ruta."""
+    rules = rules or get_rules()
+    return SNAPSHOT_ATTRS + ["exe"] if rules.needs_exe else list(SNAPSHOT_ATTRS)
+
+
+# --------------------------------------------------------------------------- #
+# Foto de la tabla de procesos (una por tick)
+# --------------------------------------------------------------------------- #
+
+class ProcessSnapshot:
+    """Lee pid/ppid/name una sola vez y marca lo que cuelga de cada lanzador.
+
+    En vez de subir por ``parent()`` para cada proceso, se arma un índice
+    padre→hijos y se baja desde las raíces (``steam.exe``, Epic, Lutris…): un
+    tick queda en una sola pasada lineal sobre la tabla de procesos. Los juegos
+    sueltos (por nombre o ruta) se reconocen en la misma pasada.
+    """
+
+    def __init__(
+        self,
+        procs: "Iterable[psutil.Process] | ProcTable",
+        cache: Optional["ClassificationCache"] = None,
+        rules: Optional[LauncherRules] = None,
+    ):
+        self.rules = rules or get_rules()
+        self.names: Dict[int, str] = {}
+        self.ppids: Dict[int, Optional[int]] = {}
+        self.keys: Dict[int, ProcKey] = {}
+        self.owners: Dict[int, str] = {}  # solo si se pidió "username"
+        self.children: Dict[int, List[int]] = {}
+        self.launcher_pids: Dict[int, str] = {}  # pid de un lanzador → su nombre
+        direct: Dict[int, str] = {}  # juegos por nombre / ruta, sin mirar ancestros
+        self.procs: Mapping[int, psutil.Process]
+        rows: Iterable[Row]
+        if isinstance(procs, ProcTable):
+            rows = procs.rows()  # arrays de /proc: los Process se crean al pedirlos
+            self.procs = ProcHandles(self.keys, self.names)
+        else:
+            found: Dict[int, psutil.Process] = {}
+            self.procs = found
+            rows = self._rows(procs, found)
+        match = self.rules.match
+        for pid, ppid, name, ctime, owner, exe in rows:
+            if owner:
+                self.owners[pid] = owner
+            self.names[pid] = name
+            self.ppids[pid] = ppid
+            self.keys[pid] = (pid, ctime)
+            if ppid is not None and ppid != pid:
+                self.children.setdefault(ppid, []).append(pid)
+            root = self.rules.root(name)
+            if root is not None:
+                self.launcher_pids[pid] = root
+            else:
+                game = match(name, exe)
+                if game is not None:
+                    direct[pid] = game
+        # pid → lanzador de todo candidato a juego (el lanzador más cercano)
+        if cache is not None:
+            self.tracked: Dict[int, str] = cache.update(self)
+        else:
+            self.tracked = self._descendant_launchers()
+        self.tracked.update(direct)
+
+    @staticmethod
+    def _rows(
+        procs: Iterable[psutil.Process], found: Dict[int, psutil.Process]
+    ) -> Iterable[Row]:
+        for proc in procs:
+            info = proc.info
+            found[info["pid"]] = proc
+            yield (
+                info["pid"],
+                info.get("ppid"),
+                (info.get("name") or "").lower(),
+                info.get("create_time") or 0.0,
+                info.get("username"),
+                info.get("exe"),
+            )
+
+    @classmethod
+    def capture(
+        cls,
+        process_iter: Optional[Callable[..., Iterable[psutil.Process]]] = None,
+        cache: Optional["ClassificationCache"] = None,
+        rules: Optional[LauncherRules] = None,
+        source: Optional[ProcessSource] = None,
+    ) -> "ProcessSnapshot":
+        source = source or PsutilSource(process_iter)
+        rules = rules or get_rules()
+        return cls(source.scan(snapshot_attrs(rules)), cache, rules)
+
+    def by_owner(
+        self, key: Callable[[str], str] = str
+    ) -> Dict[str, "ProcessSnapshot"]:
+        """Parte la foto por usuario (requiere capturar con ``"username"``).
+
+        ``key`` normaliza el nombre (p. ej. quitar el dominio de Windows).
+        Las vistas comparten el índice padre→hijos y los veredictos ya
+        calculados: no se vuelve a leer ni clasificar nada.
+        """
+        groups: Dict[str, Set[int]] = {}
+        for pid, owner in self.owners.items():
+            groups.setdefault(key(owner), set()).add(pid)
+        return {owner: self._view(pids) for owner, pids in groups.items()}
+
+    def _view(self, pids: Set[int]) -> "ProcessSnapshot":
+        view = object.__new__(ProcessSnapshot)
+        view.rules = self.rules
+        if isinstance(self.procs, ProcHandles):
+            view.procs = self.procs.subset(pids)
+        else:
+            view.procs = {pid: self.procs[pid] for pid in pids}
+        view.names = {pid: self.names[pid] for pid in pids}
+        view.ppids = {pid: self.ppids[pid] for pid in pids}
+        view.keys = {pid: self.keys[pid] for pid in pids}
+        view.owners = {pid: self.owners[pid] for pid in pids}
+        view.children = self.children
+        view.launcher_pids = {p: l for p, l in self.launcher_pids.items() if p in pids}
+        view.tracked = {p: l for p, l in self.tracked.items() if p in pids}
+        return view
+
+    def descendants(self, roots: Iterable[int]) -> Set[int]:
+        """Todos los descendientes de ``roots`` según el índice (sin syscalls)."""
+        seen: Set[int] = set()
+        queue = deque(roots)
+        while queue:
+            for child in self.children.get(queue.popleft(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        return seen
+
+    def _descendant_launchers(self) -> Dict[int, str]:
+        # BFS por niveles desde todas las raíces a la vez: cada proceso queda
+        # con el lanzador más cercano (Steam abierto desde Lutris → "steam")
+        found: Dict[int, str] = {}
+        queue = deque(self.launcher_pids)
+        while queue:
+            pid = queue.popleft()
+            label = self.launcher_pids.get(pid) or found[pid]
+            for child in self.children.get(pid, ()):
+                if child not in found and child not in self.launcher_pids:
+                    found[child] = label
+                    queue.append(child)
+        return found
+
+    def name(self, pid: int) -> str:
+        return self.names.get(pid, "")
+
+    def launcher(self, pid: int) -> Optional[str]:
+        """Lanzador al que pertenece ``pid`` (juego, raíz o ayudante propio)."""
+        hit = self.tracked.get(pid) or self.launcher_pids.get(pid)
+        return hit or self.rules.classify(self.names.get(pid, ""))[2] or None
+
+    def is_game(self, pid: int) -> bool:
+        return pid in self.tracked and not self.rules.ignored(self.names.get(pid, ""))
+
+    def handles(self, pids: Iterable[int]) -> List[psutil.Process]:
+        """Procesos de ``pids`` que siguen en la foto (y, desde /proc, vivos)."""
+        found = []
+        for pid in pids:
+            try:
+                found.append(self.procs[pid])
+            except KeyError:
+                pass
+        return found
+
+    def games(self) -> List[psutil.Process]:
+        return self.handles(pid for pid in self.tracked if self.is_game(pid))
+
+    @property
+    def launcher_running(self) -> bool:
+        return bool(self.launcher_pids)
+
+
+# --------------------------------------------------------------------------- #
+# Caché incremental de clasificación
+# --------------------------------------------------------------------------- #
+
+class ClassificationCache:
+    """Recuerda bajo qué lanzador cuelga cada proceso, clave ``(pid, create_time)``.
+
+    Solo se clasifican los procesos nuevos desde el tick anterior (mirando el
+    veredicto ya cacheado del padre); los que desaparecen se desalojan. Si
+    cambian las reglas se empieza de cero.
+    """
+
+    def __init__(self):
+        self._launcher: Dict[ProcKey, Optional[str]] = {}
+        self._rules: Optional[LauncherRules] = None
+
+    def __len__(self) -> int:
+        return len(self._launcher)
+
+    def update(self, snapshot: ProcessSnapshot) -> Dict[int, str]:
+        if snapshot.rules is not self._rules:
+            self._launcher.clear()
+            self._rules = snapshot.rules
+        current = set(snapshot.keys.values())
+        for key in self._launcher.keys() - current:
+            del self._launcher[key]
+        for pid, key in snapshot.keys.items():
+            if key not in self._launcher:
+                self._classify(pid, snapshot)
+        roots = snapshot.launcher_pids
+        return {
+            pid: label
+            for pid, key in snapshot.keys.items()
+            if (label := self._launcher[key]) is not None and pid not in roots
+        }
+
+    def _classify(self, pid: int, snapshot: ProcessSnapshot) -> Optional[str]:
+        # Sube solo por los ancestros que también son nuevos; el primero
+        # cacheado (o una raíz de lanzador) corta la cadena.
+        chain: List[int] = []
+        seen: Set[int] = set()
+        verdict: Optional[str] = None
+        cur: Optional[int] = pid
+        while cur is not None and cur not in seen:
+            seen.add(cur)
+            chain.append(cur)
+            ppid = snapshot.ppids.get(cur)
+            if ppid is None or ppid == cur or ppid not in snapshot.keys:
+                break
+            if ppid in snapshot.launcher_pids:
+                verdict = snapshot.launcher_pids[ppid]
+                break
+            if snapshot.keys[ppid] in self._launcher:
+                verdict = self._launcher[snapshot.keys[ppid]]
+                break
+            cur = ppid
+        for p in chain:
+            self._launcher[snapshot.keys[p]] = verdict
+        return verdict
+
+
+# --------------------------------------------------------------------------- #
+# Clasificación
+# --------------------------------------------------------------------------- #
 
 def has_steam_ancestor(proc: psutil.Process) -> bool:
     try:
         parent = proc.parent()
         while parent:
-            if parent.name().lower() == "steam.exe":
+            if parent.name().lower() == STEAM_NAME:
                 return True
             parent = parent.parent()
     except (psutil.AccessDenied, psutil.NoSuchProcess):
@@ -21,39 +271,168 @@ def has_steam_ancestor(proc: psutil.Process) -> bool:
     return False
 
 
-def is_game(proc: psutil.Process) -> bool:
-    return proc.name().lower() not in IGNORE_NAMES and has_steam_ancestor(proc)
+def launcher_ancestor(
+    proc: psutil.Process, rules: Optional[LauncherRules] = None
+) -> Optional[str]:
+    """Lanzador más cercano subiendo por ``parent()`` (una syscall por nivel)."""
+    rules = rules or get_rules()
+    try:
+        parent = proc.parent()
+        while parent:
+            launcher = rules.root(parent.name().lower())
+            if launcher is not None:
+                return launcher
+            parent = parent.parent()
+    except (psutil.AccessDenied, psutil.NoSuchProcess):
+        pass
+    return None
 
 
-def kill_proc(proc: psutil.Process):
-    try:
-        proc.terminate()
-        proc.wait(timeout=8)
-    except (psutil.NoSuchProcess, psutil.TimeoutExpired, psutil.AccessDenied):
-        # segundo intento más agresivo
+def is_game(proc: psutil.Process, snapshot: Optional[ProcessSnapshot] = None) -> bool:
+    if snapshot is not None:
+        return snapshot.is_game(proc.pid)
+    rules = get_rules()
+    name = proc.name().lower()
+    root, game, helper = rules.classify(name)
+    if root is not None or helper is not None:
+        return False
+    if game is None and rules.needs_exe:
         try:
-            proc.kill()                 # señal SIGKILL / TerminateProcess
-            proc.wait(timeout=5)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
-            # Windows – usa taskkill /F /T
-            if platform.system() == "Windows":
-                subprocess.run(
-                    ["taskkill", "/PID", str(proc.pid), "/F", "/T"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-
-
-def kill_steam_and_games():
-    games: List[psutil.Process] = []
-    steam_procs: List[psutil.Process] = []
-    for proc in psutil.process_iter(["pid", "name"]):
-        name = (proc.info["name"] or "").lower()
-        if name in {"steam.exe", *IGNORE_NAMES}:
-            steam_procs.append(proc)
-        elif is_game(proc):
-            games.append(proc)
-    for p in games:
-        kill_proc(p)
-    for p in steam_procs:
-        kill_proc(p)
\ No newline at end of file
+            game = rules.match(name, proc.exe())
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            pass
+    return game is not None or launcher_ancestor(proc, rules) is not None
+
+
+# --------------------------------------------------------------------------- #
+# Cierre
+# --------------------------------------------------------------------------- #
+
+class KillResult(NamedTuple):
+    pid: int
+    name: str
+    outcome: str    # "terminated" | "killed" | "gone" | "denied" | "survived"
+    latency: float  # s desde el inicio de la fase hasta que el proceso murió
+    launcher: str = ""  # lanzador al que pertenecía (kill_launchers_and_games)
+
+
+def kill_batch(
+    procs: Iterable[psutil.Process],
+    term_timeout: float = TERM_TIMEOUT,
+    kill_timeout: float = KILL_TIMEOUT,
+) -> List[KillResult]:
+    """terminate() a todo el lote, espera en conjunto y escala a kill() en bloque."""
+    start = time.monotonic()
+    names: Dict[int, str] = {}
+    results: Dict[int, KillResult] = {}
+
+    def record(proc: psutil.Process, outcome: str):
+        results[proc.pid] = KillResult(
+            proc.pid, names.get(proc.pid, ""), outcome, time.monotonic() - start
+        )
+
+    def signal_all(batch: List[psutil.Process], method: str) -> List[psutil.Process]:
+        pending = []
+        for proc in batch:
+            try:
+                getattr(proc, method)()
+                pending.append(proc)
+            except psutil.NoSuchProcess:
+                record(proc, "gone")
+            except psutil.AccessDenied:
+                record(proc, "denied")
+        return pending
+
+    batch = []
+    for proc in procs:
+        if proc.pid in names:
+            continue
+        names[proc.pid] = getattr(proc, "info", {}).get("name") or ""
+        batch.append(proc)
+
+    pending = signal_all(batch, "terminate")
+    _, alive = psutil.wait_procs(
+        pending, timeout=term_timeout, callback=lambda p: record(p, "terminated")
+    )
+    pending = signal_all(alive, "kill")  # señal SIGKILL / TerminateProcess
+    _, alive = psutil.wait_procs(
+        pending, timeout=kill_timeout, callback=lambda p: record(p, "killed")
+    )
+    for proc in alive:
+        # Windows – último recurso: taskkill /F /T
+        if platform.system() == "Windows":
+            subprocess.run(
+                ["taskkill", "/PID", str(proc.pid), "/F", "/T"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        record(proc, "survived")
+    return [results[pid] for pid in names if pid in results]
+
+
+def kill_proc(proc: psutil.Process) -> List[KillResult]:
+    return kill_batch([proc])
+
+
+def kill_launchers_and_games(
+    snapshot: Optional[ProcessSnapshot] = None,
+    kill: Callable[..., List[KillResult]] = kill_batch,
+) -> List[KillResult]:
+    """Cierra juegos y lanzadores en dos fases, cada una en paralelo.
+
+    Por defecto (``games-first``) cada lanzador pierde primero sus juegos y
+    luego su propio árbol; con ``launcher-first`` es al revés (lanzadores que
+    relanzan el juego si se cierra antes). Cada fase incluye el árbol completo
+    de descendientes (en Linux no existe el ``/T`` de taskkill). ``kill``
+    cierra cada lote (``kill_batch``; simulado al reproducir una traza).
+    """
+    if snapshot is None:
+        snapshot = ProcessSnapshot.capture()
+    rules = snapshot.rules
+
+    games: Dict[str, Set[int]] = {}
+    for pid, launcher in snapshot.tracked.items():
+        if snapshot.is_game(pid):
+            games.setdefault(launcher, set()).add(pid)
+    label: Dict[int, str] = {}
+    game_trees: Dict[str, Set[int]] = {}
+    for launcher, pids in games.items():
+        tree = (pids | snapshot.descendants(pids)) - label.keys()
+        game_trees[launcher] = tree
+        label.update(dict.fromkeys(tree, launcher))
+
+    owned: Dict[str, List[int]] = {}  # raíces + ayudantes propios, por lanzador
+    for pid, launcher in snapshot.launcher_pids.items():
+        owned.setdefault(launcher, []).append(pid)
+    for pid, name in snapshot.names.items():
+        helper = rules.classify(name)[2]
+        if helper and pid not in snapshot.launcher_pids:
+            owned.setdefault(helper, []).append(pid)
+    trees: Dict[str, Set[int]] = {}
+    for launcher, roots in owned.items():
+        spec = rules.launchers.get(launcher)
+        if spec is None or not spec.close_launcher:
+            continue
+        tree = (set(roots) | snapshot.descendants(roots)) - label.keys()
+        trees[launcher] = tree
+        label.update(dict.fromkeys(tree, launcher))
+
+    first: Set[int] = set()
+    second: Set[int] = set()
+    for launcher in game_trees.keys() | trees.keys():
+        spec = rules.launchers.get(launcher)
+        game_tree, tree = game_trees.get(launcher, set()), trees.get(launcher, set())
+        if spec is not None and spec.order != GAMES_FIRST:
+            first |= tree
+            second |= game_tree
+        else:
+            first |= game_tree
+            second |= tree
+
+    # en una vista por usuario el árbol puede cruzar a procesos ajenos: se omiten
+    results = kill(snapshot.handles(first))
+    results += kill(snapshot.handles(second))
+    return [r._replace(launcher=label.get(r.pid, "")) for r in results]
+
+
+kill_steam_and_games = kill_launchers_and_games  # nombre anterior, se mantiene
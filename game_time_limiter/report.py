@@ -0,0 +1,281 @@
+"""Informes del historial de uso (``game-time-limiter report``).
+
+El uso de cada serie (``local``, cada usuario de ``usage/`` y cada cuenta del
+colector) se carga en una matriz densa series × días de NumPy. Totales por
+día/semana/mes, medias móviles, percentiles, rachas y días al límite son
+operaciones vectorizadas sobre esa matriz: años de historia de muchos
+usuarios o máquinas no pasan por bucles de Python día a día.
+
+La salida (tabla, CSV o JSON) se escribe fila a fila desde las matrices, sin
+montar el informe entero en memoria. Los días sin registro cuentan como 0.
+"""
+from __future__ import annotations
+import csv
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .persistence import USAGE_DIR, open_store
+
+PERIODS = ("day", "week", "month")
+PERCENTILES = (50, 90)
+WINDOW = 7          # periodos de la media móvil
+LIMIT_SLACK = 1.0   # s: el último tick puede quedarse justo por debajo del límite
+LOCAL = "local"     # serie del almacén principal (modo de un solo usuario)
+JSON_CHUNK = 4096   # filas por bloque al escribir JSON
+STORE_SUFFIXES = (".json", ".journal", ".db")
+
+SUMMARY_COLUMNS: Tuple[str, ...] = (
+    "user", "days", "total", "mean", "rolling", "p50", "p90", "max",
+    "streak_max", "streak_now", "limit_hits",
+)
+PERIOD_COLUMNS: Tuple[str, ...] = ("period", "user", "total", "rolling", "limit_hits")
+_DURATIONS = {"total", "mean", "rolling", "p50", "p90", "max"}
+
+
+# --------------------------------------------------------------------------- #
+# Carga
+# --------------------------------------------------------------------------- #
+def _store_usage(stem: Optional[Path], kind: Optional[str]) -> Optional[Dict[str, float]]:
+    """Uso de un almacén existente (None si no hay nada).
+
+    Solo lee: ``read`` no compacta el diario ni aparta un snapshot corrupto,
+    así que el informe puede correr junto al daemon.
+    """
+    if stem is None:
+        store = open_store(kind)
+    elif kind != "journal" and stem.with_name(stem.name + ".db").exists():
+        store = open_store("sqlite", stem)
+    else:
+        store = open_store("journal", stem)
+    files = [getattr(store, name, None) for name in ("path", "snapshot", "journal")]
+    if not any(f is not None and f.exists() for f in files):
+        return None
+    return store.read()
+
+
+def load_histories(
+    kind: Optional[str] = None,
+    collector_state: Optional[Path] = None,
+    users: Sequence[str] = (),
+) -> Dict[str, Dict[str, float]]:
+    """Serie → {día ISO: s}: almacén principal, ``usage/<usuario>.*`` y colector."""
+    series: Dict[str, Dict[str, float]] = {}
+    local = _store_usage(None, kind)
+    if local:
+        series[LOCAL] = local
+    if USAGE_DIR.is_dir():
+        # solo se quita la extensión conocida: ``john.doe.json`` → ``john.doe``
+        stems = {p.with_name(p.name[: -len(ext)]) for p in USAGE_DIR.iterdir()
+                 for ext in STORE_SUFFIXES if p.name.endswith(ext) and p.name != ext}
+        for stem in sorted(stems):
+            usage = _store_usage(stem, kind)
+            if usage:
+                series[stem.name] = usage
+    if collector_state is not None:
+        for account, data in json.loads(collector_state.read_text()).items():
+            series[account] = data.get("used", {})
+    if users:
+        series = {name: usage for name, usage in series.items() if name in users}
+    return series
+
+
+# --------------------------------------------------------------------------- #
+# Matriz series × días
+# --------------------------------------------------------------------------- #
+def _week_start(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 (día 0) fue jueves: +3 lleva el lunes a 0
+    return days - (days.astype(np.int64) + 3) % 7
+
+
+def period_keys(days: np.ndarray, period: str) -> np.ndarray:
+    """Primer día del periodo (día, semana de lunes a domingo, mes) de cada día."""
+    if period == "day":
+        return days
+    if period == "week":
+        return _week_start(days)
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"periodo desconocido: {period!r}")
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Media de los últimos ``window`` periodos (menos al principio), por fila."""
+    csum = np.cumsum(matrix, axis=1)
+    out = csum.copy()
+    out[:, window:] -= csum[:, :-window]
+    counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+    return out / counts
+
+
+class History:
+    """Uso diario como matriz ``seconds[serie, día]`` desde ``start``."""
+
+    def __init__(self, names: List[str], start: np.datetime64, seconds: np.ndarray):
+        self.names = names
+        self.start = start
+        self.seconds = seconds
+        self.days = start + np.arange(seconds.shape[1])
+
+    @classmethod
+    def from_usage(
+        cls,
+        usage: Mapping[str, Mapping[str, float]],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> "History":
+        """``since``/``until`` (ISO, inclusivos) recortan; si faltan, toda la historia."""
+        names = list(usage)
+        columns = []
+        for name in names:
+            days = np.array(list(usage[name]), dtype="datetime64[D]")
+            values = np.fromiter(usage[name].values(), dtype=np.float64, count=len(days))
+            columns.append((days, values))
+        present = [d for d, _ in columns if len(d)]
+        lo = np.datetime64(since, "D") if since else min((d.min() for d in present), default=None)
+        hi = np.datetime64(until, "D") if until else max((d.max() for d in present), default=None)
+        if lo is None or hi is None or hi < lo:
+            return cls(names, np.datetime64("today", "D"), np.zeros((len(names), 0)))
+        seconds = np.zeros((len(names), int((hi - lo).astype(np.int64)) + 1))
+        for row, (days, values) in enumerate(columns):
+            keep = (days >= lo) & (days <= hi)
+            # np.add.at: el mismo día repetido (fuentes fusionadas) se suma
+            np.add.at(seconds[row], (days[keep] - lo).astype(np.int64), values[keep])
+        return cls(names, lo, seconds)
+
+    # ---------------- métricas ----------------
+    def limits(
+        self,
+        default: float,
+        per_user: Optional[Mapping[str, float]] = None,
+        budgets: Optional[Mapping[int, float]] = None,
+    ) -> np.ndarray:
+        """Límite de cada serie y día: presupuesto del día de la semana o el suyo."""
+        per_user = per_user or {}
+        base = np.array([per_user.get(n, default) for n in self.names], dtype=np.float64)
+        weekday = (self.days.astype(np.int64) + 3) % 7  # lunes = 0, como date.weekday()
+        table = np.full(7, np.nan)
+        for day, seconds in (budgets or {}).items():
+            table[day] = seconds
+        by_day = table[weekday]
+        return np.where(np.isnan(by_day), base[:, None], by_day[None, :])
+
+    def limit_hits(self, limits: np.ndarray) -> np.ndarray:
+        """Matriz booleana: días en que se agotó el límite."""
+        return (self.seconds > 0) & (self.seconds >= limits - LIMIT_SLACK)
+
+    def streaks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Racha más larga y racha actual (días seguidos con juego) por serie."""
+        rows, width = self.seconds.shape[0], self.seconds.shape[1] + 2
+        padded = np.zeros((rows, width), dtype=np.int8)
+        padded[:, 1:-1] = self.seconds > 0
+        # cada fila va entre ceros: al aplanar, ninguna racha cruza de una serie a otra
+        edges = np.diff(padded.ravel())
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        lengths = ends - starts
+        longest = np.zeros(rows, dtype=np.int64)
+        np.maximum.at(longest, starts // width, lengths)
+        current = np.zeros(rows, dtype=np.int64)
+        last = ends % width == width - 2  # la racha acaba en el último día
+        current[ends[last] // width] = lengths[last]
+        return longest, current
+
+    def periods(self, period: str, matrix: Optional[np.ndarray] = None):
+        """(inicio de cada periodo, ``matrix`` sumada por periodo)."""
+        matrix = self.seconds if matrix is None else matrix
+        if not matrix.shape[1]:
+            return self.days, matrix
+        keys = period_keys(self.days, period)
+        edges = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        return keys[edges], np.add.reduceat(matrix, edges, axis=1)
+
+    # ---------------- filas ----------------
+    def summary_rows(self, limits: np.ndarray, window: int = WINDOW) -> Iterator[tuple]:
+        days = self.seconds.shape[1]
+        if not days:
+            return
+        pct = np.percentile(self.seconds, PERCENTILES, axis=1).round(1)
+        longest, current = self.streaks()
+        hits = self.limit_hits(limits).sum(axis=1)
+        columns = zip(
+            self.names,
+            self.seconds.sum(axis=1).round(1).tolist(),
+            self.seconds.mean(axis=1).round(1).tolist(),
+            self.seconds[:, -window:].mean(axis=1).round(1).tolist(),
+            pct[0].tolist(),
+            pct[1].tolist(),
+            self.seconds.max(axis=1).round(1).tolist(),
+            longest.tolist(),
+            current.tolist(),
+            hits.tolist(),
+        )
+        for name, total, mean, roll, p50, p90, top, smax, snow, nhits in columns:
+            yield (name, days, total, mean, roll, p50, p90, top, smax, snow, nhits)
+
+    def period_rows(
+        self, period: str, limits: np.ndarray, window: int = WINDOW, chunk: int = 4096
+    ) -> Iterator[tuple]:
+        """Una fila por periodo y serie; se convierte a Python por bloques."""
+        keys, totals = self.periods(period)
+        _, hits = self.periods(period, self.limit_hits(limits).astype(np.int64))
+        rolling = rolling_mean(totals, window).round(1) if totals.shape[1] else totals
+        totals = totals.round(1)
+        unit = "M" if period == "month" else "D"
+        for lo in range(0, len(keys), chunk):
+            hi = lo + chunk
+            labels = np.datetime_as_string(keys[lo:hi].astype(f"datetime64[{unit}]")).tolist()
+            block = zip(labels, totals[:, lo:hi].T.tolist(), rolling[:, lo:hi].T.tolist(),
+                        hits[:, lo:hi].T.tolist())
+            for label, tot, roll, hit in block:
+                for name, t, r, h in zip(self.names, tot, roll, hit):
+                    yield (label, name, t, r, h)
+
+
+# --------------------------------------------------------------------------- #
+# Salida (en streaming)
+# --------------------------------------------------------------------------- #
+def _clock(seconds: float) -> str:
+    # horas sin tope: "812:05:00" en vez de "33 days, 20:05:00"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def write_rows(
+    columns: Sequence[str], rows: Iterable[tuple], fmt: str = "table", out: IO[str] = sys.stdout
+) -> None:
+    """Escribe ``rows`` según ``fmt`` (``table``, ``csv`` o ``json``).
+
+    Las duraciones van en segundos en CSV/JSON y como ``H:MM:SS`` en la tabla.
+    """
+    if fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+    elif fmt == "json":
+        # por bloques: codificar fila a fila cuesta un encoder nuevo por fila
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        it = iter(rows)
+        sep = "\n  "
+        out.write("[")
+        while True:
+            chunk = [dict(zip(columns, row)) for row in islice(it, JSON_CHUNK)]
+            if not chunk:
+                break
+            out.write(sep + encode(chunk)[1:-1])
+            sep = ",\n  "
+        out.write("]\n" if sep == "\n  " else "\n]\n")
+    elif fmt == "table":
+        durations = [c in _DURATIONS for c in columns]
+        widths = [16 if c in ("user", "period") else max(len(c), 10) for c in columns]
+        out.write("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip() + "\n")
+        for row in rows:
+            cells = [_clock(v) if d else str(v) for v, d in zip(row, durations)]
+            out.write("  ".join(c.ljust(w) for c, w in zip(cells, widths)).rstrip() + "\n")
+    else:
+        raise ValueError(f"formato desconocido: {fmt!r}")
@@ -0,0 +1,409 @@
+"""API local de control: JSON-RPC 2.0, un objeto JSON por línea.
+
+El daemon escucha en un socket Unix (``gtl.sock``) o, en Windows, en
+127.0.0.1:``RPC_PORT`` (asyncio no tiene API pública para servir named pipes).
+
+```
+{"jsonrpc": "2.0", "id": 1, "method": "grant_extra", "params": {"amount": "15m", "token": "…"}}
+```
+
+Métodos: ``status``, ``remaining``, ``set_limit``, ``grant_extra``, ``events``
+(últimos eventos del registro), ``subscribe`` (tras responder, envía
+notificaciones ``tick`` con el estado) y ``shutdown`` (el daemon vuelca el uso
+y sale; lo usa la GUI en lugar de matar el proceso).
+En modo multiusuario se indica ``user``. Los métodos que cambian algo exigen el
+token de ``rpc.token``: en POSIX con modo 0600 (solo el usuario del daemon); en
+Windows con una DACL protegida para ese usuario, SYSTEM y Administradores
+(requiere pywin32; sin él no se escribe el token y no se aceptan cambios).
+"""
+from __future__ import annotations
+import json
+import os
+import secrets
+import socket
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Set
+
+from .persistence import PROJECT_ROOT
+from .utils import parse_timedelta
+
+if TYPE_CHECKING:  # asyncio solo en el servidor: los clientes de la CLI no lo cargan
+    import asyncio
+
+RPC_SOCKET = PROJECT_ROOT / "gtl.sock"
+RPC_PORT = 8766
+TOKEN_FILE = PROJECT_ROOT / "rpc.token"
+SUBSCRIBER_QUEUE = 16   # ticks pendientes por suscriptor; si se llena, se descartan los viejos
+CLIENT_TIMEOUT = 5.0
+BACKLOG = 1024          # conexiones en espera de accept (asyncio usa 100 por defecto)
+USE_UNIX = hasattr(socket, "AF_UNIX") and os.name != "nt"
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32001
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _seconds(value: Any) -> float:
+    """``"90m"`` / ``"1h30m"`` / número de segundos."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return parse_timedelta(str(value)).total_seconds()
+    except ValueError as exc:
+        raise RpcError(INVALID_PARAMS, str(exc)) from None
+
+
+def _write_token(path: Path, token: str) -> bool:
+    """Crea ``path`` con ``token`` legible solo por el daemon (y administradores)."""
+    if os.name == "nt":
+        return _write_token_nt(path, token)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)  # O_CREAT no cambia el modo de un archivo que ya existía
+    with os.fdopen(fd, "w") as fh:
+        fh.write(token)
+    return True
+
+
+def _write_token_nt(path: Path, token: str) -> bool:
+    # 0o600 no significa nada en Windows: el archivo heredaría la ACL de
+    # PROJECT_ROOT (lectura para Usuarios). Se crea ya con una DACL protegida.
+    try:
+        import ntsecuritycon  # type: ignore
+        import win32api  # type: ignore
+        import win32con  # type: ignore
+        import win32file  # type: ignore
+        import win32security  # type: ignore
+    except ImportError:
+        print("[WARN] Sin pywin32 no se puede proteger rpc.token: API local solo de lectura")
+        return False
+    proc_token = win32security.OpenProcessToken(
+        win32api.GetCurrentProcess(), win32security.TOKEN_QUERY
+    )
+    owner = win32security.GetTokenInformation(proc_token, win32security.TokenUser)[0]
+    dacl = win32security.ACL()
+    for sid in (
+        owner,
+        win32security.CreateWellKnownSid(win32security.WinLocalSystemSid),
+        win32security.CreateWellKnownSid(win32security.WinBuiltinAdministratorsSid),
+    ):
+        dacl.AddAccessAllowedAce(win32security.ACL_REVISION, ntsecuritycon.FILE_ALL_ACCESS, sid)
+    sd = win32security.SECURITY_DESCRIPTOR()
+    sd.SetSecurityDescriptorDacl(1, dacl, 0)
+    # protegida: sin ACEs heredadas de la carpeta
+    sd.SetSecurityDescriptorControl(
+        win32security.SE_DACL_PROTECTED, win32security.SE_DACL_PROTECTED
+    )
+    attrs = win32security.SECURITY_ATTRIBUTES()
+    attrs.SECURITY_DESCRIPTOR = sd
+    if path.exists():
+        path.unlink()  # CREATE_ALWAYS conservaría la ACL del archivo viejo
+    handle = win32file.CreateFile(
+        str(path), win32con.GENERIC_WRITE, 0, attrs,
+        win32con.CREATE_NEW, win32con.FILE_ATTRIBUTE_NORMAL, None,
+    )
+    try:
+        win32file.WriteFile(handle, token.encode())
+    finally:
+        handle.Close()
+    return True
+
+
+# --------------------------------------------------------------------------- #
+# Servidor (dentro del daemon)
+# --------------------------------------------------------------------------- #
+class RpcServer:
+    """Atiende clientes en un hilo con su propio bucle asyncio.
+
+    Las consultas leen el estado en memoria del Monitor y los cambios solo
+    ajustan el límite y piden un paso, así que ningún cliente (ni cientos)
+    frena el bucle de vigilancia. Los ticks llegan por ``Monitor.listeners``.
+    """
+
+    def __init__(
+        self,
+        target,
+        path: Path = RPC_SOCKET,
+        port: int = RPC_PORT,
+        token_file: Path = TOKEN_FILE,
+    ):
+        self.target = target  # Monitor o MultiUserMonitor
+        self.path = path
+        self.port = port
+        self.token_file = token_file
+        self.token: Optional[str] = secrets.token_hex(16)
+        self._subs: Set[asyncio.Queue] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rpc", daemon=True)
+
+    def start(self) -> "RpcServer":
+        if self.token is None or not _write_token(self.token_file, self.token):
+            self.token = None  # sin archivo protegido nadie puede autorizar cambios
+        self.target.listeners.append(self._on_tick)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def _run(self) -> None:
+        import asyncio  # lazy import
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._listen())
+            self._ready.set()
+            self._loop.run_forever()
+            # parada: los clientes ven EOF (ver _shutdown) y terminan solos
+            tasks = asyncio.all_tasks(self._loop)
+            if tasks:
+                self._loop.run_until_complete(asyncio.wait(tasks, timeout=1))
+        except OSError as exc:
+            print(f"[WARN] API local no disponible: {exc}")
+            self._ready.set()
+        finally:
+            self._loop.close()
+
+    async def _listen(self) -> None:
+        import asyncio  # lazy import
+
+        if USE_UNIX:
+            if self.path.exists():
+                self.path.unlink()  # socket de una ejecución anterior
+            self._server = await asyncio.start_unix_server(
+                self._client, str(self.path), backlog=BACKLOG
+            )
+            os.chmod(self.path, 0o666)  # consultar puede cualquiera; cambiar exige token
+        else:
+            self._server = await asyncio.start_server(
+                self._client, "127.0.0.1", self.port, backlog=BACKLOG
+            )
+
+    # -------- ticks (hilo del Monitor → bucle asyncio) --------
+    def _on_tick(self, state: dict) -> None:
+        if self._loop is not None and self._subs:
+            self._loop.call_soon_threadsafe(self._fanout, state)
+
+    def _fanout(self, state: dict) -> None:
+        for queue in self._subs:
+            if queue.full():
+                queue.get_nowait()  # cliente lento: pierde el tick más viejo
+            queue.put_nowait(state)
+
+    # -------- clientes --------
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        import asyncio  # lazy import
+
+        lock = asyncio.Lock()
+        pump: Optional[asyncio.Task] = None
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+        self._writers.add(writer)
+
+        async def send(payload: dict) -> None:
+            async with lock:
+                writer.write(json.dumps(payload).encode() + b"\n")
+                await writer.drain()
+
+        async def pump_ticks() -> None:
+            while True:
+                state = await queue.get()
+                await send({"jsonrpc": "2.0", "method": "tick", "params": state})
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self._handle(line)
+                if reply is None:
+                    continue
+                await send(reply)
+                if reply.get("result") == {"subscribed": True} and pump is None:
+                    self._subs.add(queue)
+                    pump = asyncio.ensure_future(pump_ticks())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._subs.discard(queue)
+            self._writers.discard(writer)
+            if pump is not None:
+                pump.cancel()
+            writer.close()
+
+    def _handle(self, line: bytes) -> Optional[dict]:
+        req_id = None
+        try:
+            try:
+                req = json.loads(line)
+            except ValueError:
+                raise RpcError(PARSE_ERROR, "JSON inválido") from None
+            if not isinstance(req, dict) or not isinstance(req.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "petición inválida")
+            req_id = req.get("id")
+            params = req.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params debe ser un objeto")
+            handler = getattr(self, "rpc_" + req["method"], None)
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"método desconocido: {req['method']}")
+            result = handler(**params)
+        except RpcError as exc:
+            error = {"code": exc.code, "message": exc.message}
+            return {"jsonrpc": "2.0", "id": req_id, "error": error}
+        except TypeError as exc:  # parámetros que el método no acepta
+            error = {"code": INVALID_PARAMS, "message": str(exc)}
+            return {"jsonrpc": "2.0", "id": req_id, "error": error}
+        except Exception as exc:  # un fallo del método no puede tumbar la conexión
+            print(f"[WARN] API local: petición fallida: {exc!r}")
+            error = {"code": INTERNAL_ERROR, "message": f"error interno: {exc}"}
+            return {"jsonrpc": "2.0", "id": req_id, "error": error}
+        if req_id is None:
+            return None  # notificación: sin respuesta
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+    def _monitor(self, user: Optional[str]):
+        monitors = getattr(self.target, "monitors", None)
+        if monitors is None:
+            return self.target
+        if user is None:
+            raise RpcError(INVALID_PARAMS, "modo multiusuario: falta 'user'")
+        from .multiuser import user_key  # lazy import
+
+        mon = monitors.get(user_key(user))
+        if mon is None:
+            raise RpcError(INVALID_PARAMS, f"usuario sin presupuesto activo: {user}")
+        return mon
+
+    def _authorize(self, token: Optional[str]) -> None:
+        if (
+            self.token is None
+            or token is None
+            or not secrets.compare_digest(str(token), self.token)
+        ):
+            raise RpcError(UNAUTHORIZED, "token inválido")
+
+    # -------- métodos --------
+    def rpc_status(self, user: Optional[str] = None) -> dict:
+        if user is None and hasattr(self.target, "monitors"):
+            # copia tomada con el lock: el bucle añade usuarios desde otro hilo
+            return {"users": {u: m.state() for u, m in self.target.users()}}
+        return self._monitor(user).state()
+
+    def rpc_remaining(self, user: Optional[str] = None) -> float:
+        return self._monitor(user).remaining()
+
+    def rpc_set_limit(self, limit: Any, token: Optional[str] = None, user: Optional[str] = None):
+        self._authorize(token)
+        seconds = _seconds(limit)
+        if seconds < 0:
+            raise RpcError(INVALID_PARAMS, "el límite no puede ser negativo")
+        mon = self._monitor(user)
+        mon.set_limit(timedelta(seconds=seconds))
+        return mon.state()
+
+    def rpc_grant_extra(self, amount: Any, token: Optional[str] = None, user: Optional[str] = None):
+        self._authorize(token)
+        mon = self._monitor(user)
+        mon.grant_extra(_seconds(amount))
+        return mon.state()
+
+    def rpc_events(self, n: int = 50, event: Optional[str] = None, user: Optional[str] = None):
+        from .eventlog import get_event_log  # lazy import
+
+        if not isinstance(n, int) or isinstance(n, bool):
+            raise RpcError(INVALID_PARAMS, "n debe ser un entero")
+        events = get_event_log().recent(None, event)
+        if user is not None:
+            events = [ev for ev in events if ev.get("user") == user]
+        return events[-n:] if n > 0 else []
+
+    def rpc_subscribe(self) -> dict:
+        return {"subscribed": True}
+
+    def rpc_shutdown(self, token: Optional[str] = None) -> dict:
+        self._authorize(token)
+        self.target.stop()  # cancela el bucle: run_async vuelca y cierra al salir
+        return {"stopping": True}
+
+    def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        if self._loop is not None:
+            self._loop.stop()
+
+    def close(self) -> None:
+        if self._on_tick in self.target.listeners:
+            self.target.listeners.remove(self._on_tick)
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._shutdown)
+            self._thread.join(timeout=2)
+        for path in (self.path if USE_UNIX else None, self.token_file):
+            if path is not None and path.exists():
+                path.unlink()
+
+
+# --------------------------------------------------------------------------- #
+# Cliente (síncrono: la CLI no necesita arrancar asyncio)
+# --------------------------------------------------------------------------- #
+class RpcClient:
+    def __init__(self, path: Path = RPC_SOCKET, port: int = RPC_PORT, timeout=CLIENT_TIMEOUT):
+        if USE_UNIX:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(str(path))
+        else:
+            self.sock = socket.create_connection(("127.0.0.1", port), timeout)
+        self._file = self.sock.makefile("rb")
+        self._next_id = 0
+
+    @staticmethod
+    def read_token(token_file: Path = TOKEN_FILE) -> Optional[str]:
+        try:
+            return token_file.read_text().strip()
+        except OSError:
+            return None
+
+    def call(self, method: str, **params) -> Any:
+        self._next_id += 1
+        req = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params}
+        self.sock.sendall(json.dumps(req).encode() + b"\n")
+        while True:
+            msg = self._read()
+            if msg.get("id") == self._next_id:
+                break
+        if "error" in msg:
+            raise RpcError(msg["error"]["code"], msg["error"]["message"])
+        return msg["result"]
+
+    def ticks(self) -> Iterator[dict]:
+        """``subscribe`` y luego cada estado que empuje el daemon."""
+        self.call("subscribe")
+        self.sock.settimeout(None)
+        while True:
+            msg = self._read()
+            if msg.get("method") == "tick":
+                yield msg["params"]
+
+    def _read(self) -> Dict[str, Any]:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("el daemon cerró la conexión")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+        self.sock.close()
@@ -0,0 +1,202 @@
+"""Horarios: presupuesto por día de la semana, franjas bloqueadas y bolsa semanal.
+
+En ``config.json``:
+
+```json
+"schedule": {
+  "budgets": {"weekdays": "1h", "weekend": "3h", "fri": "2h"},
+  "blocked": [{"days": "sun-thu", "from": "22:00", "to": "07:00"}],
+  "weekly": "10h",
+  "rollover": "2h"
+}
+```
+
+``budgets`` sustituye al límite diario los días indicados (el día concreto
+manda sobre el grupo). ``blocked`` son franjas sin juego; si ``to`` es anterior
+a ``from`` la franja cruza la medianoche. ``weekly`` limita la semana (de lunes
+a domingo) y ``rollover`` es cuánto de lo no gastado la semana anterior se
+suma a esta.
+
+Las franjas se compilan a un índice ordenado de intervalos sobre la semana
+(segundos desde el lunes 00:00), así que "¿se puede jugar ahora?" y "¿cuándo
+cambia algo?" son una búsqueda binaria. Se trabaja en hora local de pared: en
+el cambio de hora una franja puede desplazarse una hora ese día.
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .utils import parse_timedelta
+
+DAY = 86_400
+WEEK = 7 * DAY
+INF = float("inf")
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_GROUPS = {
+    "daily": tuple(range(7)),
+    "*": tuple(range(7)),
+    "weekdays": tuple(range(5)),
+    "weekday": tuple(range(5)),
+    "weekend": (5, 6),
+}
+
+
+def parse_days(spec: str) -> Tuple[int, ...]:
+    """``"mon"``, ``"mon-fri"``, ``"sat,sun"``, ``"weekend"``… → días (lunes = 0)."""
+    days: List[int] = []
+    for part in str(spec).lower().replace(" ", "").split(","):
+        if part in DAY_GROUPS:
+            days.extend(DAY_GROUPS[part])
+        elif "-" in part:
+            first, last = (DAY_NAMES.index(p[:3]) for p in part.split("-", 1))
+            days.extend((first + i) % 7 for i in range((last - first) % 7 + 1))
+        elif part[:3] in DAY_NAMES:
+            days.append(DAY_NAMES.index(part[:3]))
+        else:
+            raise ValueError(f"día desconocido: {part!r}")
+    return tuple(sorted(set(days)))
+
+
+def parse_clock(text: str) -> int:
+    """``"22:00"`` → segundos desde medianoche (se admite ``"24:00"``)."""
+    try:
+        hours, _, minutes = str(text).partition(":")
+        seconds = int(hours) * 3600 + int(minutes or 0) * 60
+    except ValueError:
+        raise ValueError(f"hora inválida: {text!r}") from None
+    if not 0 <= seconds <= DAY or not 0 <= int(minutes or 0) < 60:
+        raise ValueError(f"hora inválida: {text!r}")
+    return seconds
+
+
+def _seconds(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return parse_timedelta(str(value)).total_seconds()
+
+
+def week_offset(when: datetime) -> int:
+    """Segundos desde el lunes 00:00 de la semana de ``when``."""
+    return when.weekday() * DAY + when.hour * 3600 + when.minute * 60 + when.second
+
+
+class Schedule:
+    """Reglas compiladas; las consultas no dependen del número de franjas."""
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[int, float]] = None,
+        blocked: Iterable[Tuple[int, int]] = (),
+        weekly: Optional[float] = None,
+        rollover: float = 0.0,
+    ):
+        self.budgets: Dict[int, float] = dict(budgets or {})  # día → s (lunes = 0)
+        self.weekly = weekly
+        self.rollover = rollover
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in self._merge(blocked):
+            self.starts.append(start)
+            self.ends.append(end)
+        # instantes en que algo cambia: bordes de franja y medianoches
+        self.bounds: List[int] = sorted(
+            {*self.starts, *self.ends, *range(0, WEEK + 1, DAY)}
+        )
+
+    @staticmethod
+    def _merge(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        pieces: List[Tuple[int, int]] = []
+        for start, end in intervals:
+            length = min(end - start, WEEK)
+            start %= WEEK
+            end = start + length
+            if end > WEEK:  # cruza de domingo a lunes
+                pieces += [(start, WEEK), (0, end - WEEK)]
+            elif end > start:
+                pieces.append((start, end))
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(pieces):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @classmethod
+    def from_config(cls, raw: Mapping) -> "Schedule":
+        """Sección ``"schedule"`` de ``config.json`` (ValueError si no es válida)."""
+        budgets: Dict[int, float] = {}
+        specs = (raw.get("budgets") or {}).items()
+        # de lo general a lo concreto: "fri" manda sobre "weekdays"
+        for spec, value in sorted(specs, key=lambda kv: -len(parse_days(kv[0]))):
+            for day in parse_days(spec):
+                budgets[day] = _seconds(value)
+        blocked: List[Tuple[int, int]] = []
+        for window in raw.get("blocked") or ():
+            start, end = parse_clock(window["from"]), parse_clock(window["to"])
+            if end <= start:
+                end += DAY  # 22:00 → 07:00 del día siguiente
+            for day in parse_days(window.get("days", "daily")):
+                blocked.append((day * DAY + start, day * DAY + end))
+        weekly = raw.get("weekly")
+        return cls(
+            budgets,
+            blocked,
+            _seconds(weekly) if weekly is not None else None,
+            _seconds(raw.get("rollover", 0)),
+        )
+
+    # ---------------- consultas ----------------
+    def budget(self, day: date, default: float) -> float:
+        return self.budgets.get(day.weekday(), default)
+
+    def blocked_at(self, when: datetime) -> bool:
+        t = week_offset(when)
+        i = bisect_right(self.starts, t) - 1
+        return i >= 0 and t < self.ends[i]
+
+    def until_blocked(self, when: datetime) -> float:
+        """s hasta que empiece la próxima franja bloqueada (0 si ya estamos en una)."""
+        if not self.starts:
+            return INF
+        if self.blocked_at(when):
+            return 0.0
+        t = week_offset(when)
+        i = bisect_right(self.starts, t)
+        nxt = self.starts[i] if i < len(self.starts) else self.starts[0] + WEEK
+        return float(nxt - t)
+
+    def next_boundary(self, when: datetime) -> float:
+        """s hasta el próximo cambio (franja que empieza/acaba o nuevo día)."""
+        t = week_offset(when)
+        return float(self.bounds[bisect_right(self.bounds, t)] - t)
+
+    def week_left(self, day: date, usage: Mapping[str, float]) -> float:
+        """Lo que queda de la bolsa semanal (con lo arrastrado de la anterior)."""
+        if self.weekly is None:
+            return INF
+        monday = day - timedelta(days=day.weekday())
+        used = sum(usage.get((monday + timedelta(days=i)).isoformat(), 0.0)
+                   for i in range(day.weekday() + 1))
+        carry = 0.0
+        if self.rollover > 0:
+            prev = monday - timedelta(days=7)
+            prev_used = sum(usage.get((prev + timedelta(days=i)).isoformat(), 0.0)
+                            for i in range(7))
+            carry = min(max(self.weekly - prev_used, 0.0), self.rollover)
+        return self.weekly + carry - used
+
+    def allowance(
+        self, when: datetime, usage: Mapping[str, float], extra: float = 0.0
+    ) -> float:
+        """Tope que imponen semana y franjas al restante del día (inf si ninguno).
+
+        El tiempo extra concedido hoy también amplía la bolsa semanal, pero no
+        abre una franja bloqueada.
+        """
+        until = self.until_blocked(when)
+        if until <= 0:
+            return 0.0
+        return min(until, self.week_left(when.date(), usage) + extra)
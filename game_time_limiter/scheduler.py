@@ -0,0 +1,70 @@
+from __future__ import annotations
+from typing import Callable, Iterable, Set
+
+from .notifier import notify
+
+# --------------------------------------------------------------------------- #
+# Planificador adaptativo del loop del Monitor
+# --------------------------------------------------------------------------- #
+POLL_INTERVAL = 300          # s: con un lanzador abierto y tiempo de sobra
+IDLE_INTERVAL = 900          # s: sin ningún lanzador abierto
+MIN_INTERVAL = 1.0           # s: cota inferior al acercarse al límite
+APPROACH_FACTOR = 0.5        # dormir como mucho esta fracción del tiempo restante
+WARNING_THRESHOLDS = (15 * 60, 5 * 60, 60)  # avisos a 15/5/1 min
+
+
+class AdaptiveScheduler:
+    """Decide cuánto dormir entre pasos y dispara los avisos de tiempo restante.
+
+    Duerme largo si no hay ningún lanzador, acorta el intervalo cuando el tiempo restante
+    se acerca a cero y se despierta justo en cada umbral de aviso y en el
+    instante en que se agota el presupuesto.
+    """
+
+    def __init__(
+        self,
+        poll: float = POLL_INTERVAL,
+        idle: float = IDLE_INTERVAL,
+        warnings: Iterable[float] = WARNING_THRESHOLDS,
+        notify_fn: Callable[..., object] = notify,  # (mensaje, key=...)
+    ):
+        self.poll = poll
+        self.idle = idle
+        self.warnings = sorted({float(w) for w in warnings if w > 0}, reverse=True)
+        self.notify_fn = notify_fn
+        self._fired: Set[float] = set()
+
+    def configure(self, poll: float, idle: float, warnings: Iterable[float]) -> None:
+        """Nuevos intervalos / umbrales (recarga de config); los avisos ya dados se conservan."""
+        self.poll = poll
+        self.idle = idle
+        self.warnings = sorted({float(w) for w in warnings if w > 0}, reverse=True)
+        self._fired &= set(self.warnings)
+
+    def next_delay(self, remaining: float, launcher_running: bool, game_active: bool) -> float:
+        if not launcher_running:
+            return self.idle
+        if remaining <= 0 or not game_active:
+            # sin juego el contador no avanza; los eventos cubren el arranque
+            return self.poll
+        targets = [remaining - w for w in self.warnings if w < remaining]
+        targets.append(remaining)  # despertar justo al agotarse
+        delay = min(self.poll, max(remaining * APPROACH_FACTOR, MIN_INTERVAL), *targets)
+        return max(delay, 0.0)
+
+    def check_warnings(self, remaining: float) -> None:
+        """Avisa una vez por umbral; se rearma si el restante vuelve a subir."""
+        for w in self.warnings:
+            if remaining > w:
+                self._fired.discard(w)
+            elif remaining > 0 and w not in self._fired:
+                self._fired.add(w)
+                # solo el umbral más pequeño alcanzado genera aviso
+                if not any(x < w and remaining <= x for x in self.warnings):
+                    self.notify_fn(
+                        f"Quedan {int(remaining // 60)} min {int(remaining % 60)} s de juego.",
+                        key=f"warn-{int(w)}",
+                    )
+
+    def reset(self) -> None:
+        self._fired.clear()
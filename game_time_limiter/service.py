@@ -1,12 +1,16 @@
 import os
-from datetime import timedelta
 
 if os.name == "nt":
     import win32serviceutil  # type: ignore
     import win32service  # type: ignore
     import win32event  # type: ignore
 
-    from .monitor import Monitor, DEFAULT_LIMIT
+    from .config import ConfigWatcher
+    from .eventlog import EventLog, set_event_log
+    from .monitor import Monitor
+    from .notifier import get_notifier
+    from .rpc import RpcServer
+    from .status import StatusPublisher
 
 
     class GameTimeService(win32serviceutil.ServiceFramework):
@@ -17,11 +21,32 @@ if os.name == "nt":
         def __init__(self, args):
             win32serviceutil.ServiceFramework.__init__(self, args)
             self.stop_event = win32event.CreateEvent(None, 0, 0, None)
-            self.monitor = Monitor(DEFAULT_LIMIT)
+            # sin consola: los eventos solo van a events.jsonl (y a la API local)
+            self.events = EventLog(console=False)
+            set_event_log(self.events)
+            # el límite sale de config.json y se recarga sin reiniciar el servicio
+            self.config = ConfigWatcher()
+            cfg = self.config.current
+            self.monitor = Monitor(
+                cfg.limit, warnings=cfg.warnings, rules=cfg.rules, status=StatusPublisher()
+            )
+            self.monitor.apply_config(cfg)
+            self.config.on_change = self.monitor.apply_config
+            self.rpc = RpcServer(self.monitor)
 
         def SvcStop(self):  # noqa: N802
             self.ReportServiceStatus(win32service.SERVICE_STOP_PENDING)
+            self.config.close()
+            self.rpc.close()
+            # cancela el bucle de SvcDoRun: run_async vuelca el uso pendiente al salir
+            self.monitor.stop()
             win32event.SetEvent(self.stop_event)
 
         def SvcDoRun(self):  # noqa: N802
-            self.monitor.loop()
\ No newline at end of file
+            self.rpc.start()
+            self.config.start()
+            try:
+                self.monitor.loop()  # vuelve cuando SvcStop cancela la tarea
+            finally:
+                get_notifier().close()
+                self.events.close()  # el último: monitor.close() aún registra game_stop
\ No newline at end of file
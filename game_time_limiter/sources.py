@@ -0,0 +1,210 @@
+from __future__ import annotations
+import os
+import sys
+from array import array
+from itertools import repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import psutil
+
+# --------------------------------------------------------------------------- #
+# Fuentes de la tabla de procesos (lo que alimenta a ProcessSnapshot)
+# --------------------------------------------------------------------------- #
+PROCFS = "/proc"
+
+Row = Tuple[int, Optional[int], str, float, Optional[str], Optional[str]]
+# (pid, ppid, nombre en minúsculas, create_time, usuario, exe)
+
+
+class ProcessSource:
+    """Interfaz: ``scan(attrs)`` devuelve procesos tipo psutil o una ``ProcTable``.
+
+    ``attrs`` sigue la convención de ``psutil.process_iter`` (``pid``, ``ppid``,
+    ``name``, ``create_time`` y opcionalmente ``username`` / ``exe``).
+    """
+
+    name = "base"
+
+    def scan(self, attrs: List[str]):
+        raise NotImplementedError
+
+
+class PsutilSource(ProcessSource):
+    """Portable (Windows, macOS, Linux): ``psutil.process_iter``."""
+
+    name = "psutil"
+
+    def __init__(self, process_iter: Optional[Callable[..., Iterable]] = None):
+        self.process_iter = process_iter or psutil.process_iter
+
+    def scan(self, attrs: List[str]) -> list:
+        return list(self.process_iter(attrs))
+
+
+class ProcHandles(Mapping):
+    """pid → ``psutil.Process`` creado solo al pedirlo (cierre, muestreo de CPU).
+
+    Un pid reciclado desde el escaneo (otro ``create_time``) no se devuelve.
+    """
+
+    def __init__(self, keys: Dict[int, Tuple[int, float]], names: Dict[int, str]):
+        self._keys = keys
+        self._names = names
+        self._cache: Dict[int, psutil.Process] = {}
+
+    def __getitem__(self, pid: int) -> psutil.Process:
+        proc = self._cache.get(pid)
+        if proc is None:
+            if pid not in self._keys:
+                raise KeyError(pid)
+            try:
+                proc = psutil.Process(pid)
+                if abs(proc.create_time() - self._keys[pid][1]) > 0.01:
+                    raise KeyError(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                raise KeyError(pid) from None
+            proc.info = {"pid": pid, "name": self._names.get(pid, "")}
+            self._cache[pid] = proc
+        return proc
+
+    def subset(self, pids: Iterable[int]) -> "ProcHandles":
+        sub = ProcHandles({p: self._keys[p] for p in pids}, self._names)
+        sub._cache = {p: self._cache[p] for p in sub._keys if p in self._cache}
+        return sub
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self._keys
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class ProcTable:
+    """Tabla compacta: arrays paralelos + tabla de nombres internados."""
+
+    def __init__(self, names: List[str], want_owner: bool = False, want_exe: bool = False):
+        self.pids = array("i")
+        self.ppids = array("i")
+        self.ctimes = array("d")
+        self.name_ids = array("I")
+        self.names = names  # compartida entre escaneos (ProcFsSource)
+        self.owners: Optional[List[Optional[str]]] = [] if want_owner else None
+        self.exes: Optional[List[Optional[str]]] = [] if want_exe else None
+
+    def __len__(self) -> int:
+        return len(self.pids)
+
+    def rows(self) -> Iterator[Row]:
+        names = self.names
+        return zip(
+            self.pids,
+            self.ppids,
+            (names[i] for i in self.name_ids),
+            self.ctimes,
+            self.owners if self.owners is not None else repeat(None),
+            self.exes if self.exes is not None else repeat(None),
+        )
+
+
+class ProcFsSource(ProcessSource):
+    """Linux: un ``scandir('/proc')`` y una lectura de ``stat`` por proceso.
+
+    Sin objetos psutil ni diccionarios por proceso; los ``psutil.Process`` solo
+    se crean para los procesos que hay que cerrar o muestrear.
+    """
+
+    name = "procfs"
+
+    def __init__(self, root: str = PROCFS):
+        self.root = root
+        self._clk_tck = os.sysconf("SC_CLK_TCK")
+        self._btime = self._boot_time()
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._users: Dict[int, Optional[str]] = {}
+
+    def _boot_time(self) -> float:
+        with open(os.path.join(self.root, "stat"), "rb") as fh:
+            for line in fh:
+                if line.startswith(b"btime"):
+                    return float(line.split()[1])
+        raise OSError("btime no encontrado en /proc/stat")
+
+    def _name_id(self, name: str) -> int:
+        nid = self._name_ids.get(name)
+        if nid is None:
+            nid = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return nid
+
+    def _user(self, uid: int) -> Optional[str]:
+        if uid not in self._users:
+            import pwd  # lazy import
+
+            try:
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._users[uid] = str(uid)
+        return self._users[uid]
+
+    def _full_name(self, base: str, comm: str) -> str:
+        # comm se corta a 15 caracteres: como psutil, se completa con cmdline
+        try:
+            with open(f"{base}/cmdline", "rb") as fh:
+                argv0 = fh.read().split(b"\0", 1)[0].decode(errors="replace")
+        except OSError:
+            return comm
+        exe = argv0.replace("\\", "/").rsplit("/", 1)[-1]
+        return exe if exe.startswith(comm) else comm
+
+    def scan(self, attrs: List[str]) -> ProcTable:
+        want_owner, want_exe = "username" in attrs, "exe" in attrs
+        table = ProcTable(self._names, want_owner, want_exe)
+        pids, ppids, ctimes, name_ids = table.pids, table.ppids, table.ctimes, table.name_ids
+        owners, exes = table.owners, table.exes
+        clk, btime, root = self._clk_tck, self._btime, self.root
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.name.isdigit():
+                    continue
+                base = f"{root}/{entry.name}"
+                try:
+                    with open(f"{base}/stat", "rb") as fh:
+                        data = fh.read()
+                except OSError:
+                    continue  # terminó entre el listado y la lectura
+                lpar, rpar = data.find(b"("), data.rfind(b")")
+                comm = data[lpar + 1:rpar].decode(errors="replace")
+                fields = data[rpar + 2:].split()
+                if len(comm) >= 15:
+                    comm = self._full_name(base, comm)
+                pids.append(int(entry.name))
+                ppids.append(int(fields[1]))
+                ctimes.append(btime + int(fields[19]) / clk)
+                name_ids.append(self._name_id(comm.lower()))
+                if owners is not None:
+                    try:
+                        owners.append(self._user(entry.stat().st_uid))
+                    except OSError:
+                        owners.append(None)
+                if exes is not None:
+                    try:
+                        exes.append(os.readlink(f"{base}/exe"))
+                    except OSError:
+                        exes.append(None)
+        return table
+
+
+def default_process_source(kind: Optional[str] = None) -> ProcessSource:
+    """``psutil`` (por defecto) o ``procfs``; también vía ``$GTL_PROCESS_SOURCE``."""
+    kind = kind or os.environ.get("GTL_PROCESS_SOURCE", "psutil")
+    if kind == "procfs":
+        if sys.platform.startswith("linux") and os.path.isdir(PROCFS):
+            return ProcFsSource()
+        print("[WARN] procfs solo existe en Linux; se usa psutil")
+    elif kind != "psutil":
+        raise ValueError(f"fuente de procesos desconocida: {kind!r}")
+    return PsutilSource()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .persistence import PROJECT_ROOT, UsageJournal
+
+DB_FILE = PROJECT_ROOT / "usage.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id       INTEGER PRIMARY KEY,
+    day      TEXT    NOT NULL,
+    exe      TEXT    NOT NULL,
+    pid      INTEGER,
+    start    REAL    NOT NULL,
+    end      REAL    NOT NULL,
+    duration REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions(day);
+CREATE INDEX IF NOT EXISTS idx_sessions_exe ON sessions(exe, day);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    day     TEXT PRIMARY KEY,
+    seconds REAL NOT NULL
+);
+"""
+
+
+class SqliteUsageStore:
+    """Backend SQLite: sesiones por juego + agregado diario materializado.
+
+    Misma interfaz que ``UsageJournal`` (load/add/set/save/sync/close/reset),
+    más ``rollback``. La primera vez que se abre una base nueva importa el uso
+    de ``<stem>.json``/``.journal`` (el backend por defecto), así cambiar a
+    ``--store sqlite`` no empieza el día de cero.
+    Las escrituras se acumulan en la transacción abierta y ``sync`` hace un
+    único commit por volcado del checkpointer.
+    """
+
+    def __init__(self, path: Path = DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._open(import_journal=True)
+        return self._conn
+
+    def _open(self, import_journal: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        # user_version 0 = base recién creada: aún no se miró el diario JSON
+        if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            if import_journal:
+                self._import_journal(conn)
+            conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        return conn
+
+    def _import_journal(self, conn: sqlite3.Connection) -> None:
+        if conn.execute("SELECT 1 FROM daily_totals LIMIT 1").fetchone():
+            return
+        name = self.path.name[: -len(".db")] if self.path.name.endswith(".db") else self.path.name
+        stem = self.path.with_name(name)
+        usage = UsageJournal(
+            stem.with_name(stem.name + ".json"), stem.with_name(stem.name + ".journal")
+        ).read()  # sin efectos: el diario JSON queda como estaba
+        if usage:
+            conn.executemany(
+                "INSERT INTO daily_totals(day, seconds) VALUES (?, ?)", usage.items()
+            )
+            print(f"[INFO] {self.path.name}: importados {len(usage)} días de {stem.name}.json")
+
+    # ----------------------------- interfaz ----------------------------- #
+    def load(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.conn.execute("SELECT day, seconds FROM daily_totals"))
+
+    def read(self) -> Dict[str, float]:
+        """Totales en modo solo lectura: no crea esquema ni cambia el modo WAL."""
+        conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT day, seconds FROM daily_totals"))
+        except sqlite3.OperationalError:
+            return {}  # base sin tablas todavía
+        finally:
+            conn.close()
+
+    def add(self, day: str, delta: float) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO daily_totals(day, seconds) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET seconds = seconds + excluded.seconds",
+                (day, delta),
+            )
+
+    def set(self, day: str, seconds: float) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO daily_totals(day, seconds) VALUES (?, ?)",
+                (day, seconds),
+            )
+
+    def save(self, data: Dict[str, float]) -> None:
+        """Sustituye todos los totales (como el snapshot del diario)."""
+        with self._lock:
+            self.conn.execute("DELETE FROM daily_totals")
+            self.conn.executemany(
+                "INSERT INTO daily_totals(day, seconds) VALUES (?, ?)", data.items()
+            )
+            self.conn.commit()
+
+    def add_session(self, exe: str, pid: int, start: float, end: float) -> None:
+        day = date.fromtimestamp(start).isoformat()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO sessions(day, exe, pid, start, end, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (day, exe, pid, start, end, max(end - start, 0.0)),
+            )
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+
+    def rollback(self) -> None:
+        """Descarta lo escrito desde el último ``sync`` (volcado fallido)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.rollback()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def reset(self) -> None:
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+        with self._lock:
+            self._conn = self._open(import_journal=False)  # vacía: no reimportar el JSON
+
+    # ----------------------------- consultas ---------------------------- #
+    def daily_total(self, day: str) -> float:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT seconds FROM daily_totals WHERE day = ?", (day,)
+            ).fetchone()
+        return row[0] if row else 0.0
+
+    def daily_totals(self, start: str, end: str) -> List[Tuple[str, float]]:
+        """Totales por día en [start, end] (fechas ISO)."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT day, seconds FROM daily_totals WHERE day BETWEEN ? AND ? ORDER BY day",
+                (start, end),
+            ).fetchall()
+
+    def per_game(self, start: str, end: str) -> List[Tuple[str, float, int]]:
+        """(exe, segundos, sesiones) en [start, end], de más a menos tiempo."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT exe, SUM(duration), COUNT(*) FROM sessions "
+                "WHERE day BETWEEN ? AND ? GROUP BY exe ORDER BY 2 DESC",
+                (start, end),
+            ).fetchall()
+
+    def sessions(
+        self, start: str, end: str, exe: Optional[str] = None
+    ) -> List[Tuple[str, str, int, float, float, float]]:
+        sql = "SELECT day, exe, pid, start, end, duration FROM sessions WHERE day BETWEEN ? AND ?"
+        args: tuple = (start, end)
+        if exe is not None:
+            sql += " AND exe = ?"
+            args += (exe,)
+        with self._lock:
+            return self.conn.execute(sql + " ORDER BY start", args).fetchall()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .persistence import PROJECT_ROOT, user_stem
+
+# --------------------------------------------------------------------------- #
+# Bloque de estado compartido (mmap) daemon → GUI / clientes locales
+# --------------------------------------------------------------------------- #
+STATUS_FILE = PROJECT_ROOT / "status.bin"
+STALE_AFTER = 15.0  # s sin publicar → el daemon se considera parado
+
+_MAGIC = b"GTLS"
+_VERSION = 1
+_HDR = struct.Struct("<4sHxxI")      # magic, versión, secuencia (seqlock)
+_BODY = struct.Struct("<ddddB3xI")   # ts, límite, usado, restante, activo, pid
+_SIZE = _HDR.size + _BODY.size
+
+
+class Status(NamedTuple):
+    ts: float          # time.time() de la publicación
+    limit: float       # s
+    used: float        # s hoy
+    remaining: float   # s al publicar
+    active: bool       # había juego contando
+    pid: int           # pid del daemon
+
+    def remaining_now(self, now: Optional[float] = None) -> float:
+        """Interpola la cuenta atrás entre publicaciones."""
+        if not self.active:
+            return self.remaining
+        elapsed = (now or time.time()) - self.ts
+        return max(self.remaining - max(elapsed, 0.0), 0.0)
+
+    def stale(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - self.ts > STALE_AFTER
+
+
+def status_path(user: Optional[str] = None) -> Path:
+    """Bloque del daemon (``None``) o de un usuario en modo multiusuario."""
+    if user is None:
+        return STATUS_FILE
+    stem = user_stem(user)
+    return stem.with_name(stem.name + ".status")
+
+
+class StatusPublisher:
+    """Escribe el estado en un archivo mapeado en memoria (seqlock).
+
+    Publicar son unas decenas de bytes en memoria; los lectores no hacen
+    syscalls y reintentan si pillan una escritura a medias.
+    """
+
+    def __init__(self, path: Path = STATUS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.ftruncate(fd, _SIZE)
+            self._mm = mmap.mmap(fd, _SIZE)
+        finally:
+            os.close(fd)
+        self._seq = 0
+        _HDR.pack_into(self._mm, 0, _MAGIC, _VERSION, self._seq)
+
+    def publish(self, limit: float, used: float, remaining: float, active: bool) -> None:
+        with self._lock:
+            if self._mm.closed:
+                return  # Monitor.close puede llegar dos veces (atexit + señal)
+            self._seq += 1  # impar: escritura en curso
+            _HDR.pack_into(self._mm, 0, _MAGIC, _VERSION, self._seq)
+            _BODY.pack_into(
+                self._mm, _HDR.size, time.time(), limit, used, remaining, active, os.getpid()
+            )
+            self._seq += 1
+            _HDR.pack_into(self._mm, 0, _MAGIC, _VERSION, self._seq)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mm.closed:
+                return
+            _BODY.pack_into(self._mm, _HDR.size, 0.0, 0.0, 0.0, 0.0, False, 0)
+            self._mm.close()
+
+
+class StatusReader:
+    def __init__(self, path: Path = STATUS_FILE):
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+
+    def _map(self) -> Optional[mmap.mmap]:
+        if self._mm is None:
+            try:
+                with open(self.path, "rb") as fh:
+                    self._mm = mmap.mmap(fh.fileno(), _SIZE, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+        return self._mm
+
+    def read(self) -> Optional[Status]:
+        """Último estado publicado, o None si no hay daemon."""
+        mm = self._map()
+        if mm is None:
+            return None
+        for _ in range(100):
+            magic, version, seq1 = _HDR.unpack_from(mm, 0)
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            if seq1 % 2:
+                continue
+            body = _BODY.unpack_from(mm, _HDR.size)
+            if _HDR.unpack_from(mm, 0)[2] == seq1:
+                status = Status(body[0], body[1], body[2], body[3], bool(body[4]), body[5])
+                return status if status.ts else None
+        return None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
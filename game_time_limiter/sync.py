@@ -0,0 +1,143 @@
+from __future__ import annotations
+import gzip
+import json
+import os
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from .persistence import PROJECT_ROOT
+
+# --------------------------------------------------------------------------- #
+# Sincronización con un colector central (opcional)
+# --------------------------------------------------------------------------- #
+SPOOL_DIR = PROJECT_ROOT / "sync-spool"   # lotes pendientes mientras no hay red
+BATCH_INTERVAL = 30.0    # s entre lotes
+BACKOFF_MIN = 2.0        # s tras el primer fallo…
+BACKOFF_MAX = 300.0      # …duplicando hasta este tope
+HTTP_TIMEOUT = 10.0
+
+
+class SyncClient:
+    """Sube los deltas de uso en lotes comprimidos y recibe el total de la cuenta.
+
+    El Monitor solo llama a ``add`` (memoria). Un hilo agrupa los deltas por
+    día cada ``BATCH_INTERVAL`` s, los deja en ``SPOOL_DIR`` (gzip) y los envía
+    por orden; si falla, reintenta con backoff exponencial y los lotes siguen en
+    disco. Cada lote lleva un id único: el colector descarta reenvíos.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        account: str,
+        machine: Optional[str] = None,
+        token: Optional[str] = None,
+        spool_dir: Path = SPOOL_DIR,
+        interval: float = BATCH_INTERVAL,
+    ):
+        self.url = url.rstrip("/")
+        self.account = account
+        self.machine = machine or socket.gethostname()
+        self.token = token
+        self.spool_dir = spool_dir / account
+        self.interval = interval
+        self.remote_used: Dict[str, float] = {}   # total de la cuenta según el colector
+        self.remote_limit: Optional[float] = None
+        self._pending: Dict[str, float] = {}      # aún en memoria
+        self._unacked: Dict[str, float] = {}      # en memoria o en el spool
+        self._lock = threading.Lock()
+        self._halt = threading.Event()
+        self._backoff = 0.0
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.spool_dir.glob("*.json.gz"):  # lotes de una corrida anterior
+            for day, seconds in json.loads(gzip.decompress(path.read_bytes()))["deltas"]:
+                self._unacked[day] = self._unacked.get(day, 0.0) + seconds
+        self._thread = threading.Thread(target=self._run, name="usage-sync", daemon=True)
+        self._thread.start()
+
+    # -------- lado del Monitor --------
+    def add(self, day: str, delta: float) -> None:
+        with self._lock:
+            self._pending[day] = self._pending.get(day, 0.0) + delta
+            self._unacked[day] = self._unacked.get(day, 0.0) + delta
+
+    def used(self, day: str) -> float:
+        """Uso de la cuenta en todas las máquinas, incluido lo aún no confirmado."""
+        with self._lock:
+            return self.remote_used.get(day, 0.0) + self._unacked.get(day, 0.0)
+
+    # -------- hilo --------
+    def _run(self) -> None:
+        while not self._halt.wait(max(self.interval, self._backoff)):
+            self.sync_once()
+
+    def sync_once(self) -> bool:
+        """Encola lo pendiente y envía el spool; sin lotes consulta el total."""
+        self._spool_pending()
+        batches = sorted(self.spool_dir.glob("*.json.gz"))
+        try:
+            if not batches:
+                self._apply(self._request("GET", None))
+            for path in batches:
+                body = path.read_bytes()
+                state = self._request("POST", body)
+                self._apply(state, json.loads(gzip.decompress(body))["deltas"])
+                path.unlink()
+        except (urllib.error.URLError, OSError, ValueError) as exc:
+            self._backoff = min(max(self._backoff * 2, BACKOFF_MIN), BACKOFF_MAX)
+            self._backoff *= random.uniform(0.8, 1.2)  # jitter entre máquinas
+            print(f"[WARN] Sync con {self.url} falló ({exc}); reintento en {self._backoff:.0f} s")
+            return False
+        self._backoff = 0.0
+        return True
+
+    def _spool_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        batch = {
+            "batch": uuid.uuid4().hex,
+            "account": self.account,
+            "machine": self.machine,
+            "sent": time.time(),
+            "deltas": [[day, round(sec, 3)] for day, sec in pending.items()],
+        }
+        name = f"{time.time_ns():020d}-{batch['batch']}.json.gz"
+        tmp = self.spool_dir / (name + ".tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(batch).encode()))
+        os.replace(tmp, self.spool_dir / name)
+
+    def _request(self, method: str, body: Optional[bytes]) -> dict:
+        url = f"{self.url}/v1/usage?account={urllib.parse.quote(self.account)}"
+        req = urllib.request.Request(url, data=body, method=method)
+        req.add_header("Accept", "application/json")
+        if body is not None:
+            req.add_header("Content-Type", "application/json")
+            req.add_header("Content-Encoding", "gzip")
+        if self.token:
+            req.add_header("X-GTL-Token", self.token)
+        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as resp:
+            return json.loads(resp.read())
+
+    def _apply(self, state: dict, acked=()) -> None:
+        """Nuevo total remoto; lo confirmado deja de contarse como local."""
+        with self._lock:
+            self.remote_used = {d: float(s) for d, s in state.get("used", {}).items()}
+            self.remote_limit = state.get("limit")
+            for day, seconds in acked:
+                self._unacked[day] = max(self._unacked.get(day, 0.0) - seconds, 0.0)
+
+    def close(self) -> None:
+        """Deja lo pendiente en el spool; se envía en la próxima ejecución."""
+        self._halt.set()
+        self._thread.join(timeout=1)
+        self._spool_pending()
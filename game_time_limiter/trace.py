@@ -0,0 +1,357 @@
+"""Grabación y reproducción de la tabla de procesos (pruebas y benchmark).
+
+``RecordingSource`` envuelve la fuente real del daemon y guarda cada escaneo
+en una traza JSONL (``.gz`` si el nombre lo pide) codificada por diferencias:
+
+```
+{"trace": 1, "ts": 1760000000.0}            ← arranque del daemon
+[1760000000.0, [[pid, ppid, name, ctime, owner, exe], ...], [pid, ...]]
+```
+
+Cada tick guarda solo los procesos que aparecen y los que desaparecen, así
+una semana de uso ocupa poco. Cada arranque abre una cabecera nueva.
+
+``replay`` pasa la traza por un ``Monitor`` de verdad con reloj y fuente
+inyectados: el tiempo es el grabado, los cierres se simulan (los procesos
+cerrados salen de la tabla; vuelven si la traza les cuelga un hijo nuevo, es
+decir, si se abrió otra vez el lanzador) y entre dos ticks grabados se añaden
+los que habría pedido el planificador adaptativo. Cada cabecera es un reinicio (el
+uso se conserva en un almacén en memoria). Devuelve el uso final, los cierres
+y el coste de cada tick.
+"""
+from __future__ import annotations
+import gzip
+import json
+import os
+import statistics
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union, cast
+
+from .process_utils import KillResult
+from .sources import ProcessSource, ProcTable, Row
+
+TRACE_VERSION = 1
+REPLAY_STALENESS = 365 * 86_400.0  # el checkpointer no corre con reloj real
+
+Tick = Tuple[float, List[list], List[int]]  # (ts, altas, bajas)
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+# --------------------------------------------------------------------------- #
+# Grabación
+# --------------------------------------------------------------------------- #
+class TraceWriter:
+    """Añade a ``path`` una cabecera y luego un tick (diferencias) por ``write``."""
+
+    def __init__(self, path: Path, clock=time.time):
+        self.path = path
+        if path.suffix != ".gz" and path.exists() and path.stat().st_size:
+            with open(path, "rb") as fh:
+                fh.seek(-1, os.SEEK_END)
+                broken = fh.read(1) != b"\n"  # corte a media línea: se deja sola
+        else:
+            broken = False
+        self._fh = _open(path, "a")
+        if broken:
+            self._fh.write("\n")
+        self._fh.write(json.dumps({"trace": TRACE_VERSION, "ts": clock()}) + "\n")
+        self._prev: Dict[int, tuple] = {}
+        self.ticks = 0
+
+    def write(self, ts: float, rows) -> None:
+        current = {row[0]: tuple(row) for row in rows}
+        prev = self._prev
+        adds = [list(row) for pid, row in current.items() if prev.get(pid) != row]
+        dels = [pid for pid in prev if pid not in current]
+        self._prev = current
+        self._fh.write(json.dumps([ts, adds, dels], separators=(",", ":")) + "\n")
+        self._fh.flush()  # un corte pierde como mucho el tick en curso
+        self.ticks += 1
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class RecordingSource(ProcessSource):
+    """Fuente que delega en ``inner`` y graba cada escaneo en la traza."""
+
+    def __init__(self, inner: ProcessSource, path: Path, clock=time.time):
+        self.inner = inner
+        self.name = f"{inner.name}+trace"
+        self.clock = clock
+        self.writer = TraceWriter(path, clock)
+
+    def scan(self, attrs: List[str]):
+        procs = self.inner.scan(attrs)
+        ts = self.clock()
+        if isinstance(procs, ProcTable):
+            rows = procs.rows()
+        else:
+            rows = (_info_row(p.info) for p in procs)
+        self.writer.write(ts, rows)
+        return procs
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _info_row(info: dict) -> Row:
+    # lo mismo que lee ProcessSnapshot._rows
+    return (
+        info["pid"],
+        info.get("ppid"),
+        (info.get("name") or "").lower(),
+        info.get("create_time") or 0.0,
+        info.get("username"),
+        info.get("exe"),
+    )
+
+
+def read_trace(path: Path) -> Iterator[Union[dict, Tick]]:
+    """Cabeceras (dict) y ticks en orden; las líneas rotas se saltan."""
+    with _open(path, "r") as fh:
+        try:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # tick a medio escribir antes de un corte
+                yield rec if isinstance(rec, dict) else (rec[0], rec[1], rec[2])
+        except (EOFError, OSError, zlib.error) as exc:
+            print(f"[WARN] {path.name} truncada ({exc}); se reproduce hasta ahí")
+
+
+# --------------------------------------------------------------------------- #
+# Reproducción
+# --------------------------------------------------------------------------- #
+class TracedProcess:
+    """Proceso grabado: lo que ProcessSnapshot y el cierre simulado necesitan."""
+
+    __slots__ = ("pid", "info")
+
+    def __init__(self, row: list):
+        pid, ppid, name, ctime, owner, exe = row
+        self.pid = pid
+        self.info = {
+            "pid": pid, "ppid": ppid, "name": name,
+            "create_time": ctime, "username": owner, "exe": exe,
+        }
+
+
+class ReplaySource(ProcessSource):
+    """Tabla de procesos y reloj de la traza; ``kill_batch`` cierra en la tabla."""
+
+    name = "replay"
+
+    def __init__(self):
+        self.now = 0.0
+        self.procs: Dict[int, TracedProcess] = {}
+        self.killed: Dict[int, TracedProcess] = {}  # cerrados que la traza aún ve vivos
+
+    def clock(self) -> float:
+        return self.now
+
+    def apply(self, adds: List[list], dels: List[int]) -> None:
+        for pid in dels:
+            self.procs.pop(pid, None)  # quizá ya cerrado en la simulación
+            self.killed.pop(pid, None)
+        for row in adds:
+            self.killed.pop(row[0], None)
+            self.procs[row[0]] = TracedProcess(row)
+            ppid = row[1]
+            while ppid in self.killed:  # hijo nuevo de algo cerrado: se reabrió
+                parent = self.procs[ppid] = self.killed.pop(ppid)
+                ppid = parent.info["ppid"]
+
+    def clear(self) -> None:
+        self.procs.clear()
+        self.killed.clear()
+
+    def scan(self, attrs: List[str]) -> List[TracedProcess]:
+        return list(self.procs.values())
+
+    def kill_batch(self, procs, *args, **kwargs) -> List[KillResult]:
+        results = []
+        for proc in procs:
+            if proc.pid in self.procs and self.procs[proc.pid] is proc:
+                self.killed[proc.pid] = self.procs.pop(proc.pid)
+                outcome = "terminated"
+            else:
+                outcome = "gone"
+            results.append(KillResult(proc.pid, proc.info["name"], outcome, 0.0))
+        return results
+
+
+class MemoryStore:
+    """Almacén de uso en memoria (misma interfaz que ``UsageJournal``)."""
+
+    def __init__(self, usage: Optional[Dict[str, float]] = None):
+        self.usage: Dict[str, float] = dict(usage or {})
+        self.sessions: List[Tuple[str, int, float, float]] = []
+
+    def load(self) -> Dict[str, float]:
+        return dict(self.usage)
+
+    def add(self, day: str, delta: float) -> None:
+        self.usage[day] = self.usage.get(day, 0.0) + delta
+
+    def set(self, day: str, seconds: float) -> None:
+        self.usage[day] = seconds
+
+    def save(self, data: Dict[str, float]) -> None:
+        self.usage = dict(data)
+
+    def add_session(self, exe: str, pid: int, start: float, end: float) -> None:
+        self.sessions.append((exe, pid, start, end))
+
+    def sync(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def reset(self) -> None:
+        self.usage.clear()
+        self.sessions.clear()
+
+
+class _Collector:
+    """Hace de Notifier y de EventLog del Monitor: guarda avisos y cierres."""
+
+    def __init__(self, source: ReplaySource):
+        self.source = source
+        self.notes: List[Tuple[float, str, str]] = []
+        self.kills: List[Tuple[float, KillResult]] = []
+        self.limit_hits = 0
+
+    def notify(self, message: str, key: Optional[str] = None) -> bool:
+        self.notes.append((self.source.now, key or message, message))
+        return True
+
+    def emit(self, event: str, **fields) -> None:
+        if event == "kill_result":
+            fields.pop("user", None)
+            self.kills.append((self.source.now, KillResult(**fields)))
+        elif event == "limit_reached":
+            self.limit_hits += 1
+
+
+class ReplayResult(NamedTuple):
+    ticks: int            # pasos del Monitor (grabados + planificados)
+    recorded: int         # ticks leídos de la traza
+    restarts: int
+    start: float          # ts del primer tick
+    end: float            # ts del último tick
+    wall: float           # s reales que tardó la reproducción
+    usage: Dict[str, float]
+    sessions: List[Tuple[str, int, float, float]]
+    kills: List[Tuple[float, KillResult]]
+    limit_hits: int       # ticks que encontraron juegos con el tiempo agotado
+    notes: List[Tuple[float, str, str]]
+    tick_cost: array      # s por paso
+
+    def cost_summary(self) -> Dict[str, float]:
+        """Mediana / p95 / máximo del coste por tick, en ms."""
+        if not self.tick_cost:
+            return {"median_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        costs = sorted(self.tick_cost)
+        return {
+            "median_ms": statistics.median(costs) * 1000,
+            "p95_ms": costs[min(int(len(costs) * 0.95), len(costs) - 1)] * 1000,
+            "max_ms": costs[-1] * 1000,
+        }
+
+
+def replay(
+    path: Path,
+    cfg=None,
+    adaptive: bool = True,
+    usage: Optional[Dict[str, float]] = None,
+) -> ReplayResult:
+    """Reproduce ``path`` con la configuración ``cfg`` (``config.Config``).
+
+    ``adaptive=False`` solo ejecuta los ticks grabados; ``usage`` es el uso
+    previo (p. ej. el de ``usage.json``) si se quiere partir de él.
+    """
+    from .config import parse_config  # lazy import
+    from .monitor import Monitor
+
+    cfg = cfg or parse_config({})
+    source = ReplaySource()
+    store = MemoryStore(usage)
+    collector = _Collector(source)
+    costs = array("d")
+    monitor: Optional[Monitor] = None
+    recorded = restarts = 0
+    start = None
+    perf = time.perf_counter
+
+    def step(mon: Monitor) -> None:
+        t0 = perf()
+        mon.loop_step()
+        costs.append(perf() - t0)
+
+    wall = perf()
+    try:
+        for rec in read_trace(path):
+            if isinstance(rec, dict):  # el daemon arrancó de nuevo
+                if monitor is not None:
+                    monitor.close()
+                    monitor = None
+                    restarts += 1
+                source.clear()  # la grabación nueva parte de cero
+                continue
+            ts, adds, dels = rec
+            if monitor is not None and adaptive:
+                due = source.now + monitor._next_delay()
+                while due < ts:  # lo que habría despertado al bucle
+                    source.now = due
+                    step(monitor)
+                    due += monitor._next_delay()
+            source.now = ts
+            source.apply(adds, dels)
+            recorded += 1
+            if start is None:
+                start = ts
+            if monitor is None:
+                monitor = Monitor(
+                    cfg.limit,
+                    warnings=cfg.warnings,
+                    max_staleness=REPLAY_STALENESS,
+                    source=source,
+                    store=store,
+                    rules=cfg.rules,
+                    notifier=collector,
+                    schedule=cfg.schedule,
+                    events=collector,
+                    clock=source.clock,
+                    killer=source.kill_batch,
+                )
+                monitor.apply_config(cfg)
+            step(monitor)
+    finally:
+        if monitor is not None:
+            monitor.close()
+    return ReplayResult(
+        len(costs),
+        recorded,
+        restarts,
+        start or 0.0,
+        source.now,
+        perf() - wall,
+        store.load(),
+        store.sessions,
+        collector.kills,
+        collector.limit_hits,
+        collector.notes,
+        costs,
+    )
@@ -0,0 +1,81 @@
+"""Volcado diferido del uso (``Checkpointer.flush``) frente a fallos de escritura."""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from game_time_limiter.checkpoint import Checkpointer
+from game_time_limiter.persistence import UsageJournal, open_store
+
+DAY = "2026-10-05"
+
+
+@pytest.fixture(params=["journal", "sqlite"])
+def store(request, tmp_path):
+    store = open_store(request.param, tmp_path / "usage")
+    store.load()
+    yield store
+    store.close()
+
+
+def reloaded(store):
+    store.close()
+    return store.load()
+
+
+def fail_once(monkeypatch, target, name, after=0):
+    """``target.name`` lanza OSError en la llamada número ``after`` (solo una vez)."""
+    real = getattr(target, name)
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == after + 1:
+            raise OSError("disco lleno")
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, flaky)
+
+
+def test_failed_sync_is_not_counted_twice(store, monkeypatch):
+    cp = Checkpointer(store=store)
+    cp.add(DAY, 30.0)
+    fail_once(monkeypatch, store, "sync")  # p. ej. fsync del diario
+    cp.flush()
+    cp.add(DAY, 5.0)
+    cp.flush()
+    assert reloaded(store) == {DAY: 35.0}
+
+
+def test_failure_midway_retries_only_what_was_not_written(store, monkeypatch):
+    cp = Checkpointer(store=store)
+    cp.add(DAY, 30.0)
+    cp.add("2026-10-06", 7.0)
+    fail_once(monkeypatch, store, "add", after=1)  # escribe el primer día, falla el segundo
+    cp.flush()
+    cp.flush()
+    assert reloaded(store) == {DAY: 30.0, "2026-10-06": 7.0}
+
+
+def test_newer_set_overrides_the_failed_batch(store, monkeypatch):
+    cp = Checkpointer(store=store)
+    cp.add(DAY, 10.0)
+    cp.add("2026-10-04", 7.0)
+    fail_once(monkeypatch, store, "add")
+    cp.flush()
+    cp.set(DAY, 0.0)  # p. ej. reinicio manual del día
+    cp.flush()
+    assert reloaded(store) == {DAY: 0.0, "2026-10-04": 7.0}
+
+
+def test_journal_fsync_failure(tmp_path, monkeypatch):
+    journal = UsageJournal(tmp_path / "usage.json", tmp_path / "usage.journal")
+    journal.load()
+    cp = Checkpointer(store=journal)
+    cp.add(DAY, 30.0)
+    fail_once(monkeypatch, os, "fsync")
+    cp.flush()
+    cp.add(DAY, 5.0)
+    cp.flush()
+    assert reloaded(journal) == {DAY: 35.0}
@@ -0,0 +1,38 @@
+"""Caché de clasificación (``ClassificationCache``) con clave ``(pid, create_time)``."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from game_time_limiter.launchers import LauncherRules
+from game_time_limiter.process_utils import ClassificationCache, ProcessSnapshot
+
+
+def proc(pid, ppid, name, ctime=1.0):
+    return SimpleNamespace(info={"pid": pid, "ppid": ppid, "name": name, "create_time": ctime})
+
+
+def tick(cache, *procs, rules=None):
+    return ProcessSnapshot(list(procs), cache=cache, rules=rules).tracked
+
+
+def test_verdict_survives_the_launcher_exiting():
+    cache = ClassificationCache()
+    assert tick(cache, proc(10, 1, "steam.exe"), proc(11, 10, "game.exe")) == {11: "steam"}
+    assert tick(cache, proc(11, 10, "game.exe")) == {11: "steam"}  # Steam ya cerró
+    assert len(cache) == 1
+
+
+def test_recycled_pid_is_classified_again():
+    cache = ClassificationCache()
+    tick(cache, proc(10, 1, "steam.exe"), proc(11, 10, "game.exe"))
+    assert tick(cache, proc(11, 10, "bash", ctime=2.0)) == {}  # mismo pid, otro proceso
+    assert len(cache) == 1  # el veredicto viejo se desalojó
+
+
+def test_new_rules_start_from_scratch():
+    cache = ClassificationCache()
+    assert tick(cache, proc(10, 1, "itch.exe"), proc(11, 10, "game.exe")) == {}
+    rules = LauncherRules.from_config({"launchers": [{"name": "itch", "roots": ["itch.exe"]}]})
+    assert tick(cache, proc(10, 1, "itch.exe"), proc(11, 10, "game.exe"), rules=rules) == {
+        11: "itch"
+    }
@@ -0,0 +1,88 @@
+"""Diario de uso (``UsageJournal``): reproducción, compactado y recuperación."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from game_time_limiter import persistence
+from game_time_limiter.persistence import SEQ_KEY, UsageJournal
+
+DAY = "2026-10-05"
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "usage.json", tmp_path / "usage.journal"
+
+
+def reopen(paths) -> UsageJournal:
+    store = UsageJournal(*paths)
+    store.load()
+    return store
+
+
+def test_replays_snapshot_plus_journal(paths):
+    store = reopen(paths)
+    store.add(DAY, 30.0)
+    store.add(DAY, 12.5)
+    store.set("2026-10-04", 600.0)
+    store.close()
+
+    assert reopen(paths).load() == {DAY: 42.5, "2026-10-04": 600.0}
+    assert json.loads(paths[0].read_text()) == {SEQ_KEY: 0}  # aún sin compactar
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(paths, monkeypatch):
+    monkeypatch.setattr(persistence, "COMPACT_EVERY", 3)
+    store = reopen(paths)
+    for _ in range(4):
+        store.add(DAY, 10.0)
+    store.close()
+
+    assert json.loads(paths[0].read_text()) == {DAY: 30.0, SEQ_KEY: 3}
+    assert len(paths[1].read_text().splitlines()) == 1
+    assert reopen(paths).load() == {DAY: 40.0}
+
+
+def test_records_already_in_the_snapshot_are_not_counted_twice(paths):
+    store = reopen(paths)
+    store.add(DAY, 10.0)
+    store.add(DAY, 5.0)
+    journal = paths[1].read_text()
+    store.compact()
+    store.close()
+    paths[1].write_text(journal)  # corte entre el snapshot y el vaciado del diario
+
+    assert reopen(paths).load() == {DAY: 15.0}
+
+
+def test_corrupt_snapshot_is_set_aside(paths):
+    snapshot, journal = paths
+    snapshot.write_text("{roto")
+    journal.write_text(json.dumps({"d": DAY, "s": 7.0, "n": 1}) + "\n")
+
+    assert reopen(paths).load() == {DAY: 7.0}
+    assert snapshot.with_name("usage.json.bad").read_text() == "{roto"
+    assert json.loads(snapshot.read_text()) == {DAY: 7.0, SEQ_KEY: 1}
+
+
+@pytest.mark.parametrize(
+    "tail, expected",
+    [
+        ('{"d":"2026-10-05","s":3', 310.0),            # crash a media línea
+        ('{"d":"2026-10-05","s":3.0,"n":3}', 313.0),   # … o justo antes del salto
+    ],
+)
+def test_torn_tail_does_not_swallow_later_records(paths, tail, expected):
+    store = reopen(paths)
+    store.add(DAY, 100.0)
+    store.add(DAY, 200.0)
+    store.close()
+    with open(paths[1], "a", encoding="utf-8") as fh:
+        fh.write(tail)
+
+    store = reopen(paths)
+    store.add(DAY, 10.0)
+    store.close()
+    assert reopen(paths).load() == {DAY: expected}
@@ -0,0 +1,82 @@
+"""Reglas de lanzadores (``LauncherRules``): nombres, globs, rutas e ignorados."""
+from __future__ import annotations
+
+import fnmatch
+import itertools
+
+import pytest
+
+from game_time_limiter.config import parse_config
+from game_time_limiter.launchers import LauncherRules
+
+
+@pytest.fixture
+def rules():
+    return LauncherRules.from_config(
+        {
+            "launchers": [
+                {"name": "custom", "games": ["minecraft*.exe", "osu!.exe", "*craft*"]},
+                {"name": "itch", "roots": ["itch.exe"], "games": ["*.itch"],
+                 "paths": ["C:/Games/itch/", "C:/Games/itch/tools/"]},
+                {"name": "tools", "paths": ["C:/Games/itch/tools/"]},
+            ],
+            "ignore": ["crashreporter*.exe"],
+        }
+    )
+
+
+def test_roots_and_helpers(rules):
+    assert rules.classify("steam.exe") == ("steam", None, None)
+    assert rules.classify("epiconlineservicesuihelper.exe")[2] == "epic"
+    assert rules.root("itch.exe") == "itch"
+    assert rules.match("steam.exe") is None  # el lanzador no es un juego
+
+
+def test_globs_map_to_their_launcher(rules):
+    assert rules.match("minecraftlauncher.exe") == "custom"
+    assert rules.match("osu!.exe") == "custom"
+    assert rules.match("starcraft") == "custom"
+    assert rules.match("game.itch") == "itch"
+    assert rules.match("notepad.exe") is None
+
+
+def test_ignored_names_never_count(rules):
+    assert rules.ignored("crashreporter64.exe")
+    assert rules.ignored("wineserver")
+    assert rules.match("crashreporter64.exe") is None
+
+
+def test_paths_use_the_longest_prefix(rules):
+    assert rules.needs_exe
+    assert rules.match("game.exe", "c:\\games\\itch\\foo\\game.exe") == "itch"
+    assert rules.match("ed.exe", "C:/Games/itch/tools/ed.exe") == "tools"
+    assert rules.match("game.exe", "C:/Games/other/game.exe") is None
+
+
+def test_relevant_execs(rules):
+    assert rules.relevant("steam.exe")
+    assert rules.relevant("minecraft.exe")
+    assert not rules.relevant("cc1")
+    assert not rules.relevant(None)
+
+
+def test_config_entry_replaces_the_default():
+    rules = LauncherRules.from_config({"launchers": [{"name": "steam", "roots": ["steam2"]}]})
+    assert rules.root("steam2") == "steam"
+    assert rules.root("steam.exe") is None
+
+
+def test_globs_with_their_own_group_names(monkeypatch):
+    # fnmatch.translate de Python 3.10 numera sus grupos (?P<g0>…), (?P<g1>…)…
+    real, counter = fnmatch.translate, itertools.count()
+    monkeypatch.setattr(
+        fnmatch, "translate", lambda pat: f"(?P<g{next(counter)}>{real(pat)})"
+    )
+    rules = LauncherRules.from_config({"launchers": [{"name": "custom", "games": ["*craft*"]}]})
+    assert rules.match("minecraft.exe") == "custom"
+
+
+def test_bad_glob_is_a_config_error(monkeypatch):
+    monkeypatch.setattr(fnmatch, "translate", lambda pat: "(")
+    with pytest.raises(ValueError, match="launchers"):
+        parse_config({"launchers": [{"name": "custom", "games": ["*craft*"]}]})
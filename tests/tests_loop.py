@@ -0,0 +1,129 @@
+"""Bucle por eventos (``run_async``) y su parada desde otro hilo (``LoopRunner``)."""
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+
+from game_time_limiter.events import ProcessEvent, ProcessEventSource
+from game_time_limiter.monitor import EVENT_SETTLE_MAX, LoopRunner, Monitor
+from game_time_limiter.trace import MemoryStore
+
+
+class IdleSource(ProcessEventSource):
+    """Sin eventos: ``wait`` solo vuelve por ``timeout`` o ``wake``.
+
+    ``parked`` se activa cuando el bucle espera el siguiente poll (no una
+    ventana de calma): a partir de ahí no quedan pasos pendientes.
+    """
+
+    name = "idle"
+
+    def __init__(self):
+        self._woken = threading.Event()
+        self.parked = threading.Event()
+        self.closed = False
+
+    def wait(self, timeout):
+        if timeout > EVENT_SETTLE_MAX:
+            self.parked.set()
+        self._woken.wait(timeout)
+        self._woken.clear()
+        return []
+
+    def wake(self):
+        self._woken.set()
+
+    def close(self):
+        self.closed = True
+
+
+class BurstSource(IdleSource):
+    """Las primeras ``burst`` esperas devuelven un exec al instante."""
+
+    name = "burst"
+
+    def __init__(self, burst):
+        super().__init__()
+        self.burst = burst
+
+    def wait(self, timeout):
+        if self.burst:
+            self.burst -= 1
+            return [ProcessEvent("exec", 1000 + self.burst, 1, "cc1")]
+        return super().wait(timeout)
+
+
+class Target:
+    """Lo mínimo que ``run_async`` usa de un Monitor."""
+
+    def __init__(self):
+        self.steps = 0
+        self.closed = 0
+        self.wake = lambda: None
+
+    async def astep(self, executor=None):
+        self.steps += 1
+
+    def _relevant(self, events):
+        return bool(events)
+
+    def _next_delay(self):
+        return 3600.0
+
+    def close(self):
+        self.closed += 1
+
+
+def run_until_parked(target, source):
+    runner = LoopRunner()
+    thread = threading.Thread(target=runner.run, args=(target, source))
+    thread.start()
+    assert source.parked.wait(5)
+    return runner, thread
+
+
+def test_stop_from_another_thread_closes_target():
+    target, source = Target(), IdleSource()
+    runner, thread = run_until_parked(target, source)
+    runner.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert target.steps == 1
+    assert target.closed == 1
+    assert source.closed
+
+
+def test_stop_before_run_only_closes():
+    runner, target = LoopRunner(), Target()
+    runner.stop()
+    runner.run(target, IdleSource())
+    assert target.steps == 0
+    assert target.closed == 1
+
+
+def test_event_burst_is_one_step():
+    target = Target()
+    runner, thread = run_until_parked(target, BurstSource(50))
+    runner.stop()
+    thread.join(timeout=5)
+    assert target.steps == 2  # arranque + la ráfaga entera
+
+
+class Quiet:
+    def notify(self, message, key=None):
+        return True
+
+    def emit(self, event, **fields):
+        pass
+
+
+def test_exhausted_monitor_ignores_unrelated_execs():
+    mon = Monitor(timedelta(0), store=MemoryStore(), notifier=Quiet(), events=Quiet())
+    try:
+        assert mon.remaining() <= 0
+        assert not mon._relevant([ProcessEvent("exec", 4242, 4000, "cc1")])
+        assert mon._relevant([ProcessEvent("exec", 4243, 4000, "steam.exe")])
+        mon._watched = {4000}
+        assert mon._relevant([ProcessEvent("exec", 4242, 4000, "cc1")])
+    finally:
+        mon.close()
@@ -0,0 +1,78 @@
+"""Modo multiusuario: una foto por tick repartida por dueño y un Monitor por usuario."""
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from game_time_limiter import multiuser
+from game_time_limiter.multiuser import MultiUserMonitor, user_key
+from game_time_limiter.process_utils import ProcessSnapshot
+
+
+class Quiet:
+    def notify(self, message, key=None):
+        return True
+
+    def emit(self, event, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+def proc(pid, ppid, name, username):
+    return SimpleNamespace(info={"pid": pid, "ppid": ppid, "name": name,
+                                 "create_time": 1.0, "username": username})
+
+
+TABLE = [
+    proc(10, 1, "steam.exe", "EQUIPO\\Ana"), proc(11, 10, "game.exe", "EQUIPO\\Ana"),
+    proc(20, 1, "steam.exe", "luis"), proc(21, 20, "other.exe", "luis"),
+    proc(30, 1, "cc1", "root"),
+    proc(40, 1, "steam.exe", "eva"),
+]
+
+
+@pytest.fixture
+def mum(tmp_path, monkeypatch):
+    monkeypatch.setattr(multiuser, "USAGE_DIR", tmp_path)
+    monkeypatch.setattr("game_time_limiter.persistence.USAGE_DIR", tmp_path)
+    monkeypatch.setattr("game_time_limiter.monitor.get_notifier", Quiet)
+    monkeypatch.setattr("game_time_limiter.eventlog.get_event_log", Quiet)
+    mum = MultiUserMonitor({"EQUIPO\\Ana": timedelta(hours=1), "luis": timedelta(hours=2)},
+                           default_limit=None)
+    yield mum
+    mum.close()
+
+
+def dispatch(mum, procs):
+    steps = {}
+    record = lambda mon, view, now: steps.setdefault(mon.user, sorted(view.tracked))
+    mum._dispatch(ProcessSnapshot(procs, rules=mum.rules), 0.0, record)
+    return steps
+
+
+def test_user_key_strips_the_domain():
+    assert user_key("EQUIPO\\Alicia") == "alicia"
+    assert user_key("luis") == "luis"
+
+
+def test_by_owner_views_only_see_their_processes():
+    views = ProcessSnapshot(TABLE).by_owner(user_key)
+    assert sorted(views) == ["ana", "eva", "luis", "root"]
+    assert sorted(views["ana"].tracked) == [11]
+    assert sorted(views["luis"].procs) == [20, 21]
+    assert not views["root"].launcher_running
+
+
+def test_each_limited_user_gets_their_own_monitor(mum):
+    assert dispatch(mum, TABLE) == {"ana": [11], "luis": [21]}
+    assert [user for user, _ in mum.users()] == ["ana", "luis"]  # eva: sin límite
+    assert mum.monitors["luis"].limit == timedelta(hours=2)
+
+
+def test_user_without_processes_still_steps(mum):
+    dispatch(mum, TABLE)
+    assert dispatch(mum, TABLE[:2]) == {"ana": [11], "luis": []}
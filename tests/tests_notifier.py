@@ -0,0 +1,91 @@
+"""Avisos (``Notifier``): deduplicado por clave, cola acotada y espera tras fallos."""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from game_time_limiter import notifier as notifier_mod
+from game_time_limiter.notifier import Notifier, StubBackend
+
+
+class GateBackend(StubBackend):
+    """El primer envío se queda esperando a ``release`` (el hilo está ocupado)."""
+
+    name = "gate"
+
+    def __init__(self):
+        super().__init__()
+        self.busy = threading.Event()
+        self.release = threading.Event()
+
+    def send(self, note):
+        if not self.sent:
+            self.busy.set()
+            assert self.release.wait(5)
+        super().send(note)
+
+
+@pytest.fixture
+def gate():
+    backend = GateBackend()
+    yield backend
+    backend.release.set()
+
+
+def messages(backend):
+    return [note.message for note in backend.sent]
+
+
+def test_same_key_is_merged_while_queued(gate):
+    notes = Notifier([gate], min_interval=0)
+    assert notes.notify("ocupado", key="x")
+    assert gate.busy.wait(5)
+    assert notes.notify("quedan 5 min", key="aviso")
+    assert not notes.notify("quedan 4 min", key="aviso")  # se actualiza el encolado
+    gate.release.set()
+    notes.close()
+    assert messages(gate) == ["ocupado", "quedan 4 min"]
+
+
+def test_min_interval_per_key():
+    backend = StubBackend()
+    notes = Notifier([backend], min_interval=60)
+    assert notes.notify("uno", key="a")
+    assert notes.flush(5)
+    assert not notes.notify("otra vez", key="a")
+    assert notes.notify("otra clave", key="b")
+    notes.close()
+    assert messages(backend) == ["uno", "otra clave"]
+
+
+def test_full_queue_drops_the_oldest(gate):
+    notes = Notifier([gate], queue_size=2, min_interval=0)
+    notes.notify("ocupado", key="x")
+    assert gate.busy.wait(5)
+    for key in ("a", "b", "c"):
+        assert notes.notify(key, key=key)
+    assert notes.dropped == 1
+    gate.release.set()
+    notes.close()
+    assert messages(gate) == ["ocupado", "b", "c"]
+
+
+def test_failing_backend_backs_off_without_blocking_others(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(
+        notifier_mod, "time",
+        SimpleNamespace(monotonic=lambda: now[0], time=time.time, sleep=time.sleep),
+    )
+    broken, good = StubBackend(fail=2), StubBackend()
+    notes = Notifier([broken, good], min_interval=0, retry_base=30, retry_max=900)
+    for t, key in ((0, "a"), (10, "b"), (31, "c"), (80, "d"), (95, "e")):
+        now[0] = t
+        notes.notify(key, key=key)
+        assert notes.flush(5)
+    notes.close()
+    # falla en 0 (espera 30 s), en 31 (espera 60 s) y vuelve a entregar en 95
+    assert messages(broken) == ["e"]
+    assert messages(good) == ["a", "b", "c", "d", "e"]
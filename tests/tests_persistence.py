@@ -0,0 +1,40 @@
+"""Almacenes de uso por usuario (``user_stem`` + ``open_store``)."""
+from __future__ import annotations
+
+import pytest
+
+from game_time_limiter import persistence
+from game_time_limiter.persistence import open_store, user_stem
+
+
+@pytest.fixture
+def usage_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence, "USAGE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("kind", ["journal", "sqlite"])
+def test_dotted_users_get_separate_stores(usage_dir, kind):
+    doe = open_store(kind, user_stem("john.doe"))
+    smith = open_store(kind, user_stem("john.smith"))
+    doe.add("2026-10-05", 3600.0)
+    smith.add("2026-10-05", 60.0)
+    for store in (doe, smith):
+        store.sync()
+        store.close()
+
+    assert open_store(kind, user_stem("john.doe")).load() == {"2026-10-05": 3600.0}
+    assert open_store(kind, user_stem("john.smith")).load() == {"2026-10-05": 60.0}
+    names = {p.name for p in usage_dir.iterdir() if not p.name.endswith(("-wal", "-shm"))}
+    if kind == "sqlite":
+        assert names == {"john.doe.db", "john.smith.db"}
+    else:
+        assert names == {
+            "john.doe.json", "john.doe.journal", "john.smith.json", "john.smith.journal"
+        }
+
+
+def test_user_stem_sanitizes_path_separators(usage_dir):
+    stem = user_stem("DOMINIO\\alicia")
+    assert stem.parent == usage_dir
+    assert stem.name == "DOMINIO_alicia"
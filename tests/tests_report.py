@@ -0,0 +1,93 @@
+"""Informes (``report``): matriz de uso, rachas, periodos, medias y carga."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from game_time_limiter import report
+from game_time_limiter.persistence import open_store, user_stem
+from game_time_limiter.report import History, rolling_mean
+
+
+@pytest.fixture
+def history():
+    # 2026-10-05 es lunes
+    return History.from_usage(
+        {
+            "ana": {"2026-10-05": 3600.0, "2026-10-06": 60.0, "2026-10-08": 10.0,
+                    "2026-10-09": 20.0, "2026-10-11": 30.0},
+            "luis": {"2026-10-10": 7200.0, "2026-10-11": 7200.0},
+        }
+    )
+
+
+def test_matrix_fills_missing_days_with_zero(history):
+    assert str(history.start) == "2026-10-05"
+    assert history.seconds.shape == (2, 7)
+    assert history.seconds[0].tolist() == [3600.0, 60.0, 0.0, 10.0, 20.0, 0.0, 30.0]
+
+
+def test_since_until_clip_the_range(history):
+    clipped = History.from_usage({"ana": {"2026-10-05": 1.0, "2026-10-09": 2.0}},
+                                 since="2026-10-06", until="2026-10-09")
+    assert clipped.seconds.tolist() == [[0.0, 0.0, 0.0, 2.0]]
+    assert History.from_usage({"ana": {}}).seconds.shape == (1, 0)
+
+
+def test_streaks_do_not_cross_series(history):
+    longest, current = history.streaks()
+    assert longest.tolist() == [2, 2]
+    assert current.tolist() == [1, 2]
+
+
+def test_weekly_and_monthly_periods():
+    h = History.from_usage({"ana": {"2026-09-27": 5.0, "2026-09-28": 1.0, "2026-10-04": 2.0,
+                                    "2026-10-05": 4.0}})
+    keys, totals = h.periods("week")
+    assert [str(k) for k in keys] == ["2026-09-21", "2026-09-28", "2026-10-05"]
+    assert totals.tolist() == [[5.0, 3.0, 4.0]]
+    keys, totals = h.periods("month")
+    assert [str(k) for k in keys] == ["2026-09-01", "2026-10-01"]
+    assert totals.tolist() == [[6.0, 6.0]]
+
+
+def test_rolling_mean_uses_fewer_periods_at_the_start():
+    out = rolling_mean(np.array([[2.0, 4.0, 6.0, 8.0]]), 2)
+    assert out.tolist() == [[2.0, 3.0, 5.0, 7.0]]
+
+
+def test_limit_hits_use_weekday_budgets(history):
+    limits = history.limits(3600.0, per_user={"luis": 7200.0}, budgets={6: 30.0})
+    hits = history.limit_hits(limits)
+    assert hits[0].tolist() == [True, False, False, False, False, False, True]
+    assert hits[1].tolist() == [False] * 5 + [True, True]
+    assert limits[:, 6].tolist() == [30.0, 30.0]  # el domingo manda el presupuesto
+
+
+def test_reports_dotted_users_without_touching_the_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, "USAGE_DIR", tmp_path)
+    monkeypatch.setattr("game_time_limiter.persistence.USAGE_DIR", tmp_path)
+    for user, seconds in (("john.doe", 60.0), ("john.smith", 120.0)):
+        store = open_store("journal", user_stem(user))
+        store.add("2026-10-05", seconds)
+        store.close()
+    assert not (tmp_path / "john.doe.json").exists()  # solo diario: load() compactaría
+    (tmp_path / "john.smith.json").write_text("{roto")  # load() lo apartaría a .bad
+    before = sorted(p.name for p in tmp_path.iterdir())
+
+    series = report.load_histories(kind="journal", users=("john.doe", "john.smith"))
+    assert series == {"john.doe": {"2026-10-05": 60.0}, "john.smith": {"2026-10-05": 120.0}}
+    assert sorted(p.name for p in tmp_path.iterdir()) == before
+
+
+def test_sqlite_store_is_read_without_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, "USAGE_DIR", tmp_path)
+    monkeypatch.setattr("game_time_limiter.persistence.USAGE_DIR", tmp_path)
+    store = open_store("sqlite", user_stem("ana.b"))
+    store.add("2026-10-05", 90.0)
+    store.close()
+    db = tmp_path / "ana.b.db"
+    before = db.stat().st_mtime_ns
+
+    assert report.load_histories(users=("ana.b",)) == {"ana.b": {"2026-10-05": 90.0}}
+    assert db.stat().st_mtime_ns == before  # solo lectura (SQLite puede abrir -wal/-shm)
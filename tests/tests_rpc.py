@@ -0,0 +1,85 @@
+"""API local: errores JSON-RPC, token y estado multiusuario."""
+from __future__ import annotations
+
+import json
+import os
+import stat
+from datetime import timedelta
+
+import pytest
+
+from game_time_limiter import rpc
+from game_time_limiter.rpc import INTERNAL_ERROR, INVALID_PARAMS, UNAUTHORIZED, RpcServer
+
+
+class Target:
+    def __init__(self):
+        self.listeners = []
+        self.limit = None
+
+    def set_limit(self, limit):
+        self.limit = limit
+
+    def state(self):
+        return {"limit": self.limit}
+
+    def remaining(self):
+        raise RuntimeError("dictionary changed size during iteration")
+
+    def stop(self):
+        self.stopped = True
+
+
+def call(server, method, **params):
+    line = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    return server._handle(line.encode())
+
+
+def test_unexpected_exceptions_are_internal_errors():
+    server = RpcServer(Target())
+    reply = call(server, "set_limit", limit=1e300, token=server.token)  # OverflowError
+    assert reply["error"]["code"] == INTERNAL_ERROR
+    assert call(server, "remaining")["error"]["code"] == INTERNAL_ERROR
+    assert call(server, "status", bogus=1)["error"]["code"] == INVALID_PARAMS
+
+
+def test_changes_need_the_token():
+    target = Target()
+    server = RpcServer(target)
+    assert call(server, "set_limit", limit="1h")["error"]["code"] == UNAUTHORIZED
+    assert "result" in call(server, "set_limit", limit="1h", token=server.token)
+    assert target.limit == timedelta(hours=1)
+
+    token, server.token = server.token, None  # no se pudo proteger rpc.token
+    assert call(server, "set_limit", limit="2h", token=token)["error"]["code"] == UNAUTHORIZED
+    assert target.limit == timedelta(hours=1)
+
+
+def test_shutdown_stops_the_loop_with_the_token():
+    target = Target()
+    server = RpcServer(target)
+    assert call(server, "shutdown")["error"]["code"] == UNAUTHORIZED
+    assert not hasattr(target, "stopped")
+    assert call(server, "shutdown", token=server.token)["result"] == {"stopping": True}
+    assert target.stopped
+
+
+def test_multiuser_status_reads_a_snapshot():
+    class Multi:
+        listeners = []
+        monitors = {"alicia": Target()}
+
+        def users(self):
+            return list(self.monitors.items())
+
+    assert call(RpcServer(Multi()), "status")["result"] == {"users": {"alicia": {"limit": None}}}
+
+
+@pytest.mark.skipif(os.name == "nt", reason="modo POSIX")
+def test_token_file_is_private_even_if_it_existed(tmp_path):
+    path = tmp_path / "rpc.token"
+    path.write_text("viejo")
+    path.chmod(0o644)
+    assert rpc._write_token(path, "nuevo")
+    assert path.read_text() == "nuevo"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
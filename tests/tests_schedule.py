@@ -0,0 +1,92 @@
+"""Horarios (``Schedule``): franjas que cruzan medianoche, bordes y bolsa semanal."""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+
+from game_time_limiter.schedule import INF, Schedule, parse_clock, parse_days
+
+H = 3600
+
+
+@pytest.fixture
+def schedule():
+    return Schedule.from_config(
+        {
+            "budgets": {"weekdays": "1h", "weekend": "3h", "fri": "2h"},
+            "blocked": [{"days": "sun-thu", "from": "22:00", "to": "07:00"}],
+            "weekly": "10h",
+            "rollover": "2h",
+        }
+    )
+
+
+def at(day, hh, mm=0):
+    # 2026-10-05 es lunes
+    return datetime(2026, 10, day, hh, mm)
+
+
+def test_parsing():
+    assert parse_days("fri-mon") == (0, 4, 5, 6)
+    assert parse_days("weekend,wed") == (2, 5, 6)
+    assert parse_clock("24:00") == 24 * H
+    with pytest.raises(ValueError):
+        parse_clock("7:60")
+    with pytest.raises(ValueError):
+        parse_days("funday")
+
+
+def test_budget_specific_day_beats_group(schedule):
+    assert schedule.budget(date(2026, 10, 8), 0.0) == 1 * H   # jueves
+    assert schedule.budget(date(2026, 10, 9), 0.0) == 2 * H   # viernes
+    assert schedule.budget(date(2026, 10, 11), 0.0) == 3 * H  # domingo
+
+
+@pytest.mark.parametrize(
+    "when, blocked",
+    [
+        (at(8, 22), True),          # jueves 22:00
+        (at(9, 6, 59), True),       # … sigue el viernes de madrugada
+        (at(9, 7), False),
+        (at(9, 23), False),         # viernes no está en sun-thu
+        (at(11, 23), True),         # domingo → cruza al lunes de la semana siguiente
+        (at(12, 3), True),
+        (at(12, 7), False),
+    ],
+)
+def test_windows_wrap_around_midnight_and_week(schedule, when, blocked):
+    assert schedule.blocked_at(when) is blocked
+
+
+def test_until_blocked_and_next_boundary(schedule):
+    assert schedule.until_blocked(at(9, 12)) == 58 * H  # viernes → domingo 22:00
+    assert schedule.until_blocked(at(12, 3)) == 0.0
+    assert schedule.next_boundary(at(12, 5)) == 2 * H   # fin de franja
+    assert schedule.next_boundary(at(12, 8)) == 14 * H  # inicio de franja
+    assert schedule.next_boundary(at(10, 23)) == 1 * H  # medianoche del sábado
+    assert Schedule().until_blocked(at(9, 12)) == INF
+
+
+def test_until_blocked_wraps_to_next_week():
+    early = Schedule(blocked=[(1 * H, 2 * H)])  # lunes 01:00-02:00
+    assert early.until_blocked(at(11, 12)) == 13 * H
+
+
+def test_week_left_with_rollover(schedule):
+    usage = {
+        "2026-09-28": 4 * H, "2026-10-04": 3 * H,   # semana anterior: 7h de 10h
+        "2026-10-05": 1 * H, "2026-10-06": 2 * H,
+        "2026-10-07": 5 * H,                        # miércoles: posterior al día consultado
+    }
+    assert schedule.week_left(date(2026, 10, 6), usage) == (10 + 2 - 3) * H
+    assert schedule.week_left(date(2026, 10, 6), {"2026-10-05": 1 * H}) == 11 * H  # arrastre con tope
+    assert Schedule().week_left(date(2026, 10, 6), usage) == INF
+
+
+def test_allowance_extra_grows_the_week_but_not_the_window(schedule):
+    usage = {"2026-10-05": 9 * H, "2026-10-04": 10 * H}  # sin arrastre
+    assert schedule.allowance(at(5, 12), usage) == 1 * H
+    assert schedule.allowance(at(5, 12), usage, extra=2 * H) == 3 * H
+    assert schedule.allowance(at(5, 21), usage, extra=2 * H) == 1 * H  # franja a las 22:00
+    assert schedule.allowance(at(5, 23), usage, extra=2 * H) == 0.0
@@ -0,0 +1,84 @@
+"""Fuentes de procesos: ``ProcFsSource`` sobre un /proc falso y ``ProcHandles``."""
+from __future__ import annotations
+
+import os
+import pwd
+
+import psutil
+import pytest
+
+from game_time_limiter.sources import ProcFsSource, ProcHandles, default_process_source
+
+BTIME = 1_700_000_000
+CLK = os.sysconf("SC_CLK_TCK")
+
+
+def write_proc(root, pid, comm, ppid=1, start=0, cmdline=None, exe=None):
+    d = root / str(pid)
+    d.mkdir()
+    fields = ["S", ppid, pid, pid, 0, -1, 4194560] + [0] * 12 + [start] + [0] * 30
+    (d / "stat").write_text(f"{pid} ({comm}) " + " ".join(map(str, fields)) + "\n")
+    if cmdline is not None:
+        (d / "cmdline").write_bytes(b"\0".join(a.encode() for a in cmdline) + b"\0")
+    if exe is not None:
+        os.symlink(exe, d / "exe")
+
+
+@pytest.fixture
+def proc(tmp_path):
+    (tmp_path / "stat").write_text(f"cpu  0 0 0 0\nbtime {BTIME}\n")
+    (tmp_path / "self").mkdir()             # no numérico: se ignora
+    (tmp_path / "99").mkdir()               # terminó antes de leer su stat
+    write_proc(tmp_path, 10, "Steam.exe", start=5 * CLK, exe="/opt/steam/steam.exe")
+    write_proc(tmp_path, 11, "a) (b", ppid=10)  # comm con paréntesis y espacios
+    write_proc(tmp_path, 12, "MinecraftLaunch", ppid=10,
+               cmdline=["C:\\Games\\MinecraftLauncher.exe", "--demo"])
+    write_proc(tmp_path, 13, "verylongcommand", ppid=10, cmdline=["/usr/bin/other"])
+    return tmp_path
+
+
+def rows(source, attrs=("pid", "ppid", "name", "create_time")):
+    return sorted(source.scan(list(attrs)).rows())
+
+
+def test_scan_parses_stat(proc):
+    got = rows(ProcFsSource(str(proc)))
+    assert [(pid, ppid, name) for pid, ppid, name, *_ in got] == [
+        (10, 1, "steam.exe"),
+        (11, 10, "a) (b"),
+        (12, 10, "minecraftlauncher.exe"),  # comm cortado: se completa con cmdline
+        (13, 10, "verylongcommand"),        # … solo si argv0 empieza igual
+    ]
+    assert got[0][3] == BTIME + 5
+    assert got[0][4:] == (None, None)
+
+
+def test_owner_and_exe_on_request(proc):
+    got = rows(ProcFsSource(str(proc)), ("pid", "name", "username", "exe"))
+    me = pwd.getpwuid(os.getuid()).pw_name
+    assert got[0][4:] == (me, "/opt/steam/steam.exe")
+    assert got[1][4:] == (me, None)
+
+
+def test_names_are_interned_across_scans(proc):
+    source = ProcFsSource(str(proc))
+    first, second = source.scan(["pid", "name"]), source.scan(["pid", "name"])
+    assert first.names is second.names
+    assert sorted(first.name_ids) == sorted(second.name_ids)
+    assert len(source._names) == 4
+
+
+def test_handles_skip_recycled_pids():
+    me = psutil.Process()
+    handles = ProcHandles({me.pid: (0, me.create_time())}, {me.pid: "python"})
+    assert handles[me.pid].info == {"pid": me.pid, "name": "python"}
+    recycled = ProcHandles({me.pid: (0, me.create_time() - 60)}, {})
+    assert me.pid in recycled
+    with pytest.raises(KeyError):
+        recycled[me.pid]
+    assert len(handles.subset([me.pid])) == 1
+
+
+def test_unknown_source_kind():
+    with pytest.raises(ValueError, match="fuente"):
+        default_process_source("wmi")
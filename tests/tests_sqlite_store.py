@@ -0,0 +1,48 @@
+"""Backend SQLite (``SqliteUsageStore``): importación inicial y reemplazo total."""
+from __future__ import annotations
+
+from game_time_limiter.persistence import UsageJournal, open_store
+
+DAY = "2026-10-05"
+
+
+def write_journal(tmp_path, usage):
+    journal = UsageJournal(tmp_path / "usage.json", tmp_path / "usage.journal")
+    journal.load()
+    for day, seconds in usage.items():
+        journal.add(day, seconds)
+    journal.close()
+
+
+def test_first_open_imports_the_json_store(tmp_path):
+    write_journal(tmp_path, {DAY: 300.0, "2026-10-04": 60.0})
+    store = open_store("sqlite", tmp_path / "usage")
+    assert store.load() == {DAY: 300.0, "2026-10-04": 60.0}
+    store.add(DAY, 10.0)
+    store.close()
+
+    write_journal(tmp_path, {DAY: 999.0})  # solo se importa una vez
+    assert store.load() == {DAY: 310.0, "2026-10-04": 60.0}
+    store.close()
+
+
+def test_reset_does_not_reimport(tmp_path):
+    write_journal(tmp_path, {DAY: 300.0})
+    store = open_store("sqlite", tmp_path / "usage")
+    store.load()
+    store.reset()
+    assert store.load() == {}
+    store.close()
+    assert store.load() == {}
+    store.close()
+
+
+def test_save_drops_days_missing_from_the_mapping(tmp_path):
+    store = open_store("sqlite", tmp_path / "usage")
+    store.load()
+    store.add(DAY, 30.0)
+    store.add("2026-10-04", 7.0)
+    store.save({DAY: 30.0})
+    store.close()
+    assert store.load() == {DAY: 30.0}
+    store.close()